@@ -1,7 +1,13 @@
 # a_star.py
-import heapq
 from typing import List, Tuple, Optional
 from puzzle_state import PuzzleState
+from packed_state import PackedState
+from search_nodes import NodeStore
+from move_tables import get_successor_table
+from goal_context import get_goal_context
+from open_list import create_open_list
+from utils import is_solvable
+from cancellation import SearchLimit
 
 
 class AStarSolver:
@@ -22,45 +28,30 @@ class AStarSolver:
         self.initial_state.goal_board = goal_board
         self.goal_state.goal_board = goal_board
 
-    def is_solvable(self, board):
-        """检查八数码问题是否有解（基于排列逆序数）"""
-        # 将二维列表展平为一维，排除空白格(0)
-        flat_board = [num for row in board for num in row if num != 0]
-
-        # 计算逆序数
-        inversions = 0
-        n = len(flat_board)
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                if flat_board[i] > flat_board[j]:
-                    inversions += 1
-
-        # 对于3x3八数码，逆序数为偶数时有解
-        return inversions % 2 == 0
+        # 目标上下文（按目标棋盘缓存，重复目标直接命中）
+        self.goal_context = get_goal_context(goal_board)
+        self.rows = self.goal_context.rows
+        self.cols = self.goal_context.cols
+        self.bits = self.goal_context.bits
 
-    def reconstruct_path(self, came_from, current_state):
-        """重建从初始状态到目标状态的路径"""
-        path = []
-        moves = []
-
-        while current_state is not None:
-            path.append(current_state)
-            if current_state.move:  # 初始状态没有移动方向
-                moves.append(current_state.move)
-            current_state = came_from.get(current_state)
-
-        path.reverse()
-        moves.reverse()
+    def is_solvable(self, board):
+        """检查棋盘能否到达本求解器的目标状态（任意尺寸、任意目标，见 utils.is_solvable）"""
+        return is_solvable(board, self.goal_board)
 
-        return path, moves
+    def reconstruct_path(self, nodes, node_id):
+        """重建从初始状态到目标状态的路径（只在此时构造PuzzleState对象）"""
+        return nodes.build_path(node_id, self.rows, self.cols, self.goal_board)
 
-    def solve(self, heuristic_type="manhattan", max_nodes=50000):
+    def solve(self, heuristic_type="manhattan", max_nodes=50000, open_list="heap",
+              deadline=None, cancel_token=None):
         """
         执行A*搜索
         Args:
             heuristic_type: 启发式函数类型 ("manhattan" 或 "misplaced")
             max_nodes: 最大扩展节点数限制
+            open_list: 开放列表类型 ("heap" 二叉堆 或 "bucket" 按f值分桶)
+            deadline: 截止时间（time.monotonic() 时钟，见 cancellation.deadline_after），None表示不限时
+            cancel_token: cancellation.CancellationToken，None表示不可取消
         Returns:
             solution_path: 解路径（状态列表）
             moves: 移动序列
@@ -69,77 +60,88 @@ class AStarSolver:
         if not self.is_solvable(self.initial_state.board):
             return None, None, {"error": "该初始状态无解"}
 
-        # 初始化数据结构
-        open_set = []  # 优先队列，存储元组 (f_score, h_score, state)
-        open_dict = {}  # 快速查找
-        closed_set = set()  # 已访问集合
+        rows, cols, bits = self.rows, self.cols, self.bits
+        mask = (1 << bits) - 1
+        successors = get_successor_table(rows, cols)
+        heuristic = self.goal_context.heuristic(heuristic_type)
+        goal_key = self.goal_context.goal_key
 
-        # 初始化起始状态
-        start_h = self.initial_state.h(self.goal_board, heuristic_type)
-        start_f = self.initial_state.g + start_h
+        # 初始化数据结构：搜索节点保存在并行数组中，集合与字典以打包整数为键
+        nodes = NodeStore()
+        start = PackedState.from_board(self.initial_state.board)
+        root = nodes.add(start.code, start.blank, 0)
 
-        # 使用元组 (f_score, h_score, state) 来确保正确排序
-        # 当f_score相同时，优先选择h_score较小的
-        heapq.heappush(open_set, (start_f, start_h, self.initial_state))
-        open_dict[self.initial_state] = start_f
+        start_h = heuristic.evaluate(start.code)
 
-        came_from = {}  # 记录父节点
-        g_score = {self.initial_state: 0}  # 实际代价
+        # 开放列表按 (f_score, h_score) 排序
+        # 当f_score相同时，优先选择h_score较小的
+        open_set = create_open_list(open_list)
+        open_set.push(start_h, start_h, root)
+        g_score = {start.code: 0}  # 实际代价
+        closed_set = set()  # 已访问集合
 
         # 统计信息
         nodes_expanded = 0
         max_open_size = 1
+        stale_skipped = 0  # 弹出时发现已过期的重复条目数
+        limit = SearchLimit(deadline, cancel_token)
+        next_check = limit.first_check()
+        current_f = start_h
 
         while open_set and nodes_expanded < max_nodes:
-            # 获取f值最小的状态
-            current_f, current_h, current_state = heapq.heappop(open_set)
-
-            # 如果该状态已在closed_set中，跳过
-            if current_state in closed_set:
+            # 每隔固定扩展数检查一次截止时间与取消标记
+            if nodes_expanded >= next_check:
+                if limit.should_stop():
+                    break
+                next_check = nodes_expanded + limit.interval
+
+            # 获取f值最小的节点
+            current_f, current_h, node = open_set.pop()
+            code = nodes.codes[node]
+
+            # 如果该状态已在closed_set中，或之后找到了更优路径，该条目已过期，跳过
+            if code in closed_set or nodes.g[node] > g_score[code]:
+                stale_skipped += 1
                 continue
 
             # 检查是否达到目标
-            if current_state.board == self.goal_board:
-                path, moves = self.reconstruct_path(came_from, current_state)
+            if code == goal_key:
+                path, moves = self.reconstruct_path(nodes, node)
                 stats = {
                     "nodes_expanded": nodes_expanded,
                     "path_length": len(path) - 1,
                     "solution_found": True,
                     "max_open_size": max_open_size,
-                    "final_f": current_f
+                    "final_f": current_f,
+                    "nodes_generated": len(nodes),
+                    "open_list": open_set.name,
+                    "stale_skipped": stale_skipped
                 }
                 return path, moves, stats
 
             # 标记为已访问
-            closed_set.add(current_state)
+            closed_set.add(code)
             nodes_expanded += 1
 
-            # 生成邻居状态
-            for neighbor in current_state.get_neighbors():
-                # 设置邻居的目标状态
-                neighbor.goal_board = self.goal_board
+            blank = nodes.blanks[node]
+            tentative_g = nodes.g[node] + 1
+
+            # 生成邻居状态：查表得到合法移动（已排除上一步的逆移动），把目标格的数字移到空白格
+            for move, target in successors[blank][nodes.moves[node]]:
+                tile = (code >> (target * bits)) & mask
+                child = code - (tile << (target * bits)) + (tile << (blank * bits))
 
                 # 如果邻居已在closed_set中，跳过
-                if neighbor in closed_set:
+                if child in closed_set:
                     continue
 
-                # 计算从起始状态到邻居的实际代价
-                tentative_g = g_score[current_state] + 1
-
-                # 如果找到更优路径或邻居不在open_set中
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    # 更新路径信息
-                    came_from[neighbor] = current_state
-                    g_score[neighbor] = tentative_g
-
-                    # 计算h值和f值
-                    neighbor_h = neighbor.h(self.goal_board, heuristic_type)
-                    f_score = tentative_g + neighbor_h
-
-                    # 添加到open_set
-                    if neighbor not in open_dict or f_score < open_dict[neighbor]:
-                        heapq.heappush(open_set, (f_score, neighbor_h, neighbor))
-                        open_dict[neighbor] = f_score
+                # 如果找到更优路径或邻居尚未生成
+                if child not in g_score or tentative_g < g_score[child]:
+                    g_score[child] = tentative_g
+                    # 增量计算：数字tile从target移到blank
+                    child_h = heuristic.update(current_h, child, tile, target, blank)
+                    child_id = nodes.add(child, target, tentative_g, node, move)
+                    open_set.push(tentative_g + child_h, child_h, child_id)
 
             # 更新最大open_set大小
             max_open_size = max(max_open_size, len(open_set))
@@ -150,6 +152,12 @@ class AStarSolver:
             "path_length": 0,
             "solution_found": False,
             "max_open_size": max_open_size,
+            "nodes_generated": len(nodes),
+            "open_list": open_set.name,
+            "stale_skipped": stale_skipped,
             "error": f"达到最大节点限制 ({max_nodes}) 或问题无解"
         }
-        return None, None, stats
\ No newline at end of file
+        if limit.reason is not None:
+            # 提前停止：最后弹出的f值是最优解长度的下界
+            stats.update(limit.stop_stats(), lower_bound=current_f)
+        return None, None, stats
@@ -0,0 +1,192 @@
+# anytime.py
+import heapq
+import time
+from a_star import AStarSolver
+from packed_state import PackedState
+from search_nodes import NodeStore
+from move_tables import get_successor_table
+from cancellation import SearchLimit, STOP_MESSAGES
+
+DEFAULT_INITIAL_WEIGHT = 3.0
+DEFAULT_WEIGHT_STEP = 0.5
+
+
+class AnytimeSolver(AStarSolver):
+    """
+    随时可用的加权搜索（ARA*）：先用较大权重 w 的加权A*（f = g + w*h）快速得到一个解，
+    再逐步降低权重继续改进，直到证明最优或到达截止时间。
+    每一轮保留上一轮的开放列表与g值：只把“g值变小但本轮已经扩展过”的状态（INCONS）并回开放列表，
+    而不是从头搜索；每个解附带次优界 bound（解长度 <= bound * 最优解长度）
+    """
+
+    def solve_iter(self, heuristic_type="manhattan", max_nodes=50000, initial_weight=DEFAULT_INITIAL_WEIGHT,
+                   weight_step=DEFAULT_WEIGHT_STEP, deadline=None, cancel_token=None):
+        """
+        逐步产出越来越好的解（生成器）
+        Args:
+            heuristic_type: 启发式函数类型（需可采纳，次优界才成立）
+            max_nodes: 最大扩展节点数限制（所有轮次合计）
+            initial_weight: 第一轮的权重
+            weight_step: 每轮权重的减小量（最小为1）
+            deadline: 截止时间（见 AStarSolver.solve）
+            cancel_token: 取消标记（见 AStarSolver.solve）
+        Yields:
+            (solution_path, moves, stats)：stats 含 weight（本轮权重）、bound（次优界，1表示已证明最优）、
+            optimal、iteration、nodes_expanded（累计）与 seconds（从开始到找到该解的时间）
+        Returns:
+            生成器结束时的汇总统计 {"nodes_expanded", "max_open_size", "stopped"}（StopIteration.value）
+        """
+        if not self.is_solvable(self.initial_state.board):
+            return {"nodes_expanded": 0, "max_open_size": 0, "stopped": None}
+
+        start_time = time.perf_counter()
+        rows, cols, bits = self.rows, self.cols, self.bits
+        mask = (1 << bits) - 1
+        successors = get_successor_table(rows, cols)
+        heuristic = self.goal_context.heuristic(heuristic_type)
+        goal_key = self.goal_context.goal_key
+        limit = SearchLimit(deadline, cancel_token)
+        next_check = limit.first_check()
+
+        nodes = NodeStore()
+        start = PackedState.from_board(self.initial_state.board)
+        root = nodes.add(start.code, start.blank, 0)
+        best = {start.code: root}  # 状态 -> 当前g值最小的节点编号
+        h_of = {start.code: heuristic.evaluate(start.code)}
+        open_codes = {start.code}
+        incons = set()  # 本轮已扩展后g值又变小的状态，留到下一轮
+        weight = max(1.0, initial_weight)
+        open_set = [(weight * h_of[start.code], h_of[start.code], root)]
+
+        nodes_expanded = 0
+        iteration = 0
+        max_open_size = 1
+        last = None  # 上一次产出的 (解长度, 次优界)
+        summary = {"stopped": None}
+
+        while True:
+            # ImprovePath：扩展直到目标的 g 不大于开放列表中的最小加权f值
+            closed = set()
+            stopped = False
+            while open_set:
+                f, h, node = open_set[0]
+                code = nodes.codes[node]
+                if best[code] != node or code not in open_codes:
+                    heapq.heappop(open_set)  # 过期条目
+                    continue
+                goal_node = best.get(goal_key)
+                if goal_node is not None and nodes.g[goal_node] <= f:
+                    break
+                if nodes_expanded >= max_nodes:
+                    stopped = True
+                    summary["stopped"] = "max_nodes"
+                    break
+                if nodes_expanded >= next_check:
+                    if limit.should_stop():
+                        stopped = True
+                        summary["stopped"] = limit.reason
+                        break
+                    next_check = nodes_expanded + limit.interval
+
+                heapq.heappop(open_set)
+                open_codes.discard(code)
+                closed.add(code)
+                nodes_expanded += 1
+
+                blank = nodes.blanks[node]
+                tentative_g = nodes.g[node] + 1
+                for move, target in successors[blank][nodes.moves[node]]:
+                    tile = (code >> (target * bits)) & mask
+                    child = code - (tile << (target * bits)) + (tile << (blank * bits))
+                    child_node = best.get(child)
+                    if child_node is not None and nodes.g[child_node] <= tentative_g:
+                        continue
+                    child_h = h_of.get(child)
+                    if child_h is None:
+                        child_h = h_of[child] = heuristic.update(h, child, tile, target, blank)
+                    best[child] = nodes.add(child, target, tentative_g, node, move)
+                    if child in closed:
+                        incons.add(child)
+                    else:
+                        open_codes.add(child)
+                        heapq.heappush(open_set, (tentative_g + weight * child_h, child_h, best[child]))
+                max_open_size = max(max_open_size, len(open_set))
+
+            goal_node = best.get(goal_key)
+            if goal_node is not None and not stopped:
+                # 次优界：min(w, 解长度 / 开放与INCONS中 g+h 的最小值)，后者是最优解长度的下界
+                cost = nodes.g[goal_node]
+                frontier = [nodes.g[best[c]] + h_of[c] for c in open_codes | incons]
+                lower_bound = min(frontier) if frontier else cost
+                bound = max(1.0, min(weight, cost / lower_bound)) if lower_bound else 1.0
+                if last is None or (cost, bound) < last:
+                    last = (cost, bound)
+                    path, moves = self.reconstruct_path(nodes, goal_node)
+                    yield path, moves, {
+                        "nodes_expanded": nodes_expanded,
+                        "path_length": cost,
+                        "solution_found": True,
+                        "max_open_size": max_open_size,
+                        "final_f": cost,
+                        "weight": weight,
+                        "bound": bound,
+                        "optimal": bound == 1.0,
+                        "iteration": iteration,
+                        "seconds": time.perf_counter() - start_time,
+                    }
+            summary.update(nodes_expanded=nodes_expanded, max_open_size=max_open_size)
+            if (last is not None and last[1] == 1.0) or stopped or weight == 1.0 or \
+                    (not open_set and not incons):
+                return summary
+
+            # 降低权重：把INCONS并回开放列表，并按新权重重建优先级
+            weight = max(1.0, weight - weight_step)
+            open_codes |= incons
+            incons = set()
+            open_set = [(nodes.g[best[c]] + weight * h_of[c], h_of[c], best[c]) for c in open_codes]
+            heapq.heapify(open_set)
+            iteration += 1
+
+    def solve(self, heuristic_type="manhattan", max_nodes=50000, deadline=None, cancel_token=None,
+              initial_weight=DEFAULT_INITIAL_WEIGHT, weight_step=DEFAULT_WEIGHT_STEP, on_solution=None):
+        """
+        运行到证明最优、达到节点限制或截止时间为止，返回找到的最好解
+        Args:
+            on_solution: 可选回调 on_solution(path, moves, stats)，每找到一个更好的解调用一次；
+                返回True时立即停止（调用者认为已经足够好）
+            其余参数见 solve_iter
+        Returns:
+            solution_path, moves, stats（与其他求解器相同；未证明最优时 stats["optimal"] 为False）
+        """
+        if not self.is_solvable(self.initial_state.board):
+            return None, None, {"error": "该初始状态无解"}
+
+        results = self.solve_iter(heuristic_type, max_nodes, initial_weight, weight_step, deadline, cancel_token)
+        result = None
+        summary = {}
+        while True:
+            try:
+                result = next(results)
+            except StopIteration as stop:
+                summary = stop.value
+                break
+            if on_solution is not None and on_solution(*result):
+                results.close()
+                break
+
+        stopped = summary.get("stopped")
+        if result is not None:
+            path, moves, stats = result
+            if stopped in STOP_MESSAGES:
+                stats["stopped"] = stopped  # 解有效，但可能尚未证明最优（见 stats["bound"]）
+            return path, moves, stats
+        stats = {
+            "nodes_expanded": summary["nodes_expanded"],
+            "path_length": 0,
+            "solution_found": False,
+            "max_open_size": summary["max_open_size"],
+            "error": f"达到最大节点限制 ({max_nodes}) 或问题无解",
+        }
+        if stopped in STOP_MESSAGES:
+            stats.update(stopped=stopped, error=STOP_MESSAGES[stopped])
+        return None, None, stats
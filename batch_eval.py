@@ -0,0 +1,123 @@
+# batch_eval.py
+# 依赖NumPy（可选依赖，只有批量评估功能需要）
+import numpy as np
+
+BATCH_HEURISTICS = ("manhattan", "misplaced")
+INVALID = -1  # 无效棋盘（不恰好包含 0..cells-1）的启发式值
+
+
+def as_board_array(boards):
+    """
+    把棋盘序列转换为 (N, cells) 的整数数组；已经是二维数组时直接返回
+    Args:
+        boards: 棋盘列表（每个为二维列表）或 (N, cells) 数组
+    """
+    if isinstance(boards, np.ndarray) and boards.ndim == 2:
+        return boards
+    return np.array([[num for row in board for num in row] for board in boards],
+                    dtype=np.int16).reshape(len(boards), -1)
+
+
+def _goal_arrays(goal_board):
+    """目标状态的一维数组与 数字 -> 目标下标 数组"""
+    goal_flat = np.array([num for row in goal_board for num in row], dtype=np.int16)
+    goal_pos = np.empty(len(goal_flat), dtype=np.int16)
+    goal_pos[goal_flat] = np.arange(len(goal_flat), dtype=np.int16)
+    return goal_flat, goal_pos
+
+
+def batch_manhattan(boards, goal_board):
+    """
+    批量曼哈顿距离：一次查 数字×位置 距离表后按行求和
+    无效棋盘的行先置零再查表（越界数字会引发IndexError，负数会按下标回绕查到错误的数字），结果为 INVALID
+    """
+    boards = as_board_array(boards)
+    cols = len(goal_board[0])
+    _, goal_pos = _goal_arrays(goal_board)
+    valid = batch_is_valid(boards)
+    masked = np.where(valid[:, None], boards, 0)
+    positions = np.arange(boards.shape[1])
+    target = goal_pos[masked]  # 每个格子上数字的目标下标
+    distance = np.abs(positions // cols - target // cols) + np.abs(positions % cols - target % cols)
+    return np.where(valid, np.where(masked != 0, distance, 0).sum(axis=1), INVALID)
+
+
+def batch_misplaced(boards, goal_board):
+    """批量错位数（无效棋盘的行为 INVALID）"""
+    boards = as_board_array(boards)
+    goal_flat, _ = _goal_arrays(goal_board)
+    misplaced = ((boards != goal_flat) & (boards != 0)).sum(axis=1)
+    return np.where(batch_is_valid(boards), misplaced, INVALID)
+
+
+def _batch_parity(values):
+    """每行的逆序数奇偶性（values 为 (N, n) 数组，只比较 i<j 的数对）"""
+    n = values.shape[1]
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    inversions = ((values[:, :, None] > values[:, None, :]) & upper).sum(axis=(1, 2))
+    return inversions & 1
+
+
+def batch_inversion_parity(boards):
+    """批量计算排除空白格后数字序列的逆序数奇偶性（0为偶，1为奇）"""
+    boards = as_board_array(boards)
+    # 稳定排序把空白格挪到每行末尾，其余数字保持原有次序
+    order = np.argsort(boards == 0, axis=1, kind="stable")
+    tiles = np.take_along_axis(boards, order, axis=1)[:, :-1]
+    return _batch_parity(tiles)
+
+
+def batch_is_valid(boards):
+    """每行是否恰好包含 0..cells-1"""
+    boards = as_board_array(boards)
+    return (np.sort(boards, axis=1) == np.arange(boards.shape[1])).all(axis=1)
+
+
+def batch_is_solvable(boards, goal_board):
+    """
+    批量可解性判断（规则与 utils.is_solvable 相同，适用于任意尺寸与任意目标）：
+    棋盘相对目标的排列奇偶性 == 空白格到目标位置的曼哈顿距离奇偶性
+    """
+    boards = as_board_array(boards)
+    cols = len(goal_board[0])
+    _, goal_pos = _goal_arrays(goal_board)
+    valid = batch_is_valid(boards)
+    permutation = goal_pos[np.where(valid[:, None], boards, 0)]
+    blank = np.argmax(boards == 0, axis=1)
+    goal_blank = goal_pos[0]
+    blank_distance = np.abs(blank // cols - goal_blank // cols) + np.abs(blank % cols - goal_blank % cols)
+    return valid & (_batch_parity(permutation) == (blank_distance & 1))
+
+
+def batch_evaluate(boards, goal_board, heuristics=BATCH_HEURISTICS):
+    """
+    一次向量化计算启发式值、逆序数奇偶性与可解性
+    Args:
+        boards: 棋盘列表或 (N, cells) 数组
+        goal_board: 目标状态棋盘
+        heuristics: 需要计算的启发式名称（"manhattan" / "misplaced"）
+    Returns:
+        dict: 名称 -> 长度为N的数组（无效棋盘为 INVALID），另含 "parity" 与 "solvable"（无效棋盘为False）
+    """
+    boards = as_board_array(boards)
+    functions = {"manhattan": batch_manhattan, "misplaced": batch_misplaced}
+    result = {}
+    for name in heuristics:
+        if name not in functions:
+            raise ValueError(f"不支持批量计算的启发式类型: {name}")
+        result[name] = functions[name](boards, goal_board)
+    result["parity"] = batch_inversion_parity(boards)
+    result["solvable"] = batch_is_solvable(boards, goal_board)
+    return result
+
+
+def triage(boards, goal_board, heuristic_type="manhattan"):
+    """
+    搜索前的预处理：剔除不可解实例，其余按启发式值从小到大排序
+    Returns:
+        可解实例在输入中的下标数组（按h值升序，h相同保持原顺序）
+    """
+    values = batch_evaluate(boards, goal_board, (heuristic_type,))
+    solvable = np.flatnonzero(values["solvable"])
+    order = np.argsort(values[heuristic_type][solvable], kind="stable")
+    return solvable[order]
@@ -0,0 +1,174 @@
+# batch_solve.py
+import os
+import time
+from collections import deque
+from packed_state import pack_board, unpack_board
+from heuristics import create_heuristic
+from solvers import create_solver
+
+# 只回传这些统计项，避免把大对象（如相遇状态、阈值列表）序列化回主进程
+RESULT_STATS = ("nodes_expanded", "path_length", "solution_found", "max_open_size", "final_f", "error")
+STREAM_CHUNK_SIZE = 64  # solve_stream 每个任务包含的实例数
+INVALID_BOARD = "无效的棋盘"
+
+# 工作进程内的全局配置，由 _init_worker 在进程启动时设置一次
+_worker = {}
+
+
+def _init_worker(goal_code, rows, cols, algorithm, heuristic_type, max_nodes):
+    """
+    工作进程初始化：还原目标状态并预先创建启发式函数。
+    距离表、模式数据库等大表此时已由主进程写到磁盘，各进程以只读内存映射方式打开同一文件，
+    由操作系统页缓存共享，不会在每个进程中各复制一份
+    """
+    goal_board = unpack_board(goal_code, rows, cols)
+    create_heuristic(heuristic_type, goal_board)
+    _worker.update({
+        "goal_board": goal_board,
+        "rows": rows,
+        "cols": cols,
+        "algorithm": algorithm,
+        "heuristic_type": heuristic_type,
+        "max_nodes": max_nodes,
+    })
+
+
+def _solve_code(code):
+    """在当前进程中求解一个打包状态，只返回移动序列和精简后的统计信息（含求解耗时 seconds）"""
+    if code is None:
+        return None, {"solution_found": False, "error": INVALID_BOARD}
+    start_time = time.perf_counter()
+    board = unpack_board(code, _worker["rows"], _worker["cols"])
+    solver = create_solver(_worker["algorithm"], board, _worker["goal_board"])
+    _, moves, stats = solver.solve(_worker["heuristic_type"], max_nodes=_worker["max_nodes"])
+    result = {key: stats[key] for key in RESULT_STATS if key in stats}
+    result["seconds"] = time.perf_counter() - start_time
+    return moves, result
+
+
+def _solve_chunk(chunk):
+    """工作进程任务：求解一组 (下标, 打包状态)"""
+    return [(index,) + _solve_code(code) for index, code in chunk]
+
+
+def _chunks(items, size):
+    """把可迭代对象按顺序切成列表块（惰性读取，不会一次读入全部输入）"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_many(boards, goal_board, heuristic_type="manhattan", workers=None,
+               algorithm="astar", max_nodes=50000, chunk_size=None):
+    """
+    并行批量求解
+    实例以打包整数编码发送给进程池，结果按完成顺序逐个产出；
+    workers 为 0 或 1 时在当前进程内顺序求解（便于调试，也省去进程启动开销）
+    Args:
+        boards: 初始棋盘序列（需与目标状态尺寸相同）
+        goal_board: 目标状态棋盘
+        heuristic_type: 启发式函数类型
+        workers: 进程数，默认为CPU核数
+        algorithm: 求解算法名称（见 solvers.SOLVERS）
+        max_nodes: 单个实例的最大扩展节点数
+        chunk_size: 每个任务包含的实例数，默认使每个进程约分到4个任务
+    Yields:
+        (index, moves, stats): 实例在输入中的下标、移动序列（失败时为None）、统计信息
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    codes = [pack_board(board) for board in boards]
+    goal_code = pack_board(goal_board)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # 在主进程中先创建一次启发式函数：需要的查找表若不在磁盘上，会在这里构建并保存，
+    # 工作进程随后直接映射，不会重复构建
+    init_args = (goal_code, rows, cols, algorithm, heuristic_type, max_nodes)
+    _init_worker(*init_args)
+
+    if workers <= 1 or len(codes) <= 1:
+        for index, code in enumerate(codes):
+            yield (index,) + _solve_code(code)
+        return
+
+    if chunk_size is None:
+        chunk_size = max(1, len(codes) // (workers * 4))
+    indexed = list(enumerate(codes))
+    chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # 只在并行时导入，缩短启动时间
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=init_args) as executor:
+        futures = [executor.submit(_solve_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for result in future.result():
+                yield result
+
+
+def solve_stream(boards, goal_board, heuristic_type="manhattan", workers=None, algorithm="astar",
+                 max_nodes=50000, chunk_size=STREAM_CHUNK_SIZE, max_pending=None):
+    """
+    流式并行批量求解：惰性读取输入，结果按输入顺序逐个产出。
+    同时在途的任务块不超过 max_pending 个，消费者处理得慢时不再读取新的输入（反压），
+    因此内存占用与输入总量无关，可以处理任意长的输入流
+    Args:
+        boards: 初始棋盘的可迭代对象；元素为None表示无效输入，直接产出错误结果
+        goal_board: 目标状态棋盘
+        heuristic_type: 启发式函数类型
+        workers: 进程数，默认为CPU核数；0或1时在当前进程内顺序求解
+        algorithm: 求解算法名称（见 solvers.SOLVERS）
+        max_nodes: 单个实例的最大扩展节点数
+        chunk_size: 每个任务块包含的实例数
+        max_pending: 最多同时在途的任务块数，默认为进程数的2倍
+    Yields:
+        (index, moves, stats): 与 solve_many 相同，stats 另含求解耗时 seconds
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    if workers is None:
+        workers = os.cpu_count() or 1
+    init_args = (pack_board(goal_board), rows, cols, algorithm, heuristic_type, max_nodes)
+    _init_worker(*init_args)
+    chunks = _chunks(((index, None if board is None else pack_board(board))
+                      for index, board in enumerate(boards)), chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk)
+        return
+
+    if max_pending is None:
+        max_pending = workers * 2
+    from concurrent.futures import ProcessPoolExecutor  # 只在并行时导入，缩短启动时间
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=init_args) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_solve_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+if __name__ == "__main__":
+    # 吞吐量测试：python batch_solve.py [实例数] [进程数]
+    import sys
+    import time
+    from utils import create_goal_board, create_random_board
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    goal = create_goal_board()
+    boards = [create_random_board(moves=60) for _ in range(count)]
+
+    for n in sorted({1, workers}):
+        start_time = time.time()
+        solved = sum(1 for _, moves, _ in solve_many(boards, goal, "manhattan", workers=n) if moves is not None)
+        elapsed = time.time() - start_time
+        print(f"进程数 {n:<3} 求解 {solved}/{count} 个实例，耗时 {elapsed:.2f} 秒，"
+              f"吞吐量 {count / elapsed:.1f} 个/秒")
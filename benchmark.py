@@ -0,0 +1,327 @@
+# benchmark.py
+# 可复现的基准测试：按最优解深度分层生成带种子的实例集，运行各求解器×启发式组合，
+# 输出JSON/CSV结果，并与保存的基线比较、标记超过阈值的退化
+# 用法：
+#   python benchmark.py generate --per-depth 100 --seed 0 -o corpus.json
+#   python benchmark.py run corpus.json --algorithms astar idastar --heuristics manhattan linear_conflict -o results.json
+#   python benchmark.py run corpus.json -o new.json --baseline results.json --threshold 0.1
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from packed_state import PackedState
+from solvers import create_solver
+from utils import create_goal_board, percentile
+
+DEFAULT_ALGORITHMS = ("astar", "idastar", "bidirectional", "table", "anytime")
+DEFAULT_HEURISTICS = ("manhattan", "misplaced", "linear_conflict", "walking_distance")
+HEURISTIC_FREE = ("table",)  # 不使用启发式的求解器，每个实例只运行一次
+RESULT_FIELDS = ("algorithm", "heuristic", "id", "depth", "solved", "path_length", "optimal",
+                 "nodes", "max_open_size", "setup_seconds", "seconds", "peak_kib", "error")
+# 基线比较的指标：越大越差；解的数量与步数单独检查
+COMPARED_METRICS = ("nodes_mean", "seconds_median", "seconds_p95", "peak_kib_mean")
+
+
+def _random_walk(rows, cols, length, rng):
+    """从标准目标出发的带种子随机游走（不立即走回头路）"""
+    state = PackedState.from_board(create_goal_board(rows, cols))
+    last_move = -1
+    for _ in range(length):
+        move, _ = rng.choice(state.legal_moves(last_move))
+        state.apply(move)
+        last_move = move
+    return state.to_board()
+
+
+def generate_corpus(per_depth=100, depths=range(32), seed=0, rows=3, cols=None):
+    """
+    生成按深度分层的实例集
+    3x3按最优解深度精确分层（由距离表得到每个可达状态的深度，再按种子抽样；
+    某一深度的状态不足 per_depth 个时全部收入，例如深度31只有2个状态）；
+    其他尺寸没有全状态距离表，按随机游走步数分层（depth 为游走步数，是最优深度的上界）
+    Args:
+        per_depth: 每层实例数
+        depths: 深度（或游走步数）列表
+        seed: 随机种子，相同参数总是生成相同的实例集
+        rows, cols: 棋盘尺寸
+    Returns:
+        dict: {"rows", "cols", "seed", "per_depth", "exact_depth", "instances": [{"id", "depth", "board"}, ...]}
+    """
+    cols = rows if cols is None else cols
+    rng = random.Random(seed)
+    depths = list(depths)
+    exact = (rows, cols) == (3, 3)
+    instances = []
+    if exact:
+        from distance_table import get_distance_table
+        from permutation_rank import unrank_board
+        table = get_distance_table()
+        by_depth = {depth: [] for depth in depths}
+        for index, distance in enumerate(table):
+            if distance in by_depth:
+                by_depth[distance].append(index)
+        for depth in depths:
+            indices = by_depth[depth]
+            chosen = sorted(rng.sample(indices, min(per_depth, len(indices))))
+            instances += [{"id": f"d{depth}-{index}", "depth": depth, "board": unrank_board(index, rows, cols)}
+                          for index in chosen]
+    else:
+        for depth in depths:
+            instances += [{"id": f"w{depth}-{k}", "depth": depth, "board": _random_walk(rows, cols, depth, rng)}
+                          for k in range(per_depth)]
+    return {"rows": rows, "cols": cols, "seed": seed, "per_depth": per_depth,
+            "exact_depth": exact, "instances": instances}
+
+
+def save_json(data, path):
+    """写JSON文件（自动创建目录）"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def combinations(algorithms, heuristics):
+    """求解器×启发式组合（不使用启发式的求解器只出现一次）"""
+    combos = []
+    for algorithm in algorithms:
+        if algorithm in HEURISTIC_FREE:
+            combos.append((algorithm, None))
+        else:
+            combos += [(algorithm, heuristic) for heuristic in heuristics]
+    return combos
+
+
+def run_instance(algorithm, heuristic_type, board, goal_board, max_nodes=100000, memory=True):
+    """
+    运行并测量一个实例
+    计时与内存分开测：tracemalloc 会显著拖慢执行，峰值内存在另一次（被跟踪的）运行中测得
+    Returns:
+        dict: 见 RESULT_FIELDS（不含 algorithm/heuristic/id/depth）
+    """
+    start = time.perf_counter_ns()
+    solver = create_solver(algorithm, board, goal_board)
+    setup = time.perf_counter_ns()
+    try:
+        _, moves, stats = solver.solve(heuristic_type, max_nodes=max_nodes)
+    except ValueError as e:  # 启发式不支持该棋盘（例如行走距离表过大）
+        moves, stats = None, {"error": str(e)}
+    end = time.perf_counter_ns()
+    result = {
+        "solved": bool(stats.get("solution_found")),
+        "path_length": len(moves) if moves is not None else None,
+        "optimal": stats.get("optimal", True) if moves is not None else None,
+        "nodes": stats.get("nodes_expanded", 0),
+        "max_open_size": stats.get("max_open_size", 0),
+        "setup_seconds": (setup - start) / 1e9,
+        "seconds": (end - setup) / 1e9,
+        "peak_kib": None,
+        "error": stats.get("error"),
+    }
+    if memory and result["error"] is None:
+        tracemalloc.start()
+        try:
+            create_solver(algorithm, board, goal_board).solve(heuristic_type, max_nodes=max_nodes)
+            result["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmark(corpus, algorithms=DEFAULT_ALGORITHMS, heuristics=DEFAULT_HEURISTICS,
+                  max_nodes=100000, memory=True, progress=None):
+    """
+    对实例集运行所有求解器×启发式组合
+    Args:
+        corpus: generate_corpus 的返回值（或从文件加载）
+        progress: 可选回调 progress(algorithm, heuristic, done, total)
+    Returns:
+        结果字典列表（字段见 RESULT_FIELDS）；不支持该尺寸的组合（例如行走距离表过大）
+        在预热时被跳过，并在标准错误输出中说明
+    """
+    rows, cols = corpus["rows"], corpus["cols"]
+    goal_board = create_goal_board(rows, cols)
+    candidates = [(a, h) for a, h in combinations(algorithms, heuristics)
+                  if a != "table" or (rows, cols) == (3, 3)]
+    # 先为每个组合预热一次：查找表的加载与构建不计入任何实例
+    warm_board = corpus["instances"][0]["board"] if corpus["instances"] else goal_board
+    combos = []
+    for algorithm, heuristic_type in candidates:
+        try:
+            create_solver(algorithm, warm_board, goal_board).solve(heuristic_type, max_nodes=1)
+        except ValueError as e:
+            print(f"跳过 {algorithm}/{heuristic_type or '-'}: {e}", file=sys.stderr)
+            continue
+        combos.append((algorithm, heuristic_type))
+
+    results = []
+    for algorithm, heuristic_type in combos:
+        for done, instance in enumerate(corpus["instances"], 1):
+            result = {"algorithm": algorithm, "heuristic": heuristic_type or "-",
+                      "id": instance["id"], "depth": instance["depth"]}
+            result.update(run_instance(algorithm, heuristic_type, instance["board"], goal_board,
+                                       max_nodes, memory))
+            results.append(result)
+            if progress is not None:
+                progress(algorithm, heuristic_type, done, len(corpus["instances"]))
+    return results
+
+
+def summarize(results, by_depth=False):
+    """
+    按 (算法, 启发式[, 深度]) 汇总
+    Returns:
+        dict: 键为 "算法/启发式[/深度]"，值为 count、solved、nodes_mean、seconds_median、seconds_p95、
+        path_length_mean（只统计已解实例）与 peak_kib_mean
+    """
+    groups = {}
+    for result in results:
+        key = f"{result['algorithm']}/{result['heuristic']}"
+        if by_depth:
+            key += f"/{result['depth']}"
+        groups.setdefault(key, []).append(result)
+
+    summary = {}
+    for key, group in groups.items():
+        solved = [r for r in group if r["solved"]]
+        seconds = [r["seconds"] for r in group]
+        peaks = [r["peak_kib"] for r in group if r["peak_kib"] is not None]
+        summary[key] = {
+            "count": len(group),
+            "solved": len(solved),
+            "nodes_mean": statistics.mean(r["nodes"] for r in group),
+            "seconds_median": statistics.median(seconds),
+            "seconds_p95": percentile(sorted(seconds), 95),
+            "path_length_mean": statistics.mean(r["path_length"] for r in solved) if solved else None,
+            "peak_kib_mean": statistics.mean(peaks) if peaks else None,
+        }
+    return summary
+
+
+def environment():
+    """运行环境信息（随结果一起保存，便于判断基线是否可比）"""
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "processor": platform.processor(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def write_results(results, path, corpus=None):
+    """按扩展名写出结果：.csv 为逐实例表格，其他为包含环境、汇总与逐实例结果的JSON"""
+    if path.endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        return
+    meta = {key: corpus[key] for key in ("rows", "cols", "seed", "per_depth")} if corpus else {}
+    save_json({"environment": environment(), "corpus": meta, "summary": summarize(results),
+               "summary_by_depth": summarize(results, by_depth=True), "results": results}, path)
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    与基线汇总比较
+    Args:
+        current, baseline: summarize 的返回值（或结果JSON中的 "summary"）
+        threshold: 允许的相对退化幅度（0.10 表示变差超过10%即标记）
+    Returns:
+        退化列表 [{"key", "metric", "baseline", "current", "change"}, ...]；
+        已解实例变少或平均步数变长时 change 为None（属于正确性退化，不看阈值）
+    """
+    regressions = []
+    for key, base in baseline.items():
+        now = current.get(key)
+        if now is None:
+            continue
+        if now["solved"] < base["solved"]:
+            regressions.append({"key": key, "metric": "solved", "baseline": base["solved"],
+                                "current": now["solved"], "change": None})
+        if base["path_length_mean"] is not None and now["path_length_mean"] is not None and \
+                now["solved"] == base["solved"] and now["path_length_mean"] > base["path_length_mean"] + 1e-9:
+            regressions.append({"key": key, "metric": "path_length_mean", "baseline": base["path_length_mean"],
+                                "current": now["path_length_mean"], "change": None})
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append({"key": key, "metric": metric, "baseline": old, "current": new,
+                                    "change": change})
+    return regressions
+
+
+def print_summary(summary):
+    print(f"{'组合':<32} {'实例':>6} {'已解':>6} {'平均节点':>10} {'中位(ms)':>10} {'p95(ms)':>10} "
+          f"{'平均步数':>8} {'峰值KiB':>9}")
+    for key, row in summary.items():
+        length = f"{row['path_length_mean']:.2f}" if row["path_length_mean"] is not None else "-"
+        peak = f"{row['peak_kib_mean']:.1f}" if row["peak_kib_mean"] is not None else "-"
+        print(f"{key:<32} {row['count']:>6} {row['solved']:>6} {row['nodes_mean']:>10.1f} "
+              f"{row['seconds_median'] * 1000:>10.3f} {row['seconds_p95'] * 1000:>10.3f} {length:>8} {peak:>9}")
+
+
+def main(argv=None):
+    """命令行入口；run 与基线比较发现退化时返回1"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="八数码/滑块拼图可复现基准测试")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="生成按深度分层的实例集")
+    generate.add_argument("--per-depth", type=int, default=100)
+    generate.add_argument("--min-depth", type=int, default=0)
+    generate.add_argument("--max-depth", type=int, default=31)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--rows", type=int, default=3)
+    generate.add_argument("--cols", type=int)
+    generate.add_argument("-o", "--output", required=True)
+
+    run = commands.add_parser("run", help="运行基准测试")
+    run.add_argument("corpus")
+    run.add_argument("--algorithms", nargs="+", default=list(DEFAULT_ALGORITHMS))
+    run.add_argument("--heuristics", nargs="+", default=list(DEFAULT_HEURISTICS))
+    run.add_argument("--max-nodes", type=int, default=100000)
+    run.add_argument("--no-memory", action="store_true", help="不测峰值内存（省去一次被跟踪的运行）")
+    run.add_argument("-o", "--output", help="结果文件（.json 或 .csv）")
+    run.add_argument("--baseline", help="基线结果JSON")
+    run.add_argument("--threshold", type=float, default=0.10, help="允许的相对退化幅度")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        corpus = generate_corpus(args.per_depth, range(args.min_depth, args.max_depth + 1), args.seed,
+                                 args.rows, args.cols)
+        save_json(corpus, args.output)
+        print(f"已生成 {len(corpus['instances'])} 个实例: {args.output}")
+        return 0
+
+    corpus = load_json(args.corpus)
+    results = run_benchmark(corpus, args.algorithms, args.heuristics, args.max_nodes, not args.no_memory)
+    summary = summarize(results)
+    print_summary(summary)
+    if args.output:
+        write_results(results, args.output, corpus)
+    if args.baseline:
+        regressions = compare(summary, load_json(args.baseline)["summary"], args.threshold)
+        for item in regressions:
+            change = f"{item['change']:+.1%}" if item["change"] is not None else "正确性"
+            print(f"退化: {item['key']} {item['metric']} {item['baseline']} -> {item['current']} ({change})")
+        if regressions:
+            return 1
+        print(f"与基线相比没有超过 {args.threshold:.0%} 的退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
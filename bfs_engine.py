@@ -0,0 +1,161 @@
+# bfs_engine.py
+# 按层向量化的广度优先搜索引擎，供距离表、模式数据库等查找表的构建共用（需要NumPy）
+# 行走距离表不经过此引擎：其状态是计数矩阵，没有稠密序号；表的规模随线数急剧增长（4x4每个方向约2.5万个状态，
+# 5x5约6500万个），因此只支持到 heuristics.MAX_WALKING_STATES 以内的尺寸，在该范围内字典BFS不到0.2秒即可完成
+import time
+from math import factorial
+from move_tables import get_move_targets
+from permutation_rank import partial_count, partial_rank_array, rank_array
+from table_io import UNKNOWN
+
+try:
+    import numpy as np
+except ImportError:  # 没有NumPy时各表的构建退回逐状态的纯Python实现
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+class PermutationSpace:
+    """
+    完整棋盘状态空间：状态为 (M, cells) 的棋盘数组，
+    序号与 permutation_rank.rank_board 相同（空白格位置 * ((n-1)!/2) + 其余数字Lehmer序号 // 2）
+    """
+
+    def __init__(self, rows, cols=None):
+        cols = rows if cols is None else cols
+        self.cells = rows * cols
+        self.size = factorial(self.cells) // 2
+        self.targets = np.array(get_move_targets(rows, cols), dtype=np.int64)
+
+    def rank(self, states):
+        """批量计算稠密序号（见 permutation_rank.rank_array）"""
+        return rank_array(states)
+
+    def moves(self, states):
+        """按4个方向批量生成子状态；每次移动代价为1"""
+        blank = np.argmax(states == 0, axis=1)
+        rows = np.arange(len(states))
+        for move in range(self.targets.shape[1]):
+            target = self.targets[blank, move]
+            valid = target >= 0
+            children = states[valid].copy()
+            index, from_pos, to_pos = rows[:len(children)], target[valid], blank[valid]
+            children[index, to_pos] = children[index, from_pos]
+            children[index, from_pos] = 0
+            yield children, 1
+
+
+class PatternSpace:
+    """
+    模式数据库的抽象状态空间：状态为 (M, k+1) 数组，前k列为分组数字的位置，最后一列为空白格位置。
+    空白格移到非分组格子代价为0，与分组数字交换代价为1。
+    序号 = 分组位置的k-排列序号 * cells + 空白格位置
+    """
+
+    def __init__(self, rows, cols, k):
+        self.cells = rows * cols
+        self.k = k
+        self.patterns = partial_count(k, self.cells)
+        self.size = self.patterns * self.cells
+        self.targets = np.array(get_move_targets(rows, cols), dtype=np.int64)
+
+    def rank(self, states):
+        return partial_rank_array(states[:, :self.k], self.cells) * self.cells + states[:, self.k]
+
+    def moves(self, states):
+        k = self.k
+        blank = states[:, k]
+        for move in range(self.targets.shape[1]):
+            target = self.targets[blank, move]
+            valid = target >= 0
+            moved, target, old_blank = states[valid], target[valid], blank[valid]
+            hit = moved[:, :k] == target[:, None]  # 目标格上是否是分组数字
+            occupied = hit.any(axis=1)
+
+            free = moved[~occupied].copy()
+            free[:, k] = target[~occupied]
+            yield free, 0
+
+            pushed = moved[occupied].copy()
+            slot = np.argmax(hit[occupied], axis=1)
+            pushed[np.arange(len(pushed)), slot] = old_blank[occupied]
+            pushed[:, k] = target[occupied]
+            yield pushed, 1
+
+
+def run_bfs(space, start_states, progress=None):
+    """
+    按层执行广度优先搜索（支持0/1代价）
+    已访问集合就是以序号为下标的距离数组；每一层先用0代价移动闭包扩展到不动点，
+    再用代价为1的移动整体生成下一层，去重与查重都是数组运算
+    Args:
+        space: 状态空间（提供 size、rank(states)、moves(states)）
+        start_states: 起始状态数组（距离为0）
+        progress: 可选回调，每完成一层调用一次，参数为该层统计字典
+    Returns:
+        distances: 以序号为下标的 uint8 距离数组，不可达为 UNKNOWN
+        layers: 每层统计 [{"depth", "states", "seconds"}, ...]
+    """
+    distances = np.full(space.size, UNKNOWN, dtype=np.uint8)
+
+    def discover(states, depth):
+        """保留尚未访问的状态（按序号去重）并记录距离"""
+        if len(states) == 0:
+            return states
+        ranks = space.rank(states)
+        fresh = distances[ranks] == UNKNOWN
+        ranks, first = np.unique(ranks[fresh], return_index=True)
+        distances[ranks] = depth
+        return states[fresh][first]
+
+    frontier = discover(np.asarray(start_states), 0)
+    layers = []
+    depth = 0
+    while len(frontier):
+        start_time = time.perf_counter()
+        layer = [frontier]
+        pending = frontier
+        next_parts = []
+        while len(pending):
+            zero_parts = []
+            for children, cost in space.moves(pending):
+                (zero_parts if cost == 0 else next_parts).append(children)
+            pending = discover(np.concatenate(zero_parts), depth) if zero_parts else pending[:0]
+            if len(pending):
+                layer.append(pending)
+
+        frontier = discover(np.concatenate(next_parts), depth + 1) if next_parts else frontier[:0]
+        stats = {
+            "depth": depth,
+            "states": sum(len(part) for part in layer),
+            "seconds": time.perf_counter() - start_time,
+        }
+        layers.append(stats)
+        if progress is not None:
+            progress(stats)
+        depth += 1
+    return distances, layers
+
+
+def build_permutation_table(goal_board, progress=None):
+    """完整状态距离表（下标见 PermutationSpace），返回 (bytearray, 每层统计)"""
+    rows, cols = len(goal_board), len(goal_board[0])
+    space = PermutationSpace(rows, cols)
+    start = np.array([[num for row in goal_board for num in row]], dtype=np.int8)
+    distances, layers = run_bfs(space, start, progress)
+    return bytearray(distances.tobytes()), layers
+
+
+def build_pattern_distances(goal_board, tiles, progress=None):
+    """
+    模式数据库分组表（下标为分组位置的k-排列序号），返回 (bytearray, 每层统计)
+    先在含空白格位置的抽象空间中搜索，再对空白格位置取最小值
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    goal_flat = [num for row in goal_board for num in row]
+    space = PatternSpace(rows, cols, len(tiles))
+    start = np.array([[goal_flat.index(tile) for tile in tiles] + [goal_flat.index(0)]], dtype=np.int8)
+    distances, layers = run_bfs(space, start, progress)
+    table = distances.reshape(space.patterns, space.cells).min(axis=1)
+    return bytearray(table.tobytes()), layers
@@ -0,0 +1,188 @@
+# bidirectional.py
+import heapq
+from a_star import AStarSolver
+from packed_state import PackedState, unpack_board
+from search_nodes import NodeStore, build_path_from_moves
+from move_tables import get_successor_table, INVERSE_MOVE
+from goal_context import get_goal_context
+from cancellation import SearchLimit
+
+
+def meet_priority(g, h):
+    """
+    MM算法的优先级 max(f, 2g+1)（单位代价取 epsilon=1）
+    节点只有在g不超过解代价一半时才会被优先扩展，保证两个方向在中间相遇
+    """
+    return max(g + h, 2 * g + 1)
+
+
+class _Frontier:
+    """单个方向的搜索前沿：节点数组、开放列表（二叉堆）与已访问集合"""
+
+    def __init__(self, start_board, heuristic):
+        self.heuristic = heuristic
+        self.nodes = NodeStore()
+        self.open_set = []  # 元组 (priority, h_score, node_id)
+        self.best = {}  # 打包状态 -> 当前最优节点编号
+        self.closed_set = set()
+        self.expanded = 0
+
+        start = PackedState.from_board(start_board)
+        root = self.nodes.add(start.code, start.blank, 0)
+        start_h = heuristic.evaluate(start.code)
+        self.open_set.append((meet_priority(0, start_h), start_h, root))
+        self.best[start.code] = root
+
+    def g_of(self, code):
+        """某状态在该方向上的最优g值，未生成时返回None"""
+        node = self.best.get(code)
+        return None if node is None else self.nodes.g[node]
+
+    def min_priority(self):
+        """开放列表中的最小优先级（顺带丢弃已过期的堆顶条目）"""
+        open_set = self.open_set
+        while open_set:
+            node = open_set[0][2]
+            code = self.nodes.codes[node]
+            if code in self.closed_set or self.best[code] != node:
+                heapq.heappop(open_set)
+                continue
+            return open_set[0][0]
+        return None
+
+
+class BidirectionalAStarSolver(AStarSolver):
+    """双向A*求解器：同时从初始状态和目标状态搜索，在中间相遇"""
+
+    def solve(self, heuristic_type="manhattan", max_nodes=50000, deadline=None, cancel_token=None):
+        """
+        执行双向A*搜索（MM算法）
+        每次扩展两侧中优先级 max(f, 2g+1) 最小的节点；
+        终止条件：已知最优相遇代价 mu <= 两侧最小优先级，该优先级是任何尚未发现的解的代价下界，
+        因此结果仍是最优解。
+        终止条件成立前因节点限制、截止时间或取消而停止时，若已相遇则返回该解，
+        stats 中 stopped 为停止原因、optimal 为False，并给出当时的代价下界 lower_bound。
+        Args:
+            heuristic_type: 启发式函数类型 ("manhattan" 或 "misplaced")
+            max_nodes: 最大扩展节点数限制（两个方向合计）
+            deadline: 截止时间（见 AStarSolver.solve）
+            cancel_token: 取消标记（见 AStarSolver.solve）
+        Returns:
+            solution_path: 解路径（状态列表）
+            moves: 移动序列
+            stats: 统计信息字典
+        """
+        if not self.is_solvable(self.initial_state.board):
+            return None, None, {"error": "该初始状态无解"}
+
+        rows, cols, bits = self.rows, self.cols, self.bits
+        mask = (1 << bits) - 1
+        successors = get_successor_table(rows, cols)
+
+        # 正向朝目标状态估价，反向朝初始状态估价
+        forward = _Frontier(self.initial_state.board, self.goal_context.heuristic(heuristic_type))
+        start_context = get_goal_context(self.initial_state.board)
+        backward = _Frontier(self.goal_board, start_context.heuristic(heuristic_type))
+
+        mu = None  # 当前最优相遇代价
+        meet = None  # (正向节点编号, 反向节点编号)
+        if start_context.goal_key == self.goal_context.goal_key:
+            mu, meet = 0, (0, 0)
+
+        nodes_expanded = 0
+        max_open_size = 2
+        limit = SearchLimit(deadline, cancel_token)
+        next_check = limit.first_check()
+        lower_bound = 0
+        exhausted = False  # 某一侧的开放列表已空：已找到的相遇即为最优
+
+        while nodes_expanded < max_nodes:
+            if nodes_expanded >= next_check:
+                if limit.should_stop():
+                    break
+                next_check = nodes_expanded + limit.interval
+
+            pr_forward, pr_backward = forward.min_priority(), backward.min_priority()
+            if pr_forward is None or pr_backward is None:
+                exhausted = True
+                break
+            lower_bound = min(pr_forward, pr_backward)
+            if mu is not None and mu <= lower_bound:
+                break
+
+            # 扩展优先级较小的一侧
+            if pr_forward <= pr_backward:
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+
+            _, current_h, node = heapq.heappop(side.open_set)
+            nodes = side.nodes
+            code = nodes.codes[node]
+            side.closed_set.add(code)
+            side.expanded += 1
+            nodes_expanded += 1
+
+            blank = nodes.blanks[node]
+            tentative_g = nodes.g[node] + 1
+
+            for move, target in successors[blank][nodes.moves[node]]:
+                tile = (code >> (target * bits)) & mask
+                child = code - (tile << (target * bits)) + (tile << (blank * bits))
+                # 已有不差的路径则跳过；否则（包括已关闭的节点）重新打开
+                child_g = side.g_of(child)
+                if child_g is not None and tentative_g >= child_g:
+                    continue
+                side.closed_set.discard(child)
+
+                child_h = side.heuristic.update(current_h, child, tile, target, blank)
+                child_id = nodes.add(child, target, tentative_g, node, move)
+                side.best[child] = child_id
+                heapq.heappush(side.open_set, (meet_priority(tentative_g, child_h), child_h, child_id))
+
+                # 检查是否与另一方向相遇
+                other_g = other.g_of(child)
+                if other_g is not None and (mu is None or tentative_g + other_g < mu):
+                    mu = tentative_g + other_g
+                    if side is forward:
+                        meet = (child_id, other.best[child])
+                    else:
+                        meet = (other.best[child], child_id)
+
+            max_open_size = max(max_open_size, len(forward.open_set) + len(backward.open_set))
+
+        stats = {
+            "nodes_expanded": nodes_expanded,
+            "nodes_expanded_forward": forward.expanded,
+            "nodes_expanded_backward": backward.expanded,
+            "max_open_size": max_open_size,
+        }
+
+        if meet is None:
+            # 搜索失败（达到节点限制或无解）
+            stats.update({
+                "path_length": 0,
+                "solution_found": False,
+                "error": f"达到最大节点限制 ({max_nodes}) 或问题无解"
+            })
+            if limit.reason is not None:
+                stats.update(limit.stop_stats(), lower_bound=lower_bound)
+            return None, None, stats
+
+        # 拼接路径：正向部分按原顺序，反向部分倒序并取逆移动
+        forward_node, backward_node = meet
+        move_ids = forward.nodes.move_sequence(forward_node)
+        move_ids += [INVERSE_MOVE[m] for m in reversed(backward.nodes.move_sequence(backward_node))]
+        path, moves = build_path_from_moves(self.initial_state.board, move_ids, self.goal_board)
+
+        stats.update({
+            "path_length": len(moves),
+            "solution_found": True,
+            "final_f": mu,
+            "meeting_point": unpack_board(forward.nodes.codes[forward_node], rows, cols),
+            "meeting_depth": forward.nodes.g[forward_node],
+        })
+        if not (exhausted or mu <= lower_bound):
+            # 提前停止（截止时间、取消或节点限制）时已相遇：解有效，但尚未证明最优
+            stats.update(stopped=limit.reason or "max_nodes", optimal=False, lower_bound=lower_bound)
+        return path, moves, stats
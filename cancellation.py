@@ -0,0 +1,92 @@
+# cancellation.py
+import threading
+import time
+from functools import partial
+
+CHECK_INTERVAL = 64  # 每扩展这么多个节点检查一次截止时间与取消标记
+STOP_MESSAGES = {"deadline": "超过截止时间", "cancelled": "已取消"}
+
+
+class CancellationToken:
+    """协作式取消标记：任意线程调用 cancel()，求解器在下一次检查时停止"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+def deadline_after(seconds):
+    """seconds 秒之后的截止时间（time.monotonic() 时钟），None表示不限时"""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+class SearchLimit:
+    """
+    搜索的时间与取消限制
+    求解器在主循环中只比较一次计数器（nodes >= next_check），每 interval 个扩展节点才真正读时钟和取消标记，
+    所以启用限制几乎不增加开销
+    """
+
+    def __init__(self, deadline=None, token=None, interval=CHECK_INTERVAL):
+        """
+        Args:
+            deadline: 截止时间（time.monotonic() 时钟，见 deadline_after），None表示不限时
+            token: CancellationToken，None表示不可取消
+            interval: 检查间隔（扩展节点数）
+        """
+        self.deadline = deadline
+        self.token = token
+        self.interval = interval
+        self.reason = None  # 停止原因："deadline" 或 "cancelled"
+
+    @property
+    def active(self):
+        return self.deadline is not None or self.token is not None
+
+    def first_check(self):
+        """第一次检查时的扩展节点数；没有限制时返回无穷大，主循环的比较永远不成立"""
+        return self.interval if self.active else float("inf")
+
+    def should_stop(self):
+        """检查截止时间与取消标记，需要停止时记录原因并返回True"""
+        if self.token is not None and self.token.cancelled:
+            self.reason = "cancelled"
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = "deadline"
+        return self.reason is not None
+
+    def stop_stats(self):
+        """提前停止时附加到统计信息中的字段"""
+        return {"stopped": self.reason, "error": STOP_MESSAGES[self.reason]}
+
+
+async def solve_async(solver, heuristic_type="manhattan", timeout=None, executor=None, **kwargs):
+    """
+    在执行器线程中运行 solver.solve()，不阻塞事件循环
+    任务被取消时通过取消标记让求解器在下一次检查时停止，再把 CancelledError 抛给调用者；
+    timeout 秒后求解器自行停止并返回部分统计（stats["stopped"] == "deadline"）
+    Args:
+        solver: 求解器对象（见 solvers.SOLVERS）
+        heuristic_type: 启发式函数类型
+        timeout: 时间预算（秒），None表示不限时
+        executor: 线程池，None表示事件循环的默认执行器（取消标记只在同一进程内有效，不能使用进程池）
+        **kwargs: 传给 solve() 的其他参数（如 max_nodes）
+    Returns:
+        (solution_path, moves, stats)
+    """
+    import asyncio  # 延迟导入：求解器都导入本模块，只有异步调用者才需要 asyncio（导入约60毫秒）
+
+    token = CancellationToken()
+    call = partial(solver.solve, heuristic_type, deadline=deadline_after(timeout), cancel_token=token, **kwargs)
+    future = asyncio.get_running_loop().run_in_executor(executor, call)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
@@ -0,0 +1,185 @@
+# cli.py
+# 无交互的流式命令行入口：从标准输入或文件逐行读取棋盘，每个结果输出一行JSON
+# 用法示例：
+#   echo 123456708 | python cli.py
+#   python cli.py boards.txt --workers 4 --heuristic linear_conflict > results.jsonl
+import argparse
+import json
+import sys
+from collections import deque
+from utils import create_goal_board, validate_board
+
+DEFAULT_ALGORITHM = "astar"
+DEFAULT_HEURISTIC = "manhattan"
+
+
+def parse_compact(text):
+    """
+    解析紧凑字符串：含逗号或空白时按分隔符切分，否则每个字符是一个数字（0-9、a-z表示10-35），
+    例如 "123456780"、"123456789abcdef0"、"1,2,3,4,5,6,7,8,0"
+    """
+    text = text.strip()
+    if "," in text or " " in text:
+        return [int(part) for part in text.replace(",", " ").split()]
+    return [int(char, 36) for char in text]
+
+
+def parse_board(value, rows, cols):
+    """
+    把一行输入解析为棋盘（二维列表），无效时返回None
+    Args:
+        value: 二维列表、一维列表或紧凑字符串
+        rows, cols: 期望的棋盘尺寸
+    """
+    if isinstance(value, str):
+        value = parse_compact(value)
+    if not isinstance(value, list) or not value:
+        return None
+    if isinstance(value[0], list):
+        board = value
+    else:
+        if len(value) != rows * cols:
+            return None
+        board = [value[i * cols:(i + 1) * cols] for i in range(rows)]
+    return board if validate_board(board, rows, cols) else None
+
+
+def parse_record(line, rows, cols):
+    """
+    解析一行输入：JSON（二维/一维列表、字符串、或含 "board" 与可选 "id" 的对象）或紧凑字符串
+    Returns:
+        (board, record_id, error): 解析失败时 board 为None、error 为原因
+    """
+    line = line.strip()
+    record_id = None
+    try:
+        value = json.loads(line) if line[0] in "[{\"" else line
+        if isinstance(value, dict):
+            record_id = value.get("id")
+            value = value.get("board")
+        board = parse_board(value, rows, cols)
+    except (ValueError, TypeError, IndexError):
+        board = None
+    error = None if board is not None else f"无法解析为{rows}x{cols}棋盘"
+    return board, record_id, error
+
+
+def format_result(index, record_id, moves, stats, error=None):
+    """一个实例的结果 -> JSON行"""
+    result = {"index": index}
+    if record_id is not None:
+        result["id"] = record_id
+    result["solved"] = bool(stats.get("solution_found"))
+    if result["solved"]:
+        result["moves"] = list(moves)
+        result["length"] = len(moves)
+    result["nodes"] = stats.get("nodes_expanded", 0)
+    result["seconds"] = round(stats.get("seconds", 0.0), 6)
+    error = error or stats.get("error")
+    if error:
+        result["error"] = error
+    return json.dumps(result, ensure_ascii=False)
+
+
+def read_lines(paths, stdin):
+    """依次逐行读取各输入文件（"-" 表示标准输入），跳过空行"""
+    for path in paths or ["-"]:
+        stream = stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in stream:
+                if line.strip():
+                    yield line
+        finally:
+            if stream is not stdin:
+                stream.close()
+
+
+def run(lines, output, goal_board, algorithm=DEFAULT_ALGORITHM, heuristic_type=DEFAULT_HEURISTIC,
+        max_nodes=50000, workers=1, chunk_size=None, max_pending=None):
+    """
+    流式求解：结果按输入顺序写出，每个任务块完成后刷新一次输出
+    Args:
+        lines: 输入行的可迭代对象（惰性读取）
+        output: 输出流
+        其余参数见 batch_solve.solve_stream
+    Returns:
+        (total, solved): 输入实例数与求解成功数
+    """
+    from batch_solve import solve_stream, STREAM_CHUNK_SIZE
+
+    rows, cols = len(goal_board), len(goal_board[0])
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    records = deque()  # 已交给求解器、尚未输出的 (record_id, error)；长度受 solve_stream 的反压限制
+
+    def boards():
+        for line in lines:
+            board, record_id, error = parse_record(line, rows, cols)
+            records.append((record_id, error))
+            yield board
+
+    total = solved = 0
+    for index, moves, stats in solve_stream(boards(), goal_board, heuristic_type, workers, algorithm,
+                                            max_nodes, chunk_size, max_pending):
+        record_id, error = records.popleft()
+        output.write(format_result(index, record_id, moves, stats, error) + "\n")
+        total += 1
+        solved += moves is not None
+        if total % chunk_size == 0:
+            output.flush()
+    output.flush()
+    return total, solved
+
+
+def build_parser():
+    """命令行参数"""
+    parser = argparse.ArgumentParser(
+        description="八数码/滑块拼图批量求解：逐行读取棋盘，每个结果输出一行JSON")
+    parser.add_argument("files", nargs="*", help="输入文件，省略或为 - 时读取标准输入")
+    parser.add_argument("--rows", type=int, default=3, help="棋盘行数（默认3）")
+    parser.add_argument("--cols", type=int, help="棋盘列数（默认与行数相同）")
+    parser.add_argument("--goal", help="目标状态（紧凑字符串或JSON），默认为标准目标")
+    parser.add_argument("--algorithm", default=DEFAULT_ALGORITHM, help="求解算法（默认astar）")
+    parser.add_argument("--heuristic", default=DEFAULT_HEURISTIC, help="启发式函数（默认manhattan）")
+    parser.add_argument("--max-nodes", type=int, default=50000, help="单个实例的最大扩展节点数")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数（默认1，在当前进程内求解）")
+    parser.add_argument("--chunk-size", type=int, help="每个任务块的实例数")
+    parser.add_argument("--max-pending", type=int, help="最多同时在途的任务块数（默认进程数的2倍）")
+    return parser
+
+
+def main(argv=None, stdin=None, stdout=None):
+    """命令行入口，返回退出码（0：全部求解成功，1：存在未求解的实例，2：参数错误）"""
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+    args = build_parser().parse_args(argv)
+    rows = args.rows
+    cols = rows if args.cols is None else args.cols
+
+    from solvers import SOLVERS
+    from heuristics import HEURISTICS
+    if args.algorithm not in SOLVERS or args.heuristic not in HEURISTICS:
+        print(f"未知的算法或启发式: {args.algorithm} / {args.heuristic}", file=sys.stderr)
+        return 2
+    if args.goal is None:
+        goal_board = create_goal_board(rows, cols)
+    else:
+        goal_board, _, error = parse_record(args.goal, rows, cols)
+        if goal_board is None:
+            print(f"目标状态{error}", file=sys.stderr)
+            return 2
+
+    try:
+        total, solved = run(read_lines(args.files, stdin), stdout, goal_board, args.algorithm,
+                            args.heuristic, args.max_nodes, args.workers, args.chunk_size,
+                            args.max_pending)
+    except BrokenPipeError:
+        # 下游提前关闭管道（如 | head），不视为错误
+        return 0
+    except ValueError as e:  # 启发式不支持该尺寸或目标（如5x5的行走距离）
+        print(e, file=sys.stderr)
+        return 2
+    return 0 if solved == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
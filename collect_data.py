@@ -1,12 +1,23 @@
 # collect_data.py - 修复版
 from a_star import AStarSolver
+from solvers import create_solver
+from distance_table import lookup_distance
 from utils import create_goal_board, print_board
 import time
 
+# 参与对比的启发式函数（精确距离只作为最优步数参考，不参与对比）
+COMPARED_HEURISTICS = ["manhattan", "misplaced", "linear_conflict", "walking_distance"]
+HEURISTIC_LABELS = {
+    "manhattan": "曼哈顿",
+    "misplaced": "错位数",
+    "linear_conflict": "线性冲突",
+    "walking_distance": "行走距离",
+}
 
-def collect_performance_data():
+
+def collect_performance_data(algorithm="astar"):
     """收集性能数据"""
-    print("八数码问题A*算法性能数据收集")
+    print(f"八数码问题求解算法性能数据收集（算法: {algorithm}）")
     print("=" * 60)
 
     goal_board = create_goal_board()
@@ -24,7 +35,7 @@ def collect_performance_data():
         ("困难", [[8, 7, 6], [5, 4, 3], [2, 1, 0]]),
     ]
 
-    print(f"{'案例':<10} {'启发式':<12} {'节点数':<10} {'时间(ms)':<10} {'步数':<6}")
+    print(f"{'案例':<10} {'启发式':<16} {'节点数':<10} {'时间(ms)':<10} {'步数':<6}")
     print("-" * 60)
 
     results = []
@@ -34,14 +45,14 @@ def collect_performance_data():
         print(f"\n{name}:")
         print_board(board, "初始状态")
 
-        solver = AStarSolver(board, goal_board)
+        solver = create_solver(algorithm, board, goal_board)
 
         # 检查可解性
         if not solver.is_solvable(board):
             print(f"   该状态无解，跳过")
             continue
 
-        for heuristic in ["manhattan", "misplaced"]:
+        for heuristic in COMPARED_HEURISTICS:
             start_time = time.time()
             path, moves, stats = solver.solve(heuristic, max_nodes=100000)
             end_time = time.time()
@@ -49,7 +60,7 @@ def collect_performance_data():
             # 安全地检查是否有解
             if stats and stats.get("solution_found", False):
                 time_ms = (end_time - start_time) * 1000
-                print(f"  {heuristic:<12} {stats['nodes_expanded']:<10} "
+                print(f"  {heuristic:<16} {stats['nodes_expanded']:<10} "
                       f"{time_ms:<10.2f} {stats['path_length']:<6}")
 
                 results.append({
@@ -61,15 +72,16 @@ def collect_performance_data():
                 })
             else:
                 error_msg = stats.get('error', '未知错误') if stats else '无返回结果'
-                print(f"  {heuristic:<12} {'失败':<10} {'-':<10} {'-':<6} ({error_msg})")
+                print(f"  {heuristic:<16} {'失败':<10} {'-':<10} {'-':<6} ({error_msg})")
 
     print("=" * 60)
 
     # 分析结果
     if results:
-        print("\n性能对比分析:")
-        print(f"{'案例':<10} {'曼哈顿':<8} {'错位数':<8} {'效率比':<8}")
-        print("-" * 40)
+        print("\n性能对比分析（扩展节点数）:")
+        header = "".join(f"{HEURISTIC_LABELS[h]:<10}" for h in COMPARED_HEURISTICS)
+        print(f"{'案例':<10} {header}{'错位数/曼哈顿':<8}")
+        print("-" * 70)
 
         # 按案例分组
         cases_data = {}
@@ -79,27 +91,34 @@ def collect_performance_data():
             cases_data[r['case']][r['heuristic']] = r['nodes']
 
         for case_name in sorted(cases_data.keys()):
-            manhattan_nodes = cases_data[case_name].get('manhattan', 0)
-            misplaced_nodes = cases_data[case_name].get('misplaced', 0)
-
-            if manhattan_nodes > 0 and misplaced_nodes > 0:
-                efficiency = misplaced_nodes / manhattan_nodes
-                print(f"{case_name:<10} {manhattan_nodes:<8} {misplaced_nodes:<8} {efficiency:<8.2f}")
+            nodes = cases_data[case_name]
+            row = "".join(f"{nodes.get(h, '-'):<10}" for h in COMPARED_HEURISTICS)
+            manhattan_nodes = nodes.get('manhattan', 0)
+            misplaced_nodes = nodes.get('misplaced', 0)
+            efficiency = f"{misplaced_nodes / manhattan_nodes:.2f}" if manhattan_nodes and misplaced_nodes else "-"
+            print(f"{case_name:<10} {row}{efficiency:<8}")
 
         # 总体统计
-        manhattan_results = [r for r in results if r['heuristic'] == 'manhattan']
-        misplaced_results = [r for r in results if r['heuristic'] == 'misplaced']
+        averages = {}
+        for h in COMPARED_HEURISTICS:
+            h_results = [r['nodes'] for r in results if r['heuristic'] == h]
+            if h_results:
+                averages[h] = sum(h_results) / len(h_results)
 
-        if manhattan_results and misplaced_results:
-            avg_manhattan = sum(r['nodes'] for r in manhattan_results) / len(manhattan_results)
-            avg_misplaced = sum(r['nodes'] for r in misplaced_results) / len(misplaced_results)
+        if 'manhattan' in averages and 'misplaced' in averages:
+            avg_manhattan = averages['manhattan']
+            avg_misplaced = averages['misplaced']
+            row = "".join(f"{averages.get(h, 0):<10.1f}" for h in COMPARED_HEURISTICS)
 
-            print("-" * 40)
-            print(f"{'平均':<10} {avg_manhattan:<8.1f} {avg_misplaced:<8.1f} "
-                  f"{avg_misplaced / avg_manhattan:<8.2f}")
+            print("-" * 70)
+            print(f"{'平均':<10} {row}{avg_misplaced / avg_manhattan:<8.2f}")
 
             print(f"\n结论：曼哈顿距离启发式平均效率是错位数的 "
                   f"{avg_misplaced / avg_manhattan:.2f} 倍")
+            for h in ("linear_conflict", "walking_distance"):
+                if h in averages and averages[h] > 0:
+                    print(f"      {HEURISTIC_LABELS[h]}启发式平均扩展节点数为曼哈顿距离的 "
+                          f"{averages[h] / avg_manhattan:.2f} 倍")
 
 
 def verify_solution_lengths():
@@ -129,6 +148,7 @@ def verify_solution_lengths():
         if stats.get("solution_found", False):
             actual = stats['path_length']
             print(f"  预期步数: {expected}")
+            print(f"  查表步数: {lookup_distance(board)}")
             print(f"  实际步数: {actual}")
             print(f"  解路径: {' → '.join(moves)}")
 
@@ -149,6 +169,11 @@ def verify_solution_lengths():
 
 
 if __name__ == "__main__":
+    import sys
+
+    # 可通过命令行参数选择算法，例如: python collect_data.py table
+    algorithm = sys.argv[1] if len(sys.argv) > 1 else "astar"
+
     # 先验证解路径长度
     verify_solution_lengths()
 
@@ -156,4 +181,4 @@ if __name__ == "__main__":
     print("开始收集性能数据...")
     print("=" * 60)
 
-    collect_performance_data()
\ No newline at end of file
+    collect_performance_data(algorithm)
\ No newline at end of file
@@ -0,0 +1,68 @@
+# goal_context.py
+from collections import OrderedDict
+from packed_state import pack_board, tile_bits
+from heuristics import create_heuristic
+
+GOAL_CACHE_SIZE = 32  # 最多缓存的目标状态数量
+
+
+class GoalContext:
+    """目标状态上下文：每个目标棋盘只构建一次，保存该目标下预计算的启发式查找表"""
+
+    def __init__(self, goal_board):
+        """
+        初始化目标上下文
+        Args:
+            goal_board: 目标状态棋盘
+        """
+        self.goal_board = [row[:] for row in goal_board]
+        self.rows = len(goal_board)
+        self.cols = len(goal_board[0])
+        self.bits = tile_bits(self.rows * self.cols)
+        self.goal_flat = [num for row in goal_board for num in row]
+        self.goal_key = pack_board(goal_board)
+        self._heuristics = {}
+
+    def heuristic(self, heuristic_type):
+        """获取该目标下的启发式函数对象（首次使用时构建查找表）"""
+        if heuristic_type not in self._heuristics:
+            self._heuristics[heuristic_type] = create_heuristic(heuristic_type, self.goal_board)
+        return self._heuristics[heuristic_type]
+
+    def h(self, board, heuristic_type="manhattan"):
+        """计算棋盘到目标的启发式函数值"""
+        return self.heuristic(heuristic_type).evaluate(pack_board(board))
+
+
+_goal_cache = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def get_goal_context(goal_board):
+    """获取目标上下文（按目标棋盘缓存，超出容量时淘汰最久未使用的项）"""
+    key = (len(goal_board), len(goal_board[0]), pack_board(goal_board))
+    context = _goal_cache.get(key)
+    if context is not None:
+        _goal_cache.move_to_end(key)
+        _cache_stats["hits"] += 1
+        return context
+
+    _cache_stats["misses"] += 1
+    context = GoalContext(goal_board)
+    _goal_cache[key] = context
+    if len(_goal_cache) > GOAL_CACHE_SIZE:
+        _goal_cache.popitem(last=False)
+    return context
+
+
+def goal_cache_info():
+    """目标上下文缓存的统计信息"""
+    return {"hits": _cache_stats["hits"], "misses": _cache_stats["misses"],
+            "size": len(_goal_cache), "max_size": GOAL_CACHE_SIZE}
+
+
+def clear_goal_cache():
+    """清空目标上下文缓存"""
+    _goal_cache.clear()
+    _cache_stats["hits"] = 0
+    _cache_stats["misses"] = 0
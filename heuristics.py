@@ -0,0 +1,409 @@
+# heuristics.py
+from packed_state import tile_bits
+from permutation_rank import rank_code
+from relabel import Relabeling, canonical_goal
+from symmetry import stored_frame
+
+
+class Heuristic:
+    """
+    启发式函数基类
+    除了完整计算 evaluate() 之外，还提供增量形式 update()：
+    一次滑动只改变一个数字的位置，由父状态的h值和这次移动直接得到子状态的h值
+    """
+
+    name = None
+
+    def __init__(self, goal_board):
+        """
+        初始化启发式函数
+        Args:
+            goal_board: 目标状态棋盘
+        """
+        self.goal_board = goal_board
+        self.rows = len(goal_board)
+        self.cols = len(goal_board[0])
+        self.cells = self.rows * self.cols
+        self.bits = tile_bits(self.cells)
+        self.goal_flat = [num for row in goal_board for num in row]
+
+    def tiles(self, code):
+        """把打包状态拆成一维数字列表"""
+        mask = (1 << self.bits) - 1
+        return [(code >> (k * self.bits)) & mask for k in range(self.cells)]
+
+    def evaluate(self, code):
+        """完整计算打包状态的h值"""
+        raise NotImplementedError
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        """
+        增量计算子状态的h值
+        Args:
+            h: 父状态的h值
+            code: 子状态的打包编码
+            tile: 被移动的数字
+            from_pos: 数字移动前的一维下标
+            to_pos: 数字移动后的一维下标（即父状态的空白格）
+        """
+        return self.evaluate(code)
+
+
+class ManhattanHeuristic(Heuristic):
+    """曼哈顿距离：预计算 数字×位置 -> 距离 表"""
+
+    name = "manhattan"
+
+    def __init__(self, goal_board):
+        super().__init__(goal_board)
+        # table[tile * cells + pos]：数字tile在pos处到目标位置的曼哈顿距离，空白格恒为0
+        self.table = [0] * (self.cells * self.cells)
+        for goal_pos, tile in enumerate(self.goal_flat):
+            if tile == 0:
+                continue
+            goal_i, goal_j = divmod(goal_pos, self.cols)
+            for pos in range(self.cells):
+                i, j = divmod(pos, self.cols)
+                self.table[tile * self.cells + pos] = abs(i - goal_i) + abs(j - goal_j)
+
+    def evaluate(self, code):
+        table, cells = self.table, self.cells
+        return sum(table[tile * cells + pos] for pos, tile in enumerate(self.tiles(code)))
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        base = tile * self.cells
+        return h + self.table[base + to_pos] - self.table[base + from_pos]
+
+
+class MisplacedHeuristic(Heuristic):
+    """错位数"""
+
+    name = "misplaced"
+
+    def evaluate(self, code):
+        goal_flat = self.goal_flat
+        return sum(1 for pos, tile in enumerate(self.tiles(code))
+                   if tile != 0 and tile != goal_flat[pos])
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        goal_flat = self.goal_flat
+        return h + (goal_flat[to_pos] != tile) - (goal_flat[from_pos] != tile)
+
+
+# 线性冲突逐线缓存的条目上限：3x3全部可能的线只有约3000种，不会触及；
+# 4x4/5x5可能的线分别有约35万、数千万种，启发式随目标上下文长期缓存（服务、命令行），满了就清空重来
+LINE_CACHE_LIMIT = 1 << 16
+
+
+class LinearConflictHeuristic(ManhattanHeuristic):
+    """
+    曼哈顿距离 + 线性冲突：同一行（列）中目标也在该行（列）的数字若相对次序颠倒，
+    至少有一个要先离开再回来，每个需要让路的数字额外加2步
+    """
+
+    name = "linear_conflict"
+
+    def __init__(self, goal_board):
+        super().__init__(goal_board)
+        rows, cols = self.rows, self.cols
+        self.goal_pos = [0] * self.cells
+        for pos, tile in enumerate(self.goal_flat):
+            self.goal_pos[tile] = pos
+        # 每条线包含的格子下标
+        self.row_lines = [[i * cols + j for j in range(cols)] for i in range(rows)]
+        self.col_lines = [[i * cols + j for i in range(rows)] for j in range(cols)]
+        self._cache = {}  # (是否为列, 线编号, 线上数字) -> 冲突数，条目数不超过 LINE_CACHE_LIMIT
+
+    def line_conflicts(self, is_col, index, values):
+        """
+        一条线上需要让路的数字个数 = 目标同线的数字个数 - 目标位置最长递增子序列长度
+        结果按线上数字缓存
+        """
+        key = (is_col, index, values)
+        count = self._cache.get(key)
+        if count is None:
+            cols = self.cols
+            order = []  # 目标也在该线上的数字的目标坐标（沿线方向）
+            for tile in values:
+                if tile == 0:
+                    continue
+                goal_i, goal_j = divmod(self.goal_pos[tile], cols)
+                if is_col and goal_j == index:
+                    order.append(goal_i)
+                elif not is_col and goal_i == index:
+                    order.append(goal_j)
+            longest = [1] * len(order)
+            for a in range(len(order)):
+                for b in range(a):
+                    if order[b] < order[a] and longest[b] + 1 > longest[a]:
+                        longest[a] = longest[b] + 1
+            count = len(order) - max(longest, default=0)
+            if len(self._cache) >= LINE_CACHE_LIMIT:
+                self._cache.clear()
+            self._cache[key] = count
+        return count
+
+    def evaluate(self, code):
+        tiles = self.tiles(code)
+        conflicts = 0
+        for index, line in enumerate(self.row_lines):
+            conflicts += self.line_conflicts(False, index, tuple(tiles[pos] for pos in line))
+        for index, line in enumerate(self.col_lines):
+            conflicts += self.line_conflicts(True, index, tuple(tiles[pos] for pos in line))
+        return super().evaluate(code) + 2 * conflicts
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        """
+        横向移动不改变各行内数字的相对次序，只影响起止两列；纵向移动同理只影响两行。
+        只重算这两条线在父、子状态下的冲突数
+        """
+        h = super().update(h, code, tile, from_pos, to_pos)
+        bits, mask, cols = self.bits, (1 << self.bits) - 1, self.cols
+        is_col = from_pos // cols == to_pos // cols
+        if is_col:
+            indices, lines = (from_pos % cols, to_pos % cols), self.col_lines
+        else:
+            indices, lines = (from_pos // cols, to_pos // cols), self.row_lines
+        delta = 0
+        for index in indices:
+            line = lines[index]
+            child = tuple((code >> (pos * bits)) & mask for pos in line)
+            # 父状态：数字还在from_pos，空白格在to_pos
+            parent = tuple(tile if pos == from_pos else 0 if pos == to_pos else value
+                           for pos, value in zip(line, child))
+            delta += self.line_conflicts(is_col, index, child) - self.line_conflicts(is_col, index, parent)
+        return h + 2 * delta
+
+
+# 行走距离表缓存：(线数, 每条线格子数, 目标空白格所在线) -> {状态: 步数}，超过规模上限的记为None
+_walking_tables = {}
+# 行走距离表的状态数上限：4x4 每个方向约2.5万个状态，不到0.2秒即可建好；
+# 5x5 每个方向约6500万个状态，字典BFS无法在合理时间和内存内完成，超过上限即放弃
+MAX_WALKING_STATES = 150000
+
+
+def get_walking_table(lines, line_cells, blank_line):
+    """
+    构建（或取缓存）单个方向的行走距离表
+    状态只记录“第r条线上有多少个目标属于第g条线的数字”以及空白格所在的线，
+    空白格每次与相邻线上任一数字交换；从目标状态做广度优先搜索得到每个状态的最少纵向（横向）步数
+    Args:
+        lines: 线的数目（纵向为行数，横向为列数）
+        line_cells: 每条线的格子数
+        blank_line: 目标状态中空白格所在的线
+    Returns:
+        dict: (计数矩阵按行展开的元组 + (空白格所在线,)) -> 步数
+    Raises:
+        ValueError: 状态数超过 MAX_WALKING_STATES（如5x5），构建在达到上限时立即停止，结果也会被缓存
+    """
+    key = (lines, line_cells, blank_line)
+    if key in _walking_tables:
+        table = _walking_tables[key]
+        if table is None:
+            raise ValueError(_walking_size_error(lines, line_cells))
+        return table
+
+    goal = [0] * (lines * lines)
+    for r in range(lines):
+        goal[r * lines + r] = line_cells - (r == blank_line)
+    start = tuple(goal) + (blank_line,)
+    table = {start: 0}
+    frontier = [start]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for state in frontier:
+            blank = state[-1]
+            for other in (blank - 1, blank + 1):
+                if not 0 <= other < lines:
+                    continue
+                for g in range(lines):
+                    if state[other * lines + g] == 0:
+                        continue
+                    child = list(state)
+                    child[other * lines + g] -= 1
+                    child[blank * lines + g] += 1
+                    child[-1] = other
+                    child = tuple(child)
+                    if child not in table:
+                        table[child] = depth
+                        next_frontier.append(child)
+                        if len(table) > MAX_WALKING_STATES:
+                            _walking_tables[key] = None
+                            raise ValueError(_walking_size_error(lines, line_cells))
+        frontier = next_frontier
+    _walking_tables[key] = table
+    return table
+
+
+def _walking_size_error(lines, line_cells):
+    return f"行走距离表过大（{lines}条线、每条{line_cells}格超过{MAX_WALKING_STATES}个状态），请改用其他启发式"
+
+
+class WalkingDistanceHeuristic(Heuristic):
+    """
+    行走距离：纵向、横向分别只看每个数字在哪一行（列）、目标在哪一行（列），
+    查预计算表得到两个方向各自的最少步数之和。每次滑动只计入一个方向，因此可采纳，且不弱于曼哈顿距离。
+    表的规模随线数急剧增长，只支持到4x4左右（见 MAX_WALKING_STATES），更大的棋盘创建时抛出 ValueError
+    """
+
+    name = "walking_distance"
+
+    def __init__(self, goal_board):
+        super().__init__(goal_board)
+        rows, cols = self.rows, self.cols
+        self.goal_row = [0] * self.cells
+        self.goal_col = [0] * self.cells
+        for pos, tile in enumerate(self.goal_flat):
+            self.goal_row[tile], self.goal_col[tile] = divmod(pos, cols)
+        goal_blank = self.goal_flat.index(0)
+        self.vertical = get_walking_table(rows, cols, goal_blank // cols)
+        self.horizontal = get_walking_table(cols, rows, goal_blank % cols)
+
+    def axis_counts(self, tiles, is_col):
+        """单个方向的计数矩阵（按行展开）与空白格所在线"""
+        cols = self.cols
+        if is_col:
+            lines, goal_line = cols, self.goal_col
+        else:
+            lines, goal_line = self.rows, self.goal_row
+        counts = [0] * (lines * lines)
+        blank = 0
+        for pos, tile in enumerate(tiles):
+            line = pos % cols if is_col else pos // cols
+            if tile == 0:
+                blank = line
+            else:
+                counts[line * lines + goal_line[tile]] += 1
+        return counts, blank
+
+    def evaluate(self, code):
+        tiles = self.tiles(code)
+        counts, blank = self.axis_counts(tiles, False)
+        h = self.vertical[tuple(counts) + (blank,)]
+        counts, blank = self.axis_counts(tiles, True)
+        return h + self.horizontal[tuple(counts) + (blank,)]
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        """一次滑动只改变一个方向的计数矩阵，只重算该方向"""
+        cols = self.cols
+        is_col = from_pos // cols == to_pos // cols
+        if is_col:
+            lines, table = cols, self.horizontal
+            goal_line, from_line, to_line = self.goal_col[tile], from_pos % cols, to_pos % cols
+        else:
+            lines, table = self.rows, self.vertical
+            goal_line, from_line, to_line = self.goal_row[tile], from_pos // cols, to_pos // cols
+        counts, blank = self.axis_counts(self.tiles(code), is_col)
+        child_distance = table[tuple(counts) + (blank,)]
+        # 父状态：数字还在from_line，空白格在to_line
+        counts[to_line * lines + goal_line] -= 1
+        counts[from_line * lines + goal_line] += 1
+        return h + child_distance - table[tuple(counts) + (to_line,)]
+
+
+class ExactHeuristic(Heuristic):
+    """精确距离：查八数码全状态距离表（完美启发式，支持任意3x3目标，经重标记查规范目标的表）"""
+
+    name = "exact"
+
+    def __init__(self, goal_board):
+        super().__init__(goal_board)
+        from distance_table import get_distance_table, is_table_goal
+        if not is_table_goal(goal_board):
+            raise ValueError("精确距离启发式只支持3x3棋盘")
+        self.relabeling = Relabeling(goal_board)
+        blank, self.transposition = stored_frame(self.rows, self.cols, self.relabeling.blank)
+        self.table = get_distance_table(blank)
+
+    def evaluate(self, code):
+        code = self.relabeling.code(code)
+        if self.transposition is not None:
+            code = self.transposition.code(code)
+        return self.table[rank_code(code, self.rows, self.cols)]
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        return self.evaluate(code)
+
+
+class PatternDatabaseHeuristic(Heuristic):
+    """加性模式数据库：各不相交分组查表值之和，适用于4x4、5x5等大棋盘（表首次使用时构建并缓存到磁盘）"""
+
+    name = "pdb"
+
+    def __init__(self, goal_board, partition=None):
+        """
+        Args:
+            goal_board: 目标状态棋盘；表为同一空白格位置的规范目标构建，所有这类目标共用，
+                互为转置的两个空白格位置也共用一组表（见 symmetry.stored_frame）
+            partition: 分组（按goal_board中的数字编号），默认使用 pattern_db.DEFAULT_PARTITIONS
+        """
+        super().__init__(goal_board)
+        from pattern_db import get_pattern_database
+        relabeling = Relabeling(goal_board)
+        blank, transposition = stored_frame(self.rows, self.cols, relabeling.blank)
+        # 原编号 -> 表框架中的编号，原位置 -> 表框架中的位置
+        labels = relabeling.forward
+        self.position_of = list(range(self.cells))
+        if transposition is not None:
+            labels = [transposition.labels[tile] for tile in labels]
+            self.position_of = transposition.positions
+        if partition is not None:
+            partition = tuple(tuple(labels[tile] for tile in group) for group in partition)
+        self.database = get_pattern_database(canonical_goal(self.rows, self.cols, blank), partition)
+        # 原编号 -> 分组/组内序号，查表时不必逐个换成表框架的编号
+        self.group_of = [self.database.group_of[labels[tile]] for tile in range(self.cells)]
+        self.slot_of = [self.database.slot_of[labels[tile]] for tile in range(self.cells)]
+        self.labels = None if transposition is None and relabeling.is_identity else labels
+
+    def evaluate(self, code):
+        tiles = self.tiles(code)
+        if self.labels is not None:
+            mapped = [0] * self.cells
+            for pos, tile in enumerate(tiles):
+                mapped[self.position_of[pos]] = self.labels[tile]
+            tiles = mapped
+        return self.database.lookup(tiles)
+
+    def update(self, h, code, tile, from_pos, to_pos):
+        """只有被移动数字所在分组的查表值会变化"""
+        database = self.database
+        g = self.group_of[tile]
+        if g == -1:
+            return h
+        group_of, slot_of, position_of = self.group_of, self.slot_of, self.position_of
+        bits, mask = self.bits, (1 << self.bits) - 1
+        positions = [0] * len(database.partition[g])
+        for pos in range(self.cells):
+            value = (code >> (pos * bits)) & mask
+            if group_of[value] == g:
+                positions[slot_of[value]] = position_of[pos]
+        child = database.group_value(g, positions)
+        # 父状态：该数字还在from_pos
+        positions[slot_of[tile]] = position_of[from_pos]
+        return h + child - database.group_value(g, positions)
+
+
+# 启发式函数注册表：名称 -> 类
+HEURISTICS = {
+    ManhattanHeuristic.name: ManhattanHeuristic,
+    MisplacedHeuristic.name: MisplacedHeuristic,
+    LinearConflictHeuristic.name: LinearConflictHeuristic,
+    WalkingDistanceHeuristic.name: WalkingDistanceHeuristic,
+    ExactHeuristic.name: ExactHeuristic,
+    PatternDatabaseHeuristic.name: PatternDatabaseHeuristic,
+}
+
+
+def register_heuristic(cls):
+    """注册启发式函数类（可用作类装饰器）"""
+    HEURISTICS[cls.name] = cls
+    return cls
+
+
+def create_heuristic(heuristic_type, goal_board):
+    """按名称创建启发式函数对象"""
+    if heuristic_type not in HEURISTICS:
+        raise ValueError(f"未知的启发式类型: {heuristic_type}")
+    return HEURISTICS[heuristic_type](goal_board)
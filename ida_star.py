@@ -0,0 +1,156 @@
+# ida_star.py
+from array import array
+from a_star import AStarSolver
+from packed_state import PackedState
+from search_nodes import build_path_from_moves
+from move_tables import NO_MOVE
+from cancellation import SearchLimit
+
+
+class TranspositionTable:
+    """
+    固定大小的置换表（直接映射，冲突时直接覆盖旧条目）
+    记录本轮迭代中访问某状态时的最小g值，内存占用与搜索规模无关
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.keys = [None] * size  # 打包状态
+        self.g = array("i", [0] * size)  # 访问时的g值
+        self.stamps = array("i", [-1] * size)  # 写入时的迭代编号
+        self.hits = 0
+        self.evictions = 0
+
+    def slot(self, code):
+        """乘法散列：打包编码的低位只对应前几个格子，直接取模冲突严重"""
+        return (((hash(code) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % self.size
+
+    def should_prune(self, code, g, iteration):
+        """
+        本轮迭代已用不大于g的代价访问过该状态时返回True（剪枝），否则记录本次访问
+        """
+        slot = self.slot(code)
+        if self.stamps[slot] == iteration and self.keys[slot] == code:
+            if self.g[slot] <= g:
+                self.hits += 1
+                return True
+        elif self.stamps[slot] == iteration:
+            self.evictions += 1
+        self.keys[slot] = code
+        self.g[slot] = g
+        self.stamps[slot] = iteration
+        return False
+
+
+class IDAStarSolver(AStarSolver):
+    """IDA*（迭代加深A*）求解器：按f值阈值做深度优先搜索，内存占用近似恒定"""
+
+    def solve(self, heuristic_type="manhattan", max_nodes=50000, tt_size=0,
+              deadline=None, cancel_token=None):
+        """
+        执行IDA*搜索
+        Args:
+            heuristic_type: 启发式函数类型 ("manhattan" 或 "misplaced")
+            max_nodes: 最大扩展节点数限制（所有迭代合计）
+            tt_size: 置换表大小，0表示不使用置换表
+            deadline: 截止时间（见 AStarSolver.solve）
+            cancel_token: 取消标记（见 AStarSolver.solve）
+        Returns:
+            solution_path: 解路径（状态列表）
+            moves: 移动序列
+            stats: 统计信息字典
+        """
+        if not self.is_solvable(self.initial_state.board):
+            return None, None, {"error": "该初始状态无解"}
+
+        heuristic = self.goal_context.heuristic(heuristic_type)
+        goal_key = self.goal_context.goal_key
+        state = PackedState.from_board(self.initial_state.board)
+        table = TranspositionTable(tt_size) if tt_size > 0 else None
+
+        path_moves = []  # 当前搜索路径上的移动编号
+        counters = {"expanded": 0, "max_depth": 0, "next_bound": None, "limit": False}
+        limit = SearchLimit(deadline, cancel_token)
+        counters["next_check"] = limit.first_check()
+
+        def search(g, h, last_move, bound, iteration):
+            """深度优先搜索，原地执行/撤销移动；找到目标返回True"""
+            f = g + h
+            if f > bound:
+                if counters["next_bound"] is None or f < counters["next_bound"]:
+                    counters["next_bound"] = f
+                return False
+            if state.code == goal_key:
+                return True
+            if counters["expanded"] >= max_nodes:
+                counters["limit"] = True
+                return False
+            if counters["expanded"] >= counters["next_check"]:
+                if limit.should_stop():
+                    counters["limit"] = True
+                    return False
+                counters["next_check"] = counters["expanded"] + limit.interval
+            if table is not None and table.should_prune(state.code, g, iteration):
+                return False
+
+            counters["expanded"] += 1
+            counters["max_depth"] = max(counters["max_depth"], g + 1)
+
+            for move, target in state.legal_moves(last_move):
+                blank = state.blank
+                tile = state.apply(move)
+                child_h = heuristic.update(h, state.code, tile, target, blank)
+                path_moves.append(move)
+                if search(g + 1, child_h, move, bound, iteration):
+                    return True
+                path_moves.pop()
+                state.undo(move)
+                if counters["limit"]:
+                    return False
+            return False
+
+        start_h = heuristic.evaluate(state.code)
+        bound = start_h
+        thresholds = []
+        nodes_per_threshold = []
+        found = False
+
+        while True:
+            iteration = len(thresholds)
+            counters["next_bound"] = None
+            expanded_before = counters["expanded"]
+
+            found = search(0, start_h, NO_MOVE, bound, iteration)
+
+            thresholds.append(bound)
+            nodes_per_threshold.append(counters["expanded"] - expanded_before)
+            if found or counters["limit"] or counters["next_bound"] is None:
+                break
+            bound = counters["next_bound"]
+
+        stats = {
+            "nodes_expanded": counters["expanded"],
+            "solution_found": found,
+            "max_open_size": counters["max_depth"],  # 深度优先搜索只保存当前路径
+            "iterations": len(thresholds),
+            "thresholds": thresholds,
+            "nodes_per_threshold": nodes_per_threshold,
+        }
+        if table is not None:
+            stats["tt_size"] = table.size
+            stats["tt_hits"] = table.hits
+            stats["tt_evictions"] = table.evictions
+
+        if found:
+            path, moves = build_path_from_moves(self.initial_state.board, path_moves, self.goal_board)
+            stats["path_length"] = len(moves)
+            stats["final_f"] = bound
+            return path, moves, stats
+
+        # 搜索失败（达到节点限制或无解）
+        stats["path_length"] = 0
+        stats["error"] = f"达到最大节点限制 ({max_nodes}) 或问题无解"
+        if limit.reason is not None:
+            # 提前停止：当前阈值是最优解长度的下界
+            stats.update(limit.stop_stats(), lower_bound=bound)
+        return None, None, stats
@@ -1,13 +1,11 @@
 # main.py - 简化版本，避免argparse问题
 import sys
-import tkinter as tk
-from tkinter import messagebox
 
 
 def run_gui():
     """运行图形界面"""
     try:
-        from puzzle_gui import PuzzleGUI
+        from puzzle_gui import PuzzleGUI  # tkinter只在启动图形界面时导入
         print("启动八数码问题求解器图形界面...")
         app = PuzzleGUI()
         app.run()
@@ -74,12 +72,16 @@ def run_console():
                 print("\n选择启发式函数:")
                 print("  1. manhattan (曼哈顿距离)")
                 print("  2. misplaced (错位数)")
-                heuristic_choice = input("请选择启发式函数 (1或2): ").strip()
+                print("  3. linear_conflict (曼哈顿距离+线性冲突)")
+                print("  4. walking_distance (行走距离)")
+                heuristic_choice = input("请选择启发式函数 (1-4): ").strip()
 
-                if heuristic_choice == "1":
-                    heuristic_type = "manhattan"
-                elif heuristic_choice == "2":
+                if heuristic_choice == "2":
                     heuristic_type = "misplaced"
+                elif heuristic_choice == "3":
+                    heuristic_type = "linear_conflict"
+                elif heuristic_choice == "4":
+                    heuristic_type = "walking_distance"
                 else:
                     heuristic_type = "manhattan"
 
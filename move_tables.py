@@ -0,0 +1,57 @@
+# move_tables.py
+
+# 移动方向编号与名称：上、下、左、右（指空白格的移动方向）
+MOVE_NAMES = ("上", "下", "左", "右")
+MOVE_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))  # 空白格的行列偏移
+INVERSE_MOVE = (1, 0, 3, 2)  # 每个移动的逆移动
+TRANSPOSED_MOVE = (2, 3, 0, 1)  # 棋盘转置后对应的移动：上<->左，下<->右
+NO_MOVE = -1  # 根节点没有移动方向
+
+_target_tables = {}
+_successor_tables = {}
+
+
+def get_move_targets(rows, cols=None):
+    """
+    获取移动目标表（按棋盘尺寸缓存）
+    Returns:
+        targets[blank][move]: 空白格在blank处执行move后的新下标，非法移动为-1
+    """
+    cols = rows if cols is None else cols
+    key = (rows, cols)
+    if key not in _target_tables:
+        table = []
+        for blank in range(rows * cols):
+            blank_i, blank_j = divmod(blank, cols)
+            row = []
+            for di, dj in MOVE_DELTAS:
+                new_i, new_j = blank_i + di, blank_j + dj
+                if 0 <= new_i < rows and 0 <= new_j < cols:
+                    row.append(new_i * cols + new_j)
+                else:
+                    row.append(-1)
+            table.append(tuple(row))
+        _target_tables[key] = tuple(table)
+    return _target_tables[key]
+
+
+def get_successor_table(rows, cols=None):
+    """
+    获取带父移动剪枝的后继表（按棋盘尺寸缓存）
+    Returns:
+        successors[blank][last_move]: (move, target) 元组序列，已排除last_move的逆移动；
+        last_move 为 NO_MOVE(-1) 时恰好取到最后一项，即不剪枝的全部合法移动
+    """
+    cols = rows if cols is None else cols
+    key = (rows, cols)
+    if key not in _successor_tables:
+        targets = get_move_targets(rows, cols)
+        table = []
+        for blank in range(rows * cols):
+            legal = [(move, target) for move, target in enumerate(targets[blank]) if target != -1]
+            entry = [tuple(m for m in legal if m[0] != INVERSE_MOVE[last_move])
+                     for last_move in range(len(MOVE_NAMES))]
+            entry.append(tuple(legal))
+            table.append(tuple(entry))
+        _successor_tables[key] = tuple(table)
+    return _successor_tables[key]
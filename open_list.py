@@ -0,0 +1,91 @@
+# open_list.py
+import heapq
+
+
+class HeapOpenList:
+    """基于二叉堆的开放列表，元素按 (f, h, node_id) 排序"""
+
+    name = "heap"
+
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, f, h, node):
+        heapq.heappush(self.heap, (f, h, node))
+
+    def pop(self):
+        """弹出f最小（f相同时h最小）的元素 (f, h, node_id)"""
+        return heapq.heappop(self.heap)
+
+
+class BucketOpenList:
+    """
+    按整数f值分桶的开放列表
+    单位代价的滑块问题f值是小整数：buckets[f][h] 是一个栈，
+    f相同时优先弹出h较小的节点，push/pop均为O(1)（摊还）
+    """
+
+    name = "bucket"
+
+    def __init__(self):
+        self.buckets = []  # buckets[f][h] -> 节点编号列表
+        self.counts = []  # 每个f桶中的元素个数
+        self.min_h = []  # 每个f桶中可能非空的最小h
+        self.min_f = 0  # 可能非空的最小f
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f, h, node):
+        while len(self.buckets) <= f:
+            self.buckets.append([])
+            self.counts.append(0)
+            self.min_h.append(0)
+        bucket = self.buckets[f]
+        while len(bucket) <= h:
+            bucket.append([])
+        bucket[h].append(node)
+
+        if self.counts[f] == 0 or h < self.min_h[f]:
+            self.min_h[f] = h
+        self.counts[f] += 1
+        if self.size == 0 or f < self.min_f:
+            self.min_f = f
+        self.size += 1
+
+    def pop(self):
+        """弹出f最小（f相同时h最小）的元素 (f, h, node_id)"""
+        if self.size == 0:
+            raise IndexError("pop from empty open list")
+        f = self.min_f
+        while self.counts[f] == 0:
+            f += 1
+        self.min_f = f
+
+        bucket = self.buckets[f]
+        h = self.min_h[f]
+        while not bucket[h]:
+            h += 1
+        self.min_h[f] = h
+
+        self.counts[f] -= 1
+        self.size -= 1
+        return f, h, bucket[h].pop()
+
+
+# 开放列表注册表：名称 -> 类
+OPEN_LISTS = {
+    HeapOpenList.name: HeapOpenList,
+    BucketOpenList.name: BucketOpenList,
+}
+
+
+def create_open_list(open_list_type):
+    """按名称创建开放列表"""
+    if open_list_type not in OPEN_LISTS:
+        raise ValueError(f"未知的开放列表类型: {open_list_type}")
+    return OPEN_LISTS[open_list_type]()
@@ -0,0 +1,110 @@
+# packed_state.py
+from move_tables import get_move_targets, get_successor_table, INVERSE_MOVE, NO_MOVE
+
+
+def tile_bits(cell_count):
+    """每个格子占用的位数（至少4位，格子数超过16时自动加宽）"""
+    return max(4, (cell_count - 1).bit_length())
+
+
+def pack_board(board):
+    """
+    将二维棋盘打包为一个整数
+    Args:
+        board: 二维列表
+    Returns:
+        code: 第k个格子(按行优先顺序)的数字存放在第 k*bits 位起的 bits 位中
+    """
+    cells = [num for row in board for num in row]
+    bits = tile_bits(len(cells))
+    code = 0
+    for index, value in enumerate(cells):
+        code |= value << (index * bits)
+    return code
+
+
+def unpack_board(code, rows, cols=None):
+    """将打包整数还原为二维棋盘"""
+    cols = rows if cols is None else cols
+    bits = tile_bits(rows * cols)
+    mask = (1 << bits) - 1
+    board = []
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            row.append((code >> ((i * cols + j) * bits)) & mask)
+        board.append(row)
+    return board
+
+
+class PackedState:
+    """紧凑状态表示：整块棋盘打包为一个整数，并缓存空白格下标"""
+
+    __slots__ = ("code", "blank", "rows", "cols", "bits")
+
+    def __init__(self, code, blank, rows, cols=None):
+        """
+        初始化紧凑状态
+        Args:
+            code: 打包后的棋盘整数
+            blank: 空白格的一维下标
+            rows: 行数
+            cols: 列数（默认与行数相同）
+        """
+        self.code = code
+        self.blank = blank
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        self.bits = tile_bits(self.rows * self.cols)
+
+    @classmethod
+    def from_board(cls, board):
+        """由二维列表创建紧凑状态"""
+        rows, cols = len(board), len(board[0])
+        flat = [num for row in board for num in row]
+        return cls(pack_board(board), flat.index(0), rows, cols)
+
+    def to_board(self):
+        """还原为二维列表"""
+        return unpack_board(self.code, self.rows, self.cols)
+
+    def tile_at(self, index):
+        """获取一维下标处的数字"""
+        return (self.code >> (index * self.bits)) & ((1 << self.bits) - 1)
+
+    def legal_moves(self, last_move=NO_MOVE):
+        """当前空白格位置的合法移动 (move, target)，自动排除上一步的逆移动"""
+        return get_successor_table(self.rows, self.cols)[self.blank][last_move]
+
+    def apply(self, move):
+        """
+        原地执行移动：把目标格的数字滑入空白格，不扫描也不复制棋盘
+        Returns:
+            被移动的数字
+        """
+        target = get_move_targets(self.rows, self.cols)[self.blank][move]
+        if target == -1:
+            raise ValueError(f"非法移动: {move}")
+        tile = (self.code >> (target * self.bits)) & ((1 << self.bits) - 1)
+        self.code += (tile << (self.blank * self.bits)) - (tile << (target * self.bits))
+        self.blank = target
+        return tile
+
+    def undo(self, move):
+        """原地撤销移动"""
+        return self.apply(INVERSE_MOVE[move])
+
+    def copy(self):
+        """复制状态"""
+        return PackedState(self.code, self.blank, self.rows, self.cols)
+
+    def __eq__(self, other):
+        """重载相等运算符：直接比较整数编码"""
+        return isinstance(other, PackedState) and self.code == other.code
+
+    def __hash__(self):
+        """重载哈希函数：整数编码本身即为哈希值"""
+        return hash(self.code)
+
+    def __repr__(self):
+        return f"PackedState(code={self.code:#x}, blank={self.blank})"
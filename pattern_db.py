@@ -0,0 +1,203 @@
+# pattern_db.py
+import os
+from move_tables import get_move_targets
+from packed_state import pack_board
+from permutation_rank import partial_count, partial_rank
+from table_io import UNKNOWN, load_table, save_table
+
+DEFAULT_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables")
+
+# 默认的不相交分组（数字编号与目标状态无关）
+# 7-8（4x4）或 6-6-6-6（5x5）这类大分组可以通过 partition 参数传入，但纯Python构建需要遍历上亿个抽象状态，
+# 默认改用可在几十秒内构建完成的较小分组
+DEFAULT_PARTITIONS = {
+    (3, 3): ((1, 2, 3, 4), (5, 6, 7, 8)),
+    (4, 4): ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)),
+    (5, 5): ((1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20),
+             (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)),
+}
+DEFAULT_GROUP_SIZE = 4  # 其他尺寸按数字顺序每4个一组
+
+_databases = {}  # (目标打包编码, rows, cols, 分组, 缓存目录) -> PatternDatabase
+
+
+def default_partition(rows, cols=None):
+    """rows x cols 棋盘的默认分组"""
+    cols = rows if cols is None else cols
+    if (rows, cols) in DEFAULT_PARTITIONS:
+        return DEFAULT_PARTITIONS[(rows, cols)]
+    tiles = list(range(1, rows * cols))
+    return tuple(tuple(tiles[i:i + DEFAULT_GROUP_SIZE])
+                 for i in range(0, len(tiles), DEFAULT_GROUP_SIZE))
+
+
+def build_pattern_table(goal_board, tiles, progress=None):
+    """
+    构建单个分组的模式数据库
+    抽象状态只保留分组内数字的位置，其余数字视为可自由穿过的空白：
+    空白格在非分组格子间移动代价为0，与分组内数字交换代价为1。
+    按代价分层做广度优先搜索，0代价移动通过连通区域一次展开并整体标记为已访问，
+    每个抽象状态首次被访问时的层数即为该分组数字至少需要移动的步数
+    有NumPy时使用按层向量化的 bfs_engine，否则逐状态搜索
+    Args:
+        goal_board: 目标状态棋盘
+        tiles: 分组内的数字
+        progress: 可选回调，每完成一层调用一次（仅向量化引擎支持）
+    Returns:
+        bytearray: 下标为分组数字位置的k-排列序号（见 permutation_rank.partial_rank）
+    """
+    from bfs_engine import HAS_NUMPY, build_pattern_distances  # 只有构建表时才导入（NumPy导入较慢）
+    if HAS_NUMPY:
+        table, _ = build_pattern_distances(goal_board, tiles, progress)
+        return table
+    return _build_pattern_table_python(goal_board, tiles)
+
+
+def _build_pattern_table_python(goal_board, tiles):
+    """逐状态按层搜索（没有NumPy时使用），结果与向量化引擎相同"""
+    rows, cols = len(goal_board), len(goal_board[0])
+    cells = rows * cols
+    goal_flat = [num for row in goal_board for num in row]
+    neighbors = [[target for target in targets if target != -1]
+                 for targets in get_move_targets(rows, cols)]
+
+    table = bytearray([UNKNOWN]) * partial_count(len(tiles), cells)
+    # visited[序号 * cells + 格子]：该抽象状态下空白格已访问过的格子（整个连通区域一起标记）
+    visited = bytearray(len(table) * cells)
+    start = tuple(goal_flat.index(tile) for tile in tiles)
+    frontier = [(start, partial_rank(start, cells), goal_flat.index(0))]
+    depth = 0
+
+    while frontier:
+        next_frontier = []
+        for positions, index, blank in frontier:
+            base = index * cells
+            if visited[base + blank]:
+                continue
+            if table[index] == UNKNOWN:
+                table[index] = depth
+
+            owner = [-1] * cells  # 格子 -> 分组内数字的序号
+            for slot, pos in enumerate(positions):
+                owner[pos] = slot
+
+            # 空白格可0代价到达的连通区域
+            region = [blank]
+            visited[base + blank] = 1
+            for cell in region:
+                for other in neighbors[cell]:
+                    if owner[other] == -1 and not visited[base + other]:
+                        visited[base + other] = 1
+                        region.append(other)
+
+            # 区域边界上的分组数字移入区域，空白格换到它原来的位置
+            for cell in region:
+                for other in neighbors[cell]:
+                    slot = owner[other]
+                    if slot != -1:
+                        child = list(positions)
+                        child[slot] = cell
+                        child_index = partial_rank(child, cells)
+                        if not visited[child_index * cells + other]:
+                            next_frontier.append((child, child_index, other))
+        frontier = next_frontier
+        depth += 1
+    return table
+
+
+def pattern_table_path(goal_board, tiles, table_dir=DEFAULT_TABLE_DIR):
+    """分组表的缓存文件路径（由棋盘尺寸、目标状态和分组唯一确定）"""
+    rows, cols = len(goal_board), len(goal_board[0])
+    name = f"pdb_{rows}x{cols}_{pack_board(goal_board):x}_{'-'.join(map(str, tiles))}.bin"
+    return os.path.join(table_dir, name)
+
+
+class PatternDatabase:
+    """加性不相交模式数据库：各分组互不相交且只计本组数字的移动，查表值可直接相加"""
+
+    def __init__(self, goal_board, partition=None, table_dir=DEFAULT_TABLE_DIR, progress=None):
+        """
+        初始化模式数据库，优先从磁盘映射各分组表，缺失时构建并保存
+        Args:
+            goal_board: 目标状态棋盘
+            partition: 数字分组，默认见 default_partition
+            table_dir: 缓存目录，None表示只在内存中构建
+            progress: 可选回调，构建分组表时每完成一层调用一次
+        """
+        self.rows = len(goal_board)
+        self.cols = len(goal_board[0])
+        self.cells = self.rows * self.cols
+        self.partition = tuple(tuple(group) for group in
+                               (partition or default_partition(self.rows, self.cols)))
+
+        covered = [tile for group in self.partition for tile in group]
+        if len(covered) != len(set(covered)) or not set(covered) <= set(range(1, self.cells)):
+            raise ValueError("模式数据库分组必须是 1..n-1 中互不相交的数字")
+
+        self.group_of = [-1] * self.cells  # 数字 -> 所在分组
+        self.slot_of = [-1] * self.cells  # 数字 -> 在分组内的序号
+        for g, group in enumerate(self.partition):
+            for slot, tile in enumerate(group):
+                self.group_of[tile] = g
+                self.slot_of[tile] = slot
+
+        self.tables = []
+        for group in self.partition:
+            size = partial_count(len(group), self.cells)
+            table = None
+            if table_dir is not None:
+                path = pattern_table_path(goal_board, group, table_dir)
+                table = load_table(path, size)
+            if table is None:
+                table = build_pattern_table(goal_board, group, progress)
+                if table_dir is not None:
+                    save_table(table, path)
+            self.tables.append(table)
+
+    def positions(self, tiles):
+        """一维数字列表 -> 各分组数字的位置列表"""
+        positions = [[0] * len(group) for group in self.partition]
+        group_of, slot_of = self.group_of, self.slot_of
+        for pos, tile in enumerate(tiles):
+            g = group_of[tile]
+            if g != -1:
+                positions[g][slot_of[tile]] = pos
+        return positions
+
+    def group_value(self, g, positions):
+        """单个分组的查表值"""
+        return self.tables[g][partial_rank(positions, self.cells)]
+
+    def lookup(self, tiles):
+        """各分组查表值之和"""
+        return sum(self.group_value(g, positions)
+                   for g, positions in enumerate(self.positions(tiles)))
+
+
+def get_pattern_database(goal_board, partition=None, table_dir=DEFAULT_TABLE_DIR):
+    """获取（并缓存）某目标状态与分组下的模式数据库"""
+    rows, cols = len(goal_board), len(goal_board[0])
+    partition = tuple(tuple(group) for group in (partition or default_partition(rows, cols)))
+    key = (pack_board(goal_board), rows, cols, partition, table_dir)
+    if key not in _databases:
+        _databases[key] = PatternDatabase(goal_board, partition, table_dir)
+    return _databases[key]
+
+
+if __name__ == "__main__":
+    # 离线预构建：python pattern_db.py 4 4
+    import sys
+    import time
+    from utils import create_goal_board
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else rows
+    goal = create_goal_board(rows, cols)
+
+    def print_layer(layer):
+        print(f"  第{layer['depth']:>3}层  状态数 {layer['states']:>10}  耗时 {layer['seconds']:.3f} 秒")
+
+    start_time = time.time()
+    database = PatternDatabase(goal, progress=print_layer)
+    print(f"{rows}x{cols} 模式数据库就绪，分组: {database.partition}，"
+          f"耗时 {time.time() - start_time:.2f} 秒")
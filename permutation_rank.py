@@ -0,0 +1,326 @@
+# permutation_rank.py
+from math import factorial
+from packed_state import tile_bits
+
+_factorials = [1]
+
+
+def _factorial_table(n):
+    """0! .. n! 的缓存表"""
+    while len(_factorials) <= n:
+        _factorials.append(_factorials[-1] * len(_factorials))
+    return _factorials
+
+
+# ==================== 排列序号 ====================
+
+def lehmer_rank(perm):
+    """
+    Lehmer码排名：0..n-1 的排列 -> [0, n!) 的字典序序号
+    序号为 2k 与 2k+1 的两个排列只相差最后两个元素的交换，奇偶性相反
+    """
+    n = len(perm)
+    fact = _factorial_table(n)
+    rank = 0
+    for i in range(n):
+        value = perm[i]
+        smaller = 0
+        for j in range(i + 1, n):
+            if perm[j] < value:
+                smaller += 1
+        rank += smaller * fact[n - 1 - i]
+    return rank
+
+
+def lehmer_unrank(rank, n):
+    """Lehmer码反排名：字典序序号 -> 0..n-1 的排列"""
+    fact = _factorial_table(n)
+    remaining = list(range(n))
+    perm = []
+    for i in range(n):
+        digit, rank = divmod(rank, fact[n - 1 - i])
+        perm.append(remaining.pop(digit))
+    return perm
+
+
+def myrvold_ruskey_rank(perm):
+    """Myrvold-Ruskey线性时间排名（非字典序）：0..n-1 的排列 -> [0, n!)"""
+    perm = list(perm)
+    n = len(perm)
+    inverse = [0] * n
+    for i, value in enumerate(perm):
+        inverse[value] = i
+    rank = 0
+    multiplier = 1
+    for k in range(n, 1, -1):
+        s = perm[k - 1]
+        j = inverse[k - 1]
+        perm[k - 1], perm[j] = perm[j], perm[k - 1]
+        inverse[s], inverse[k - 1] = inverse[k - 1], inverse[s]
+        rank += s * multiplier
+        multiplier *= k
+    return rank
+
+
+def myrvold_ruskey_unrank(rank, n):
+    """Myrvold-Ruskey线性时间反排名"""
+    perm = list(range(n))
+    for k in range(n, 0, -1):
+        rank, r = divmod(rank, k)
+        perm[k - 1], perm[r] = perm[r], perm[k - 1]
+    return perm
+
+
+def permutation_parity(perm):
+    """排列的奇偶性（0为偶，1为奇），按轮换分解O(n)计算"""
+    n = len(perm)
+    seen = [False] * n
+    parity = 0
+    for start in range(n):
+        if seen[start]:
+            continue
+        length = 0
+        k = start
+        while not seen[k]:
+            seen[k] = True
+            k = perm[k]
+            length += 1
+        parity ^= (length - 1) & 1
+    return parity
+
+
+def partial_count(k, n):
+    """从n个格子中按顺序选k个的排列数 n!/(n-k)!"""
+    count = 1
+    for i in range(k):
+        count *= n - i
+    return count
+
+
+def partial_rank(positions, n):
+    """
+    k-排列排名：k个互不相同的格子下标（有序） -> [0, n!/(n-k)!) 的稠密序号
+    第i位取其在尚未使用的格子中的名次，按混合进制 (n, n-1, ..., n-k+1) 组合
+    """
+    index = 0
+    for i, pos in enumerate(positions):
+        smaller = 0
+        for j in range(i):
+            if positions[j] < pos:
+                smaller += 1
+        index = index * (n - i) + pos - smaller
+    return index
+
+
+def partial_unrank(index, k, n):
+    """k-排列反排名：稠密序号 -> k个格子下标"""
+    digits = []
+    for i in range(k - 1, -1, -1):
+        index, digit = divmod(index, n - i)
+        digits.append(digit)
+    remaining = list(range(n))
+    return [remaining.pop(digit) for digit in reversed(digits)]
+
+
+# ==================== 棋盘序号 ====================
+
+def required_tile_parity(blank, rows, cols=None):
+    """
+    相对标准目标（空白格在右下角）可解时，按行优先顺序排除空白格后数字排列应有的逆序奇偶性
+    推导：把空白格视为最大的数字，可解当且仅当整体排列奇偶性等于空白格到目标位置的曼哈顿距离奇偶性
+    """
+    cols = rows if cols is None else cols
+    blank_i, blank_j = divmod(blank, cols)
+    return (rows * cols - 1 - blank + (rows - 1 - blank_i) + (cols - 1 - blank_j)) & 1
+
+
+def state_count(rows, cols=None):
+    """可解状态数 n!/2"""
+    cols = rows if cols is None else cols
+    return factorial(rows * cols) // 2
+
+
+def _rank_tiles(tiles, blank, cells):
+    """数字序列（1..n-1，不含空白格）与空白格下标 -> 稠密序号"""
+    return blank * (_factorial_table(cells - 1)[cells - 1] // 2) + \
+        lehmer_rank([t - 1 for t in tiles]) // 2
+
+
+def rank_board(board):
+    """
+    棋盘 -> [0, n!/2) 的稠密序号
+    序号 = 空白格下标 * ((n-1)!/2) + 其余数字排列的Lehmer序号 // 2。
+    空白格位置固定时只有一种逆序奇偶性可解，因此在可解的一半状态上是双射；
+    不可解的棋盘会与某个可解棋盘得到相同序号，调用前应先检查可解性
+    """
+    flat = [num for row in board for num in row]
+    blank = flat.index(0)
+    return _rank_tiles([num for num in flat if num != 0], blank, len(flat))
+
+
+def rank_code(code, rows, cols=None):
+    """打包状态 -> 稠密序号（与 rank_board 一致）"""
+    cols = rows if cols is None else cols
+    cells = rows * cols
+    bits = tile_bits(cells)
+    mask = (1 << bits) - 1
+    tiles = []
+    blank = 0
+    for k in range(cells):
+        value = (code >> (k * bits)) & mask
+        if value == 0:
+            blank = k
+        else:
+            tiles.append(value)
+    return _rank_tiles(tiles, blank, cells)
+
+
+def unrank_board(index, rows, cols=None):
+    """稠密序号 -> 相对标准目标可解的棋盘"""
+    cols = rows if cols is None else cols
+    cells = rows * cols
+    half = _factorial_table(cells - 1)[cells - 1] // 2
+    blank, pair = divmod(index, half)
+    tiles = lehmer_unrank(2 * pair, cells - 1)
+    if permutation_parity(tiles) != required_tile_parity(blank, rows, cols):
+        tiles[-1], tiles[-2] = tiles[-2], tiles[-1]
+    flat = [t + 1 for t in tiles]
+    flat.insert(blank, 0)
+    return [flat[i * cols:(i + 1) * cols] for i in range(rows)]
+
+
+def is_rank_solvable(board):
+    """棋盘相对标准目标是否可解（即是否落在 rank_board 的双射范围内）"""
+    rows, cols = len(board), len(board[0])
+    flat = [num for row in board for num in row]
+    blank = flat.index(0)
+    tiles = [num - 1 for num in flat if num != 0]
+    return permutation_parity(tiles) == required_tile_parity(blank, rows, cols)
+
+
+# ==================== 批量形式 ====================
+# 有NumPy时整批做数组运算（每个位置一次向量比较，代替逐棋盘的Python循环），否则逐个调用上面的函数。
+# 序号需放进int64：完整棋盘的数组形式只用于不超过 MAX_ARRAY_CELLS 个格子的棋盘，更大的棋盘退回逐个计算
+
+MAX_ARRAY_CELLS = 20  # 20!/2 < 2**63
+_numpy_module = []  # 延迟导入的NumPy（导入较慢，只在批量计算时才需要）；[None]表示未安装
+
+
+def _numpy():
+    """NumPy模块，未安装时返回None"""
+    if not _numpy_module:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module.append(numpy)
+    return _numpy_module[0]
+
+
+def rank_array(states):
+    """
+    批量排名（需要NumPy）：(M, cells) 棋盘数组（按行优先展开）-> int64 序号数组，与 rank_board 一致
+    """
+    np = _numpy()
+    states = np.asarray(states)
+    cells = states.shape[1]
+    n = cells - 1
+    fact = _factorial_table(n)
+    blank = np.argmax(states == 0, axis=1)
+    # 稳定排序把空白格挪到末尾，其余数字保持原有次序
+    order = np.argsort(states == 0, axis=1, kind="stable")
+    tiles = np.take_along_axis(states, order, axis=1)[:, :n]
+    lehmer = np.zeros(len(states), dtype=np.int64)
+    for i in range(n - 1):
+        smaller = (tiles[:, i + 1:] < tiles[:, i:i + 1]).sum(axis=1)
+        lehmer += smaller * fact[n - 1 - i]
+    return blank * (fact[n] // 2) + lehmer // 2
+
+
+def unrank_array(indices, rows, cols=None):
+    """批量反排名（需要NumPy）：序号数组 -> (M, cells) 棋盘数组，与 unrank_board 一致"""
+    np = _numpy()
+    cols = rows if cols is None else cols
+    cells = rows * cols
+    n = cells - 1
+    fact = _factorial_table(n)
+    indices = np.asarray(indices, dtype=np.int64)
+    blank, pair = np.divmod(indices, fact[n] // 2)
+    lehmer = 2 * pair
+    count = len(indices)
+    index = np.arange(count)
+    available = np.ones((count, n), dtype=bool)
+    tiles = np.empty((count, n), dtype=np.int64)
+    for i in range(n):
+        digit = (lehmer // fact[n - 1 - i]) % (n - i)
+        # 第 digit 个（从0开始）尚未使用的数字
+        chosen = np.argmax(np.cumsum(available, axis=1) == (digit + 1)[:, None], axis=1)
+        tiles[:, i] = chosen
+        available[index, chosen] = False
+
+    inversions = np.zeros(count, dtype=np.int64)
+    for i in range(n - 1):
+        inversions += (tiles[:, i + 1:] < tiles[:, i:i + 1]).sum(axis=1)
+    blank_i, blank_j = np.divmod(blank, cols)
+    required = (n - blank + (rows - 1 - blank_i) + (cols - 1 - blank_j)) & 1
+    swap = (inversions & 1) != required
+    last = tiles[swap, n - 1].copy()  # 奇偶性不符时交换最后两个数字（同 unrank_board）
+    tiles[swap, n - 1] = tiles[swap, n - 2]
+    tiles[swap, n - 2] = last
+
+    positions = np.arange(cells)
+    source = np.clip(positions - (positions > blank[:, None]), 0, n - 1)
+    flat = np.take_along_axis(tiles + 1, source, axis=1)
+    flat[positions == blank[:, None]] = 0
+    return flat
+
+
+def partial_rank_array(positions, n):
+    """批量k-排列排名（需要NumPy）：(M, k) 格子下标数组 -> int64 序号数组，与 partial_rank 一致"""
+    np = _numpy()
+    positions = np.asarray(positions)
+    index = np.zeros(len(positions), dtype=np.int64)
+    for i in range(positions.shape[1]):
+        smaller = (positions[:, :i] < positions[:, i:i + 1]).sum(axis=1)
+        index = index * (n - i) + positions[:, i] - smaller
+    return index
+
+
+def _use_arrays(cells, count):
+    return count > 1 and cells <= MAX_ARRAY_CELLS and _numpy() is not None
+
+
+def rank_boards(boards):
+    """批量排名：棋盘序列 -> 序号列表"""
+    boards = list(boards)
+    if not boards or not _use_arrays(len(boards[0]) * len(boards[0][0]), len(boards)):
+        return [rank_board(board) for board in boards]
+    return rank_array([[num for row in board for num in row] for board in boards]).tolist()
+
+
+def rank_codes(codes, rows, cols=None):
+    """批量排名：打包状态序列 -> 序号列表"""
+    cols = rows if cols is None else cols
+    cells = rows * cols
+    codes = list(codes)
+    if not _use_arrays(cells, len(codes)):
+        return [rank_code(code, rows, cols) for code in codes]
+    np = _numpy()
+    bits = tile_bits(cells)
+    mask = (1 << bits) - 1
+    if cells * bits < 63:
+        shifts = np.arange(cells, dtype=np.int64) * bits
+        states = (np.array(codes, dtype=np.int64)[:, None] >> shifts) & mask
+    else:  # 打包状态超出int64，逐个拆开
+        states = [[(code >> (k * bits)) & mask for k in range(cells)] for code in codes]
+    return rank_array(states).tolist()
+
+
+def unrank_boards(indices, rows, cols=None):
+    """批量反排名：序号序列 -> 棋盘列表"""
+    cols = rows if cols is None else cols
+    indices = list(indices)
+    if not _use_arrays(rows * cols, len(indices)):
+        return [unrank_board(index, rows, cols) for index in indices]
+    flat = unrank_array(indices, rows, cols).tolist()
+    return [[board[i * cols:(i + 1) * cols] for i in range(rows)] for board in flat]
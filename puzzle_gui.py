@@ -4,8 +4,14 @@ from tkinter import ttk, messagebox
 import random
 from puzzle_state import PuzzleState
 from a_star import AStarSolver
-from utils import create_goal_board, create_random_board, print_board
+from utils import create_goal_board, create_random_board, print_board, validate_board
+from goal_context import get_goal_context
+from heuristics import HEURISTICS
+from solvers import SOLVERS
+from solution_cache import cached_solve
 
+# 可选的棋盘尺寸：显示名称 -> (行数, 列数)
+BOARD_SIZES = {"3x3": (3, 3), "4x4": (4, 4), "5x5": (5, 5), "2x3": (2, 3), "3x4": (3, 4)}
 
 class PuzzleGUI:
     """八数码问题图形界面"""
@@ -71,7 +77,12 @@ class PuzzleGUI:
         # === 控制面板组件 ===
 
         # 初始状态设置
-        ttk.Label(control_frame, text="初始状态设置:").grid(row=0, column=0, columnspan=2, pady=(0, 5), sticky=tk.W)
+        ttk.Label(control_frame, text="初始状态设置:").grid(row=0, column=0, pady=(0, 5), sticky=tk.W)
+        self.size_var = tk.StringVar(value="3x3")
+        size_combo = ttk.Combobox(control_frame, textvariable=self.size_var,
+                                  values=list(BOARD_SIZES), state="readonly", width=6)
+        size_combo.grid(row=0, column=1, padx=(5, 0), pady=(0, 5), sticky=tk.E)
+        size_combo.bind("<<ComboboxSelected>>", lambda event: self.change_board_size())
 
         ttk.Button(control_frame, text="随机生成",
                    command=self.randomize_board).grid(row=1, column=0, columnspan=2, pady=2, sticky=tk.EW)
@@ -84,11 +95,10 @@ class PuzzleGUI:
         manual_frame.grid(row=3, column=0, columnspan=2, pady=10)
         ttk.Label(manual_frame, text="手动设置:").pack(side=tk.LEFT)
 
+        self.entries_frame = ttk.Frame(manual_frame)
+        self.entries_frame.pack(side=tk.LEFT)
         self.board_entries = []
-        for i in range(9):
-            entry = ttk.Entry(manual_frame, width=3)
-            entry.pack(side=tk.LEFT, padx=1)
-            self.board_entries.append(entry)
+        self.create_board_entries()
 
         ttk.Button(control_frame, text="应用手动设置",
                    command=self.apply_manual_setup).grid(row=4, column=0, columnspan=2, pady=2)
@@ -102,19 +112,25 @@ class PuzzleGUI:
         ttk.Label(control_frame, text="启发式函数:").grid(row=7, column=0, sticky=tk.W)
         self.heuristic_var = tk.StringVar(value="manhattan")
         heuristic_combo = ttk.Combobox(control_frame, textvariable=self.heuristic_var,
-                                       values=["manhattan", "misplaced"], state="readonly", width=15)
+                                       values=list(HEURISTICS), state="readonly", width=15)
         heuristic_combo.grid(row=7, column=1, padx=(5, 0))
 
+        ttk.Label(control_frame, text="求解算法:").grid(row=8, column=0, sticky=tk.W)
+        self.algorithm_var = tk.StringVar(value="astar")
+        algorithm_combo = ttk.Combobox(control_frame, textvariable=self.algorithm_var,
+                                       values=list(SOLVERS), state="readonly", width=15)
+        algorithm_combo.grid(row=8, column=1, padx=(5, 0), pady=(5, 0))
+
         # 求解按钮
         ttk.Button(control_frame, text="开始求解",
-                   command=self.solve_puzzle, style="Accent.TButton").grid(row=8, column=0, columnspan=2, pady=10,
+                   command=self.solve_puzzle, style="Accent.TButton").grid(row=9, column=0, columnspan=2, pady=10,
                                                                            sticky=tk.EW)
 
         # 步骤控制
-        ttk.Label(control_frame, text="解路径演示:").grid(row=9, column=0, columnspan=2, pady=(10, 5), sticky=tk.W)
+        ttk.Label(control_frame, text="解路径演示:").grid(row=10, column=0, columnspan=2, pady=(10, 5), sticky=tk.W)
 
         step_control_frame = ttk.Frame(control_frame)
-        step_control_frame.grid(row=10, column=0, columnspan=2, pady=5)
+        step_control_frame.grid(row=11, column=0, columnspan=2, pady=5)
 
         ttk.Button(step_control_frame, text="◀◀",
                    command=lambda: self.show_step(0)).pack(side=tk.LEFT, padx=2)
@@ -151,15 +167,40 @@ class PuzzleGUI:
         status_bar = ttk.Label(self.window, textvariable=self.status_var, relief=tk.SUNKEN)
         status_bar.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=10, pady=(0, 10))
 
+    def create_board_entries(self):
+        """按当前棋盘尺寸重建手动输入框（按行排列）"""
+        for entry in self.board_entries:
+            entry.destroy()
+        self.board_entries = []
+        rows, cols = len(self.goal_board), len(self.goal_board[0])
+        for i in range(rows):
+            for j in range(cols):
+                entry = ttk.Entry(self.entries_frame, width=3)
+                entry.grid(row=i, column=j, padx=1, pady=1)
+                self.board_entries.append(entry)
+
+    def change_board_size(self):
+        """切换棋盘尺寸：重建目标状态、初始状态与输入框"""
+        rows, cols = BOARD_SIZES[self.size_var.get()]
+        self.goal_board = create_goal_board(rows, cols)
+        self.initial_board = create_random_board(rows, moves=30, cols=cols)
+        self.current_board = [row[:] for row in self.initial_board]
+        self.solution_path = None
+        self.current_step = 0
+        self.create_board_entries()
+        self.update_board_display()
+        self.status_var.set(f"棋盘尺寸已切换为 {rows}x{cols}")
+
     def update_board_display(self):
         """更新棋盘显示"""
         self.canvas.delete("all")
 
-        cell_size = 100
+        rows, cols = len(self.current_board), len(self.current_board[0])
+        cell_size = 300 // max(rows, cols)  # 画布固定为300x300，格子随尺寸缩放
         padding = 5
 
-        for i in range(3):
-            for j in range(3):
+        for i in range(rows):
+            for j in range(cols):
                 x1 = j * cell_size + padding
                 y1 = i * cell_size + padding
                 x2 = (j + 1) * cell_size - padding
@@ -178,7 +219,7 @@ class PuzzleGUI:
                     text = str(value)
 
                 # 绘制圆角矩形
-                radius = 10
+                radius = cell_size // 10
                 self.canvas.create_rectangle(
                     x1 + radius, y1, x2 - radius, y2,
                     fill=fill_color, outline="black", width=2
@@ -209,7 +250,7 @@ class PuzzleGUI:
                     self.canvas.create_text(
                         (x1 + x2) / 2, (y1 + y2) / 2,
                         text=text, fill=text_color,
-                        font=("Arial", 24, "bold")
+                        font=("Arial", cell_size // 4, "bold")
                     )
 
         # 更新信息显示
@@ -259,10 +300,11 @@ class PuzzleGUI:
 
         # 检查棋盘是否有效
         flat_board = [num for row in self.current_board for num in row]
-        if len(set(flat_board)) != 9:
+        cells = len(flat_board)
+        if len(set(flat_board)) != cells:
             self.info_text.insert(tk.END, " 无效棋盘：数字重复或缺失\n")
-        elif set(flat_board) != set(range(9)):
-            self.info_text.insert(tk.END, " 无效棋盘：必须包含数字0-8\n")
+        elif not validate_board(self.current_board):
+            self.info_text.insert(tk.END, f" 无效棋盘：必须包含数字0-{cells - 1}\n")
         else:
             self.info_text.insert(tk.END, " 棋盘有效\n")
 
@@ -270,15 +312,19 @@ class PuzzleGUI:
             if self.current_board == self.goal_board:
                 self.info_text.insert(tk.END, " 当前已是目标状态！\n")
             else:
-                from puzzle_state import PuzzleState
-                state = PuzzleState(self.current_board)
-                state.goal_board = self.goal_board
-
-                misplaced = state.h_misplaced(self.goal_board)
-                manhattan = state.h_manhattan(self.goal_board)
+                # 复用按目标缓存的启发式查找表
+                goal_context = get_goal_context(self.goal_board)
+                misplaced = goal_context.h(self.current_board, "misplaced")
+                manhattan = goal_context.h(self.current_board, "manhattan")
+                linear_conflict = goal_context.h(self.current_board, "linear_conflict")
 
                 self.info_text.insert(tk.END, f"错位数: {misplaced}\n")
                 self.info_text.insert(tk.END, f"曼哈顿距离: {manhattan}\n")
+                self.info_text.insert(tk.END, f"线性冲突: {linear_conflict}\n")
+                # 行走距离表的规模随棋盘尺寸增长很快，大棋盘不在信息面板中实时计算
+                if cells <= 16:
+                    walking_distance = goal_context.h(self.current_board, "walking_distance")
+                    self.info_text.insert(tk.END, f"行走距离: {walking_distance}\n")
 
                 # 检查可解性
                 from a_star import AStarSolver
@@ -286,11 +332,12 @@ class PuzzleGUI:
                 if solver.is_solvable(self.current_board):
                     self.info_text.insert(tk.END, " 问题有解\n")
                 else:
-                    self.info_text.insert(tk.END, " 问题无解（逆序数为奇数）\n")
+                    self.info_text.insert(tk.END, " 问题无解（排列奇偶性与目标状态不一致）\n")
 
     def randomize_board(self):
         """随机生成棋盘"""
-        self.initial_board = create_random_board(moves=30)
+        rows, cols = len(self.goal_board), len(self.goal_board[0])
+        self.initial_board = create_random_board(rows, moves=30, cols=cols)
         self.current_board = [row[:] for row in self.initial_board]
         self.solution_path = None
         self.current_step = 0
@@ -317,14 +364,15 @@ class PuzzleGUI:
                     numbers.append(int(text))
 
             # 验证数字范围
-            if set(numbers) != set(range(9)):
-                messagebox.showerror("错误", "必须包含数字0-8各一次")
+            rows, cols = len(self.goal_board), len(self.goal_board[0])
+            if set(numbers) != set(range(rows * cols)):
+                messagebox.showerror("错误", f"必须包含数字0-{rows * cols - 1}各一次")
                 return
 
-            # 转换为3x3棋盘
+            # 转换为 rows x cols 棋盘
             new_board = []
-            for i in range(0, 9, 3):
-                new_board.append(numbers[i:i + 3])
+            for i in range(0, rows * cols, cols):
+                new_board.append(numbers[i:i + cols])
 
             self.initial_board = new_board
             self.current_board = [row[:] for row in new_board]
@@ -334,7 +382,7 @@ class PuzzleGUI:
             self.status_var.set("已应用手动设置")
 
         except ValueError:
-            messagebox.showerror("错误", "请输入有效的数字(0-8)")
+            messagebox.showerror("错误", "请输入有效的数字")
 
     # 在 puzzle_gui.py 中的 solve_puzzle 方法中修改
     def solve_puzzle(self):
@@ -342,14 +390,18 @@ class PuzzleGUI:
         self.status_var.set("正在求解，请稍候...")
         self.window.update()
 
-        # 创建求解器
-        solver = AStarSolver(self.current_board, self.goal_board)
-
-        # 选择启发式函数
+        # 选择算法与启发式函数
+        algorithm = self.algorithm_var.get()
         heuristic_type = self.heuristic_var.get()
 
-        # 求解
-        path, moves, stats = solver.solve(heuristic_type, max_nodes=100000)
+        # 求解（同一棋盘再次求解时直接命中解缓存；部分启发式只支持特定尺寸，例如精确距离只支持3x3棋盘（任意目标），行走距离不支持5x5及以上）
+        try:
+            path, moves, stats = cached_solve(self.current_board, self.goal_board, algorithm,
+                                              heuristic_type, max_nodes=100000)
+        except ValueError as e:
+            messagebox.showerror("求解失败", str(e))
+            self.status_var.set("求解失败")
+            return
 
         if stats.get("error"):
             messagebox.showerror("求解失败", stats["error"])
@@ -363,10 +415,13 @@ class PuzzleGUI:
 
             # 显示统计信息
             info = f"求解成功！\n\n"
+            info += f"求解算法: {algorithm}\n"
             info += f"启发式函数: {heuristic_type}\n"
             info += f"扩展节点数: {stats['nodes_expanded']}\n"
             info += f"解路径长度: {stats['path_length']} 步\n"
             info += f"最大开放集大小: {stats['max_open_size']}\n"
+            if stats.get("cached"):
+                info += "（结果来自解缓存）\n"
 
             messagebox.showinfo("求解完成", info)
             self.status_var.set(f"求解完成 - {stats['path_length']}步解")
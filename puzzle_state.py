@@ -1,4 +1,8 @@
 # puzzle_state.py
+from packed_state import pack_board
+from move_tables import get_move_targets, MOVE_NAMES
+
+
 class PuzzleState:
     """八数码状态表示类"""
 
@@ -6,7 +10,7 @@ class PuzzleState:
         """
         初始化状态
         Args:
-            board: 3x3的二维列表
+            board: rows x cols 的二维列表
             parent: 父状态
             move: 从父状态到当前状态的移动方向
         """
@@ -14,16 +18,25 @@ class PuzzleState:
         self.parent = parent
         self.move = move
         self.g = 0 if parent is None else parent.g + 1  # 实际代价
-        self.size = 3  # 棋盘大小
+        self.rows = len(board)  # 棋盘行数
+        self.cols = len(board[0])  # 棋盘列数
         self.goal_board = None  # 初始化时不知道目标状态
+        self._key = None  # 打包后的整数编码，惰性计算
+
+    @property
+    def key(self):
+        """棋盘的打包整数编码，用作集合和字典的键"""
+        if self._key is None:
+            self._key = pack_board(self.board)
+        return self._key
 
     def __eq__(self, other):
         """重载相等运算符"""
-        return self.board == other.board
+        return self.key == other.key
 
     def __hash__(self):
         """重载哈希函数，用于集合和字典"""
-        return hash(str(self.board))
+        return hash(self.key)
 
     def __lt__(self, other):
         """重载小于运算符，用于优先队列"""
@@ -46,8 +59,8 @@ class PuzzleState:
 
     def get_position(self, value):
         """获取指定值在棋盘上的位置"""
-        for i in range(self.size):
-            for j in range(self.size):
+        for i in range(self.rows):
+            for j in range(self.cols):
                 if self.board[i][j] == value:
                     return (i, j)
         return None
@@ -67,32 +80,26 @@ class PuzzleState:
         """生成所有合法后续状态"""
         neighbors = []
         blank_i, blank_j = self.get_blank_position()
+        blank = blank_i * self.cols + blank_j
 
-        # 四个可能移动方向：上、下、左、右
-        directions = [
-            (-1, 0, "上"),  # 上
-            (1, 0, "下"),  # 下
-            (0, -1, "左"),  # 左
-            (0, 1, "右")  # 右
-        ]
-
-        for di, dj, move_name in directions:
-            new_i, new_j = blank_i + di, blank_j + dj
+        # 查预计算的移动表得到合法目标格，无需逐方向做边界检查
+        for move, target in enumerate(get_move_targets(self.rows, self.cols)[blank]):
+            if target == -1:
+                continue
+            new_i, new_j = divmod(target, self.cols)
 
-            # 检查移动是否合法
-            if 0 <= new_i < self.size and 0 <= new_j < self.size:
-                # 复制当前棋盘
-                new_board = [row[:] for row in self.board]
+            # 复制当前棋盘
+            new_board = [row[:] for row in self.board]
 
-                # 交换空白格与目标格
-                new_board[blank_i][blank_j], new_board[new_i][new_j] = \
-                    new_board[new_i][new_j], new_board[blank_i][blank_j]
+            # 交换空白格与目标格
+            new_board[blank_i][blank_j], new_board[new_i][new_j] = \
+                new_board[new_i][new_j], new_board[blank_i][blank_j]
 
-                # 创建新状态
-                new_state = PuzzleState(new_board, self, move_name)
-                new_state.g = self.g + 1
-                new_state.goal_board = self.goal_board
-                neighbors.append(new_state)
+            # 创建新状态
+            new_state = PuzzleState(new_board, self, MOVE_NAMES[move])
+            new_state.g = self.g + 1
+            new_state.goal_board = self.goal_board
+            neighbors.append(new_state)
 
         return neighbors
 
@@ -103,8 +110,8 @@ class PuzzleState:
             raise ValueError("未指定目标状态")
 
         count = 0
-        for i in range(self.size):
-            for j in range(self.size):
+        for i in range(self.rows):
+            for j in range(self.cols):
                 if self.board[i][j] != 0 and self.board[i][j] != target[i][j]:
                     count += 1
         return count
@@ -118,13 +125,13 @@ class PuzzleState:
         distance = 0
         # 创建目标位置映射
         goal_positions = {}
-        for i in range(self.size):
-            for j in range(self.size):
+        for i in range(self.rows):
+            for j in range(self.cols):
                 goal_positions[target[i][j]] = (i, j)
 
         # 计算曼哈顿距离
-        for i in range(self.size):
-            for j in range(self.size):
+        for i in range(self.rows):
+            for j in range(self.cols):
                 value = self.board[i][j]
                 if value != 0:  # 忽略空白格
                     goal_i, goal_j = goal_positions[value]
@@ -138,8 +145,13 @@ class PuzzleState:
             return self.h_manhattan(goal_board)
         elif heuristic_type == "misplaced":
             return self.h_misplaced(goal_board)
-        else:
-            raise ValueError(f"未知的启发式类型: {heuristic_type}")
+
+        # 其余已注册的启发式（线性冲突、行走距离等）通过目标上下文按打包状态计算
+        from goal_context import get_goal_context
+        target = goal_board if goal_board else self.goal_board
+        if target is None:
+            raise ValueError("未指定目标状态")
+        return get_goal_context(target).h(self.board, heuristic_type)
 
     def f(self, goal_board=None, heuristic_type="manhattan"):
         """计算f(n) = g(n) + h(n)"""
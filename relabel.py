@@ -0,0 +1,94 @@
+# relabel.py
+from packed_state import tile_bits
+from search_nodes import build_path_from_moves
+
+
+def canonical_goal(rows, cols=None, blank=None):
+    """
+    空白格位于blank处的规范目标：其余格子按行优先顺序依次为 1..n-1
+    blank默认为右下角，此时即 utils.create_goal_board 的标准目标
+    """
+    cols = rows if cols is None else cols
+    cells = rows * cols
+    blank = cells - 1 if blank is None else blank
+    flat = list(range(1, cells))
+    flat.insert(blank, 0)
+    return [flat[i * cols:(i + 1) * cols] for i in range(rows)]
+
+
+class Relabeling:
+    """
+    目标重标记：把任意目标状态的数字编号置换成同一空白格位置的规范目标。
+    数字编号只是名字，置换后每一步移动不变，所以 (初始, 目标) 与 (重标记后的初始, 规范目标) 的解完全相同；
+    为规范目标预计算的距离表、模式数据库和解缓存因此可以服务所有空白格位置相同的目标
+    """
+
+    def __init__(self, goal_board):
+        """
+        初始化重标记
+        Args:
+            goal_board: 任意目标状态棋盘
+        """
+        self.rows = len(goal_board)
+        self.cols = len(goal_board[0])
+        self.cells = self.rows * self.cols
+        self.bits = tile_bits(self.cells)
+        goal_flat = [num for row in goal_board for num in row]
+        self.blank = goal_flat.index(0)
+        self.goal_board = canonical_goal(self.rows, self.cols, self.blank)
+        canonical_flat = [num for row in self.goal_board for num in row]
+
+        # forward[原编号] = 规范编号，inverse 为其逆置换（空白格0始终映射到0）
+        self.forward = [0] * self.cells
+        for original, canonical in zip(goal_flat, canonical_flat):
+            self.forward[original] = canonical
+        self.inverse = [0] * self.cells
+        for original, canonical in enumerate(self.forward):
+            self.inverse[canonical] = original
+        self.is_identity = self.forward == list(range(self.cells))
+
+    def board(self, board):
+        """原编号棋盘 -> 规范编号棋盘"""
+        forward = self.forward
+        return [[forward[num] for num in row] for row in board]
+
+    def restore_board(self, board):
+        """规范编号棋盘 -> 原编号棋盘"""
+        inverse = self.inverse
+        return [[inverse[num] for num in row] for row in board]
+
+    def code(self, code):
+        """原编号打包状态 -> 规范编号打包状态"""
+        if self.is_identity:
+            return code
+        bits, mask, forward = self.bits, (1 << self.bits) - 1, self.forward
+        result = 0
+        for k in range(self.cells):
+            result |= forward[(code >> (k * bits)) & mask] << (k * bits)
+        return result
+
+    def tile(self, tile):
+        """单个数字的规范编号"""
+        return self.forward[tile]
+
+    def translate_moves(self, move_ids):
+        """规范问题的移动编号序列 -> 原问题的移动编号序列（重标记不改变移动，原样返回）"""
+        return list(move_ids)
+
+    def restore_solution(self, board, goal_board, move_ids):
+        """
+        由原问题的初始状态与规范问题的解重建原问题的解
+        Returns:
+            (solution_path, moves): 原编号下的状态列表与移动名称列表
+        """
+        return build_path_from_moves(board, self.translate_moves(move_ids), goal_board)
+
+
+def relabel_problem(board, goal_board):
+    """
+    把 (初始状态, 任意目标) 转换为等价的 (初始状态', 规范目标)
+    Returns:
+        (relabeled_board, canonical_goal_board, relabeling)
+    """
+    relabeling = Relabeling(goal_board)
+    return relabeling.board(board), relabeling.goal_board, relabeling
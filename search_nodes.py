@@ -0,0 +1,86 @@
+# search_nodes.py
+from array import array
+from packed_state import PackedState, unpack_board
+from puzzle_state import PuzzleState
+from move_tables import MOVE_NAMES, NO_MOVE
+
+
+class NodeStore:
+    """
+    搜索节点存储：以节点编号为下标的并行数组
+    每个节点只保存搜索需要的信息：打包状态、空白格下标、g值、父节点编号、最后一步移动
+    """
+
+    __slots__ = ("codes", "blanks", "g", "parents", "moves")
+
+    def __init__(self):
+        self.codes = []  # 打包状态（可能超过64位，使用列表保存）
+        self.blanks = array("b")  # 空白格一维下标
+        self.g = array("i")  # 实际代价
+        self.parents = array("i")  # 父节点编号，根节点为-1
+        self.moves = array("b")  # 从父节点到该节点的移动编号
+
+    def __len__(self):
+        return len(self.codes)
+
+    def add(self, code, blank, g, parent=-1, move=NO_MOVE):
+        """添加节点并返回其编号"""
+        self.codes.append(code)
+        self.blanks.append(blank)
+        self.g.append(g)
+        self.parents.append(parent)
+        self.moves.append(move)
+        return len(self.codes) - 1
+
+    def trace(self, node_id):
+        """从根节点到指定节点的节点编号序列"""
+        ids = []
+        while node_id != -1:
+            ids.append(node_id)
+            node_id = self.parents[node_id]
+        ids.reverse()
+        return ids
+
+    def move_sequence(self, node_id):
+        """从根节点到指定节点的移动编号序列"""
+        return [self.moves[i] for i in self.trace(node_id)[1:]]
+
+    def build_path(self, node_id, rows, cols=None, goal_board=None):
+        """
+        只为最终解路径构造PuzzleState对象
+        Returns:
+            path: 状态列表
+            moves: 移动名称列表
+        """
+        cols = rows if cols is None else cols
+        path = []
+        moves = []
+        parent = None
+        for i in self.trace(node_id):
+            move_name = MOVE_NAMES[self.moves[i]] if self.moves[i] != NO_MOVE else ""
+            state = PuzzleState(unpack_board(self.codes[i], rows, cols), parent, move_name)
+            state.goal_board = goal_board
+            path.append(state)
+            if move_name:
+                moves.append(move_name)
+            parent = state
+        return path, moves
+
+
+def build_path_from_moves(board, moves, goal_board=None):
+    """
+    由初始棋盘和移动编号序列构造PuzzleState解路径
+    Returns:
+        path: 状态列表
+        moves: 移动名称列表
+    """
+    state = PackedState.from_board(board)
+    root = PuzzleState([row[:] for row in board])
+    root.goal_board = goal_board
+    path = [root]
+    for move in moves:
+        state.apply(move)
+        child = PuzzleState(state.to_board(), path[-1], MOVE_NAMES[move])
+        child.goal_board = goal_board
+        path.append(child)
+    return path, [MOVE_NAMES[move] for move in moves]
@@ -0,0 +1,217 @@
+# solution_cache.py
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from packed_state import pack_board
+from move_tables import MOVE_NAMES, TRANSPOSED_MOVE
+from search_nodes import build_path_from_moves
+from relabel import relabel_problem, canonical_goal
+from symmetry import representative
+from solvers import create_solver
+
+SOLUTION_CACHE_SIZE = 1024  # 内存层最多缓存的解数量
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "tables", "solutions.sqlite3")
+# 持久层只保存这些统计项
+STORED_STATS = ("nodes_expanded", "path_length", "max_open_size", "final_f")
+
+
+def encode_moves(move_ids):
+    """移动编号序列 -> 紧凑字节串（每步2位，4步一个字节）"""
+    packed = 0
+    for k, move in enumerate(move_ids):
+        packed |= move << (2 * k)
+    return packed.to_bytes((len(move_ids) + 3) // 4, "little")
+
+
+def decode_moves(data, length):
+    """紧凑字节串 -> 移动编号序列"""
+    packed = int.from_bytes(data, "little")
+    return [(packed >> (2 * k)) & 3 for k in range(length)]
+
+
+class SolutionCache:
+    """
+    两级解缓存：内存中的有界LRU + 磁盘上的SQLite库（多进程共享，重启后仍有效）
+    键为 (初始状态, 目标状态, 棋盘尺寸, 算法, 启发式)，只缓存找到解的结果。
+    问题先经 relabel 换成规范目标、再经 symmetry 换成对称类代表后生成键，
+    所以空白格位置相同的不同目标、互为转置的状态都共用同一条缓存（解按对称关系换回移动方向）
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_size=SOLUTION_CACHE_SIZE):
+        """
+        初始化解缓存
+        Args:
+            path: SQLite文件路径，None表示只使用内存层
+            max_size: 内存层容量
+        """
+        self.path = path
+        self.max_size = max_size
+        self.memory = OrderedDict()  # 键 -> (原问题编码, 是否转置, path, moves, stats)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        self._connection = None
+        self._pid = None
+
+    def _db(self):
+        """当前进程的数据库连接（fork之后的子进程重新连接）"""
+        if self.path is None:
+            return None
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                " start TEXT NOT NULL, goal TEXT NOT NULL,"
+                " rows INTEGER NOT NULL, cols INTEGER NOT NULL,"
+                " algorithm TEXT NOT NULL, heuristic TEXT NOT NULL,"
+                " length INTEGER NOT NULL, moves BLOB NOT NULL, stats TEXT NOT NULL,"
+                " PRIMARY KEY (start, goal, rows, cols, algorithm, heuristic))")
+            connection.commit()
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    @staticmethod
+    def canonical_key(board, goal_board, algorithm, heuristic_type):
+        """
+        缓存键：重标记并取对称类代表后的规范问题
+        （打包编码存为十六进制字符串：5x5棋盘的编码超出SQLite的64位整数范围）
+        Returns:
+            (key, transposed): 键与代表是否由转置得到（缓存中的移动序列按代表的方向保存）
+        """
+        board, _, relabeling = relabel_problem(board, goal_board)
+        rows, cols = relabeling.rows, relabeling.cols
+        code, blank, transposed = representative(pack_board(board), rows, cols, relabeling.blank)
+        key = (f"{code:x}", f"{pack_board(canonical_goal(rows, cols, blank)):x}",
+               rows, cols, algorithm, heuristic_type)
+        return key, transposed
+
+    @classmethod
+    def key(cls, board, goal_board, algorithm, heuristic_type):
+        """缓存键（见 canonical_key）"""
+        return cls.canonical_key(board, goal_board, algorithm, heuristic_type)[0]
+
+    def _remember(self, key, result):
+        """写入内存层并维护LRU顺序"""
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    def get(self, board, goal_board, algorithm="astar", heuristic_type="manhattan"):
+        """
+        查询缓存
+        Returns:
+            (solution_path, moves, stats)，未命中时返回None
+        """
+        key, transposed = self.canonical_key(board, goal_board, algorithm, heuristic_type)
+        problem = (pack_board(board), pack_board(goal_board))
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            stored_problem, stored_transposed, path, moves, stats = result
+            if stored_problem != problem:
+                # 由同一对称类的另一个问题存入：换回当前问题的移动方向后重建状态路径
+                move_ids = [MOVE_NAMES.index(move) for move in moves]
+                if stored_transposed != transposed:
+                    move_ids = [TRANSPOSED_MOVE[move] for move in move_ids]
+                path, moves = build_path_from_moves(board, move_ids, goal_board)
+            return list(path), list(moves), dict(stats, cached="memory")
+
+        db = self._db()
+        row = None
+        if db is not None:
+            row = db.execute(
+                "SELECT length, moves, stats FROM solutions WHERE start=? AND goal=? AND rows=?"
+                " AND cols=? AND algorithm=? AND heuristic=?", key).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        length, data, stats_json = row
+        move_ids = decode_moves(data, length)
+        if transposed:
+            move_ids = [TRANSPOSED_MOVE[move] for move in move_ids]
+        path, moves = build_path_from_moves(board, move_ids, goal_board)
+        stats = json.loads(stats_json)
+        stats.update({"solution_found": True, "path_length": len(moves)})
+        self._remember(key, (problem, transposed, path, moves, stats))
+        return list(path), list(moves), dict(stats, cached="disk")
+
+    def put(self, board, goal_board, algorithm, heuristic_type, path, moves, stats):
+        """保存一个已找到的解（两级都写入）"""
+        key, transposed = self.canonical_key(board, goal_board, algorithm, heuristic_type)
+        stats = {name: stats[name] for name in STORED_STATS if name in stats}
+        stats["solution_found"] = True
+        problem = (pack_board(board), pack_board(goal_board))
+        self._remember(key, (problem, transposed, list(path), list(moves), stats))
+        self.stats["stores"] += 1
+
+        db = self._db()
+        if db is not None:
+            # 持久层按代表的方向保存移动序列
+            move_ids = [MOVE_NAMES.index(move) for move in moves]
+            if transposed:
+                move_ids = [TRANSPOSED_MOVE[move] for move in move_ids]
+            db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                       key + (len(move_ids), encode_moves(move_ids), json.dumps(stats)))
+            db.commit()
+
+    def solve(self, board, goal_board, algorithm="astar", heuristic_type="manhattan", max_nodes=50000):
+        """带缓存的求解：命中直接返回，否则调用求解器并在找到解时写入缓存"""
+        cached = self.get(board, goal_board, algorithm, heuristic_type)
+        if cached is not None:
+            return cached
+        solver = create_solver(algorithm, board, goal_board)
+        path, moves, stats = solver.solve(heuristic_type, max_nodes=max_nodes)
+        # 随时可用搜索在节点或时间预算内可能只得到次优解，这类结果不缓存
+        if stats.get("solution_found") and stats.get("optimal", True):
+            self.put(board, goal_board, algorithm, heuristic_type, path, moves, stats)
+        return path, moves, stats
+
+    def info(self):
+        """命中/未命中统计"""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return dict(self.stats, size=len(self.memory), max_size=self.max_size,
+                    hit_rate=hits / lookups if lookups else 0.0)
+
+    def clear(self, persistent=False):
+        """清空内存层（persistent=True 时同时清空磁盘库）并重置统计"""
+        self.memory.clear()
+        for name in self.stats:
+            self.stats[name] = 0
+        db = self._db() if persistent else None
+        if db is not None:
+            db.execute("DELETE FROM solutions")
+            db.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+_default_cache = None
+
+
+def get_solution_cache():
+    """进程内共享的默认解缓存"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SolutionCache()
+    return _default_cache
+
+
+def cached_solve(board, goal_board, algorithm="astar", heuristic_type="manhattan", max_nodes=50000):
+    """使用默认解缓存求解，返回值与求解器的 solve() 相同（命中时 stats 含 "cached" 字段）"""
+    return get_solution_cache().solve(board, goal_board, algorithm, heuristic_type, max_nodes)
+
+
+def solution_cache_info():
+    """默认解缓存的统计信息"""
+    return get_solution_cache().info()
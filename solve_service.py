@@ -0,0 +1,404 @@
+# solve_service.py
+# 本地求解服务：asyncio HTTP/JSON 接口，请求按微批次交给进程池求解，只监听本机地址
+# 用法：python solve_service.py [--port 8765] [--workers 4]
+#   curl -s localhost:8765/solve -d '{"board": "123456708"}'
+#   curl -s localhost:8765/metrics
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from packed_state import pack_board, unpack_board
+from solvers import create_solver
+from utils import create_goal_board, validate_board, percentile
+from cancellation import deadline_after, STOP_MESSAGES
+
+DEFAULT_PORT = 8765
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+LATENCY_WINDOW = 1024  # 延迟分位数基于最近这么多个请求
+THROUGHPUT_WINDOW = 60.0  # 吞吐量统计窗口（秒）
+MAX_BODY_SIZE = 1 << 16
+DEADLINE_GRACE = 0.25  # 等待工作进程按截止时间自行停止并回传部分统计的宽限（秒）
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 504: "Gateway Timeout"}
+
+
+def _solve_jobs(jobs):
+    """
+    工作进程任务：求解一个微批次
+    Args:
+        jobs: [(打包状态, 目标打包状态, rows, cols, 算法, 启发式, 最大扩展节点数, 截止时刻), ...]
+            截止时刻为 time.time() 时钟（进程之间可比），在工作进程中换算为求解器使用的单调时钟
+    Returns:
+        [(moves, stats), ...]，stats 另含求解耗时 seconds
+    """
+    results = []
+    for code, goal_code, rows, cols, algorithm, heuristic_type, max_nodes, wall_deadline in jobs:
+        start_time = time.perf_counter()
+        remaining = wall_deadline - time.time()
+        if remaining <= 0:  # 在批次中排队时已经超时
+            results.append((None, {"solution_found": False, "nodes_expanded": 0, "seconds": 0.0,
+                                   "stopped": "deadline", "error": STOP_MESSAGES["deadline"]}))
+            continue
+        solver = create_solver(algorithm, unpack_board(code, rows, cols), unpack_board(goal_code, rows, cols))
+        try:
+            _, moves, stats = solver.solve(heuristic_type, max_nodes=max_nodes, deadline=deadline_after(remaining))
+        except ValueError as e:  # 启发式不支持该尺寸或目标（如5x5的行走距离、非3x3的精确距离）
+            moves, stats = None, {"solution_found": False, "nodes_expanded": 0, "error": str(e)}
+        stats = {key: value for key, value in stats.items()
+                 if isinstance(value, (int, float, str, bool)) or value is None}
+        stats["seconds"] = time.perf_counter() - start_time
+        results.append((moves, stats))
+    return results
+
+
+def parse_request_board(value, rows=None, cols=None):
+    """
+    解析请求中的棋盘：二维列表、一维列表或紧凑字符串（见 cli.parse_compact）
+    未给出尺寸时，二维列表按自身推断，其余按正方形推断
+    Returns:
+        棋盘（二维列表），无效时返回None
+    """
+    from cli import parse_compact
+    if isinstance(value, str):
+        value = parse_compact(value)
+    if not isinstance(value, list) or not value:
+        return None
+    if isinstance(value[0], list):
+        return value if validate_board(value, rows, cols) else None
+    if rows is None:
+        rows = int(round(len(value) ** 0.5))
+    cols = rows if cols is None else cols
+    if len(value) != rows * cols:
+        return None
+    board = [value[i * cols:(i + 1) * cols] for i in range(rows)]
+    return board if validate_board(board, rows, cols) else None
+
+
+class ServiceMetrics:
+    """服务统计：请求计数、吞吐量、队列深度与延迟分位数"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.counts = {"requests": 0, "completed": 0, "solved": 0, "timeouts": 0, "errors": 0,
+                       "batches": 0, "batched_jobs": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.finished = deque()  # 最近完成时刻，用于计算窗口内吞吐量
+
+    def record(self, latency, solved, timed_out=False):
+        """
+        记录一个结束的求解请求
+        超时的请求单独计入 timeouts，但延迟同样计入分位数，否则最慢的请求会被漏掉、p95/p99 偏低
+        """
+        now = time.time()
+        if timed_out:
+            self.counts["timeouts"] += 1
+        else:
+            self.counts["completed"] += 1
+            self.counts["solved"] += solved
+        self.latencies.append(latency)
+        self.finished.append(now)
+        while self.finished and self.finished[0] < now - THROUGHPUT_WINDOW:
+            self.finished.popleft()
+
+    def snapshot(self, queue_depth, in_flight):
+        """当前统计（/metrics 的返回内容）"""
+        now = time.time()
+        while self.finished and self.finished[0] < now - THROUGHPUT_WINDOW:
+            self.finished.popleft()
+        uptime = now - self.started
+        latencies = sorted(self.latencies)
+        batches = self.counts["batches"]
+        return dict(self.counts,
+                    uptime_seconds=round(uptime, 3),
+                    queue_depth=queue_depth,
+                    in_flight=in_flight,
+                    throughput=round(len(self.finished) / min(uptime, THROUGHPUT_WINDOW), 3) if uptime else 0.0,
+                    mean_batch_size=round(self.counts["batched_jobs"] / batches, 3) if batches else 0.0,
+                    latency_ms={name: round(percentile(latencies, q) * 1000, 3) if latencies else 0.0
+                                for name, q in (("p50", 50), ("p95", 95), ("p99", 99))})
+
+
+class SolveService:
+    """
+    本地求解服务
+    每个 /solve 请求进入队列，后台批处理任务把 batch_window 秒内到达（最多 batch_size 个）的请求
+    合成一个微批次，再均分给各工作进程（每个进程一次提交），减少进程间通信次数而不让互不相关的请求排队；
+    解释器与查找表只在服务启动时加载一次
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, workers=None, batch_size=16,
+                 batch_window=0.005, max_nodes=50000, timeout=10.0):
+        """
+        初始化求解服务
+        Args:
+            host: 监听地址，只允许本机地址
+            port: 端口，0表示由系统分配
+            workers: 进程数，默认为CPU核数；0表示在线程中求解（调试用）
+            batch_size: 单个微批次的最大请求数
+            batch_window: 凑批等待时间（秒）
+            max_nodes: 单个请求最大扩展节点数的上限（请求可以指定更小的值）
+            timeout: 单个请求时间预算的上限（秒）
+        """
+        if host not in LOCAL_HOSTS:
+            raise ValueError(f"求解服务只能监听本机地址: {host}")
+        self.host = host
+        self.port = port
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_nodes = max_nodes
+        self.timeout = timeout
+        self.metrics = ServiceMetrics()
+        self.queue = None
+        self.in_flight = 0
+        self._server = None
+        self._executor = None
+        self._batcher = None
+        self._batch_tasks = set()  # 进行中的 _run_batch 任务
+
+    async def start(self):
+        """启动进程池、批处理任务与HTTP服务器"""
+        if self.workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """停止接受连接，取消进行中的批次并关闭进程池"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        tasks = list(self._batch_tasks)
+        if self._batcher is not None:
+            tasks.append(self._batcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def serve_forever(self):
+        """启动并一直运行"""
+        await self.start()
+        print(f"求解服务已启动: http://{self.host}:{self.port} （进程数 {self.workers}）")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _batch_loop(self):
+        """从队列凑微批次并提交给进程池"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # 已超时放弃的请求不再求解
+            batch = [(job, future) for job, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.metrics.counts["batches"] += 1
+            self.metrics.counts["batched_jobs"] += len(batch)
+            # 批次均分给各工作进程：凑批只为减少进程间通信次数，互不相关的请求不应在同一进程里排队
+            chunk_size = -(-len(batch) // max(1, self.workers))
+            for i in range(0, len(batch), chunk_size):
+                # 保留任务引用：事件循环只持有弱引用，未被引用的任务可能在执行中被回收
+                task = asyncio.ensure_future(self._run_batch(batch[i:i + chunk_size]))
+                self._batch_tasks.add(task)
+                task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        """在一个工作进程中求解微批次的一部分，并把结果分发给各请求"""
+        loop = asyncio.get_running_loop()
+        self.in_flight += len(batch)
+        try:
+            results = await loop.run_in_executor(self._executor, _solve_jobs, [job for job, _ in batch])
+        except asyncio.CancelledError:  # 服务停止：等待结果的请求随之取消
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:  # 工作进程异常时让该批次的所有请求失败，服务继续运行
+            results = [(None, {"solution_found": False, "error": f"求解失败: {e}"})] * len(batch)
+        finally:
+            self.in_flight -= len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def solve(self, request):
+        """
+        处理一个求解请求
+        Args:
+            request: {"board", 可选 "goal", "rows", "cols", "algorithm", "heuristic", "max_nodes", "timeout"}
+        Returns:
+            (HTTP状态码, 响应字典)
+        """
+        from solvers import SOLVERS
+        from heuristics import HEURISTICS
+
+        start_time = time.perf_counter()
+        self.metrics.counts["requests"] += 1
+        if not isinstance(request, dict):
+            return self._error(400, "请求体必须是JSON对象")
+        for name in ("rows", "cols"):
+            size = request.get(name)
+            if size is not None and (not isinstance(size, int) or isinstance(size, bool) or size < 1):
+                return self._error(400, f"{name} 必须是正整数")
+        try:
+            board = parse_request_board(request.get("board"), request.get("rows"), request.get("cols"))
+        except (TypeError, ValueError):
+            board = None
+        if board is None:
+            return self._error(400, "无效的棋盘")
+        rows, cols = len(board), len(board[0])
+        try:
+            goal_board = create_goal_board(rows, cols) if request.get("goal") is None else \
+                parse_request_board(request["goal"], rows, cols)
+        except (TypeError, ValueError):
+            goal_board = None
+        if goal_board is None:
+            return self._error(400, "无效的目标状态")
+        algorithm = request.get("algorithm", "astar")
+        heuristic_type = request.get("heuristic", "manhattan")
+        if not isinstance(algorithm, str) or not isinstance(heuristic_type, str):
+            return self._error(400, "algorithm 与 heuristic 必须是字符串")
+        if algorithm not in SOLVERS or heuristic_type not in HEURISTICS:
+            return self._error(400, f"未知的算法或启发式: {algorithm} / {heuristic_type}")
+        max_nodes = request.get("max_nodes", self.max_nodes)
+        if not isinstance(max_nodes, int) or isinstance(max_nodes, bool) or max_nodes < 1:
+            return self._error(400, "max_nodes 必须是正整数")
+        max_nodes = min(max_nodes, self.max_nodes)
+        timeout = request.get("timeout", self.timeout)
+        # NaN 与任何截止时刻比较都不成立，工作进程永远不会按时间停止；负数与0没有意义
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or \
+                not math.isfinite(timeout) or timeout <= 0:
+            return self._error(400, "timeout 必须是有限的正数（秒）")
+        timeout = min(float(timeout), self.timeout)
+
+        job = (pack_board(board), pack_board(goal_board), rows, cols, algorithm, heuristic_type, max_nodes,
+               time.time() + timeout)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((job, future))
+        try:
+            # 工作进程在截止时间自行停止；宽限期后仍无结果（如批次迟迟未开始）才直接放弃
+            moves, stats = await asyncio.wait_for(asyncio.shield(future), timeout + DEADLINE_GRACE)
+        except asyncio.TimeoutError:
+            future.cancel()
+            moves, stats = None, {"stopped": "deadline"}
+        latency = time.perf_counter() - start_time
+        if moves is None and stats.get("stopped") == "deadline":
+            self.metrics.record(latency, False, timed_out=True)
+            return 504, {"solved": False, "error": f"超过时间预算 {timeout} 秒", "stats": stats,
+                         "latency_ms": round(latency * 1000, 3)}
+
+        solved = bool(stats.get("solution_found"))
+        self.metrics.record(latency, solved)
+        response = {"solved": solved, "moves": moves, "length": len(moves) if solved else None,
+                    "stats": stats, "latency_ms": round(latency * 1000, 3)}
+        return 200, response
+
+    def _error(self, status, message):
+        self.metrics.counts["errors"] += 1
+        return status, {"solved": False, "error": message}
+
+    async def _handle_connection(self, reader, writer):
+        """处理一个连接上的HTTP/1.1请求（支持keep-alive）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "无效的请求行"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload = self._error(400, "无效的 Content-Length")
+                    await self._respond(writer, status, payload, False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {"error": "请求体过大"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._route(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        """按路径分发请求"""
+        if path == "/solve":
+            if method != "POST":
+                return 405, {"error": "请使用POST"}
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                return self._error(400, "请求体不是有效的JSON")
+            return await self.solve(request)
+        if path == "/metrics":
+            return 200, self.metrics.snapshot(self.queue.qsize(), self.in_flight)
+        if path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"未知路径: {path}"}
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地求解服务（HTTP/JSON，只监听本机）")
+    parser.add_argument("--host", default="127.0.0.1", choices=LOCAL_HOSTS)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, help="进程数（默认CPU核数）")
+    parser.add_argument("--batch-size", type=int, default=16, help="单个微批次的最大请求数")
+    parser.add_argument("--batch-window", type=float, default=0.005, help="凑批等待时间（秒）")
+    parser.add_argument("--max-nodes", type=int, default=50000, help="单个请求最大扩展节点数的上限")
+    parser.add_argument("--timeout", type=float, default=10.0, help="单个请求时间预算的上限（秒）")
+    args = parser.parse_args()
+    service = SolveService(args.host, args.port, args.workers, args.batch_size, args.batch_window,
+                           args.max_nodes, args.timeout)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,22 @@
+# solvers.py
+from a_star import AStarSolver
+from ida_star import IDAStarSolver
+from bidirectional import BidirectionalAStarSolver
+from distance_table import TableSolver
+from anytime import AnytimeSolver
+
+# 求解算法注册表：名称 -> 求解器类（均提供 solve() -> (path, moves, stats)）
+SOLVERS = {
+    "astar": AStarSolver,
+    "idastar": IDAStarSolver,
+    "bidirectional": BidirectionalAStarSolver,
+    "table": TableSolver,
+    "anytime": AnytimeSolver,
+}
+
+
+def create_solver(algorithm, initial_board, goal_board):
+    """按名称创建求解器"""
+    if algorithm not in SOLVERS:
+        raise ValueError(f"未知的求解算法: {algorithm}")
+    return SOLVERS[algorithm](initial_board, goal_board)
@@ -0,0 +1,96 @@
+# symmetry.py
+from packed_state import tile_bits
+from move_tables import TRANSPOSED_MOVE
+from relabel import canonical_goal
+
+_transpositions = {}
+
+
+class Transposition:
+    """
+    方形棋盘的转置对称（结合数字重标记）：
+    把位置(r, c)换到(c, r)，再把数字换成转置后规范目标中的编号。
+    规范目标（空白格在blank）下的状态由此映射为规范目标（空白格在转置位置）下的状态，
+    到目标的距离不变，移动方向按 TRANSPOSED_MOVE 对应；空白格在主对角线上时目标映射到自身
+    """
+
+    def __init__(self, size, blank):
+        """
+        初始化转置映射
+        Args:
+            size: 棋盘边长
+            blank: 源规范目标的空白格位置
+        """
+        self.size = size
+        self.cells = size * size
+        self.bits = tile_bits(self.cells)
+        self.positions = [(pos % size) * size + pos // size for pos in range(self.cells)]
+        self.blank = blank
+        self.image_blank = self.positions[blank]
+
+        source = [num for row in canonical_goal(size, size, blank) for num in row]
+        target = [num for row in canonical_goal(size, size, self.image_blank) for num in row]
+        # labels[源编号] = 目标框架中的编号：源目标p处的数字对应目标框架转置位置上的数字
+        self.labels = [0] * self.cells
+        for pos, tile in enumerate(source):
+            self.labels[tile] = target[self.positions[pos]]
+
+    def board(self, board):
+        """源框架棋盘 -> 目标框架棋盘"""
+        flat = [0] * self.cells
+        labels, positions = self.labels, self.positions
+        for pos, num in enumerate(num for row in board for num in row):
+            flat[positions[pos]] = labels[num]
+        return [flat[i * self.size:(i + 1) * self.size] for i in range(self.size)]
+
+    def code(self, code):
+        """源框架打包状态 -> 目标框架打包状态"""
+        bits, mask = self.bits, (1 << self.bits) - 1
+        labels, positions = self.labels, self.positions
+        result = 0
+        for pos in range(self.cells):
+            result |= labels[(code >> (pos * bits)) & mask] << (positions[pos] * bits)
+        return result
+
+    def moves(self, move_ids):
+        """移动编号序列在另一框架中的对应序列（转置是对合，两个方向通用）"""
+        return [TRANSPOSED_MOVE[move] for move in move_ids]
+
+
+def get_transposition(rows, cols, blank):
+    """获取（并缓存）转置映射；非方形棋盘没有转置对称，返回None"""
+    if rows != cols:
+        return None
+    key = (rows, blank)
+    if key not in _transpositions:
+        _transpositions[key] = Transposition(rows, blank)
+    return _transpositions[key]
+
+
+def stored_frame(rows, cols, blank):
+    """
+    查找表实际保存的框架：互为转置的两个空白格位置共用下标较小者的表
+    Returns:
+        (表的空白格位置, 需先施加的转置映射或None)
+    """
+    transposition = get_transposition(rows, cols, blank)
+    if transposition is None or transposition.image_blank >= blank:
+        return blank, None
+    return transposition.image_blank, transposition
+
+
+def representative(code, rows, cols, blank):
+    """
+    状态所在对称类的代表：先换到保存的框架，空白格在对角线上时再取状态与其转置中编码较小者
+    Returns:
+        (代表状态编码, 代表框架的空白格位置, 是否经过转置)
+    """
+    transposition = get_transposition(rows, cols, blank)
+    if transposition is None:
+        return code, blank, False
+    if transposition.image_blank == blank:
+        image = transposition.code(code)
+        return (image, blank, True) if image < code else (code, blank, False)
+    if transposition.image_blank < blank:
+        return transposition.code(code), transposition.image_blank, True
+    return code, blank, False
@@ -0,0 +1,42 @@
+# table_io.py
+# 查找表（距离表、模式数据库分组表）共用的常量与磁盘读写
+import mmap
+import os
+import tempfile
+
+UNKNOWN = 255  # 尚未访问的距离（每个状态一个字节，最大有效距离254）
+
+
+def load_table(path, size):
+    """
+    以只读内存映射方式加载查找表，多个进程打开同一文件时由操作系统页缓存共享
+    Args:
+        path: 表文件路径
+        size: 期望的字节数
+    Returns:
+        memoryview（下标和迭代都返回整数，与bytearray一致）；文件不存在或大小不符时返回None
+    """
+    if not os.path.exists(path) or os.path.getsize(path) != size:
+        return None
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped)
+
+
+def save_table(table, path):
+    """
+    保存查找表到磁盘（先写临时文件再替换，避免留下不完整的表）
+    每个写入者使用目标目录中各自的临时文件，多个进程同时构建并保存同一张表时互不干扰
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(table)
+        os.chmod(tmp_path, 0o644)  # mkstemp 只给所有者读写权限，表文件应与普通文件一样可读
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -1,5 +1,6 @@
 # test_cases.py
 import unittest
+import importlib.util
 from a_star import AStarSolver
 from utils import create_goal_board
 
@@ -149,6 +150,826 @@ class TestEightPuzzle(unittest.TestCase):
         misplaced_h = state.h_misplaced(goal)
         self.assertEqual(misplaced_h, 1)  # 只有数字8位置不对
 
+    def test_packed_state(self):
+        """测试打包整数编码"""
+        from packed_state import PackedState, pack_board, unpack_board
+
+        board = [[8, 7, 6], [5, 4, 3], [2, 1, 0]]
+        code = pack_board(board)
+        self.assertEqual(unpack_board(code, 3), board)
+
+        state = PackedState.from_board(board)
+        self.assertEqual(state.blank, 8)
+        self.assertEqual(state.tile_at(0), 8)
+        self.assertEqual(state, PackedState.from_board([row[:] for row in board]))
+        self.assertEqual(len({state, state.copy()}), 1)
+
+    def test_solution_path_states(self):
+        """测试解路径只在最后构造，且父子关系与移动序列一致"""
+        test_cases, goal_board = get_test_cases()
+        solver = AStarSolver(test_cases["medium"]["board"], goal_board)
+        path, moves, stats = solver.solve("manhattan")
+
+        self.assertEqual(stats["path_length"], len(moves))
+        self.assertEqual(path[0].board, test_cases["medium"]["board"])
+        self.assertEqual(path[-1].board, goal_board)
+        for i in range(1, len(path)):
+            self.assertIs(path[i].parent, path[i - 1])
+            self.assertEqual(path[i].move, moves[i - 1])
+            self.assertEqual(path[i].g, i)
+
+    def test_move_apply_undo(self):
+        """测试移动表与原地执行/撤销移动"""
+        from packed_state import PackedState
+        from move_tables import get_successor_table, INVERSE_MOVE
+
+        board = [[1, 2, 3], [4, 0, 5], [6, 7, 8]]
+        state = PackedState.from_board(board)
+        self.assertEqual(len(state.legal_moves()), 4)
+
+        # 父移动剪枝：上一步为"上"时不再生成"下"
+        self.assertNotIn(INVERSE_MOVE[0], [m for m, _ in state.legal_moves(0)])
+        self.assertEqual(len(get_successor_table(3)[0][-1]), 2)  # 角落只有两个方向
+
+        original = state.code
+        tile = state.apply(0)  # 空白格上移
+        self.assertEqual(tile, 2)
+        self.assertEqual(state.to_board(), [[1, 0, 3], [4, 2, 5], [6, 7, 8]])
+        state.undo(0)
+        self.assertEqual(state.code, original)
+        self.assertEqual(state.blank, 4)
+
+    def test_incremental_heuristics(self):
+        """测试增量启发式与完整计算结果一致"""
+        import random
+        from packed_state import PackedState
+        from heuristics import HEURISTICS, create_heuristic
+
+        goal = create_goal_board()
+        rng = random.Random(7)
+        for name in HEURISTICS:
+            heuristic = create_heuristic(name, goal)
+            state = PackedState.from_board([[8, 7, 6], [5, 4, 3], [2, 1, 0]])
+            h = heuristic.evaluate(state.code)
+            for _ in range(200):
+                blank = state.blank
+                move, target = rng.choice(state.legal_moves())
+                tile = state.apply(move)
+                h = heuristic.update(h, state.code, tile, target, blank)
+                self.assertEqual(h, heuristic.evaluate(state.code), name)
+
+    def test_stronger_heuristics(self):
+        """测试线性冲突与行走距离：可采纳、不弱于曼哈顿距离，且减少扩展节点"""
+        from packed_state import PackedState
+        from puzzle_state import PuzzleState
+        from heuristics import create_heuristic
+        from distance_table import lookup_distance
+
+        test_cases, goal_board = get_test_cases()
+        manhattan = create_heuristic("manhattan", goal_board)
+        board = test_cases["hard"]["board"]
+        _, _, manhattan_stats = AStarSolver(board, goal_board).solve("manhattan")
+        for name in ("linear_conflict", "walking_distance"):
+            heuristic = create_heuristic(name, goal_board)
+            for case in test_cases.values():
+                distance = lookup_distance(case["board"])
+                if distance is None:
+                    continue
+                code = PackedState.from_board(case["board"]).code
+                self.assertLessEqual(manhattan.evaluate(code), heuristic.evaluate(code))
+                self.assertLessEqual(heuristic.evaluate(code), distance)
+
+            path, moves, stats = AStarSolver(board, goal_board).solve(name)
+            self.assertEqual(stats["path_length"], manhattan_stats["path_length"])
+            self.assertLess(stats["nodes_expanded"], manhattan_stats["nodes_expanded"])
+            self.assertEqual(PuzzleState(board).h(goal_board, name), heuristic.evaluate(PackedState.from_board(board).code))
+
+        # 线性冲突的逐线缓存有上限，满了清空后结果不变
+        import heuristics
+        limit = heuristics.LINE_CACHE_LIMIT
+        heuristics.LINE_CACHE_LIMIT = 8
+        try:
+            bounded = create_heuristic("linear_conflict", create_goal_board(4))
+            reference = create_heuristic("linear_conflict", create_goal_board(4))
+            for case_board in ([[5, 1, 2, 4], [9, 6, 3, 8], [13, 10, 7, 11], [14, 15, 12, 0]],
+                               [[15, 14, 13, 12], [11, 10, 9, 8], [7, 6, 5, 4], [3, 1, 2, 0]]):
+                code = PackedState.from_board(case_board).code
+                self.assertEqual(bounded.evaluate(code), reference.evaluate(code))
+                self.assertLessEqual(len(bounded._cache), 8)
+        finally:
+            heuristics.LINE_CACHE_LIMIT = limit
+
+        # 行走距离表超过规模上限时在有限时间内放弃（5x5每个方向约6500万个状态），之后直接拒绝
+        import time
+        start = time.perf_counter()
+        with self.assertRaises(ValueError):
+            create_heuristic("walking_distance", create_goal_board(5))
+        with self.assertRaises(ValueError):
+            create_heuristic("walking_distance", create_goal_board(5))
+        self.assertLess(time.perf_counter() - start, 10)
+        _, _, stats = AStarSolver(create_goal_board(4), create_goal_board(4)).solve("walking_distance")
+        self.assertTrue(stats["solution_found"])
+
+    def test_pattern_database(self):
+        """测试加性模式数据库：可采纳、可从磁盘缓存重新加载，并大幅减少扩展节点"""
+        import os
+        import tempfile
+        from packed_state import PackedState
+        from pattern_db import PatternDatabase
+        from heuristics import create_heuristic
+        from distance_table import lookup_distance
+
+        test_cases, goal_board = get_test_cases()
+        pdb = create_heuristic("pdb", goal_board)
+        manhattan = create_heuristic("manhattan", goal_board)
+        for case in test_cases.values():
+            distance = lookup_distance(case["board"])
+            if distance is None:
+                continue
+            code = PackedState.from_board(case["board"]).code
+            self.assertLessEqual(manhattan.evaluate(code), pdb.evaluate(code))
+            self.assertLessEqual(pdb.evaluate(code), distance)
+
+        # 2x3棋盘：磁盘缓存与内存构建结果一致
+        small_goal = [[1, 2, 3], [4, 5, 0]]
+        partition = ((1, 2, 4), (3, 5))
+        with tempfile.TemporaryDirectory() as table_dir:
+            built = PatternDatabase(small_goal, partition, table_dir)
+            loaded = PatternDatabase(small_goal, partition, table_dir)
+            for built_table, loaded_table in zip(built.tables, loaded.tables):
+                self.assertIsInstance(loaded_table, memoryview)
+                self.assertEqual(bytes(built_table), bytes(loaded_table))
+        with self.assertRaises(ValueError):
+            PatternDatabase(small_goal, ((1, 2), (2, 3)), None)
+
+        # 多个写入者同时保存同一张表：各自使用独立的临时文件，不会替换掉或删掉对方的临时文件
+        from concurrent.futures import ThreadPoolExecutor
+        from table_io import save_table, load_table
+        table = bytes(range(256)) * 4096
+        with tempfile.TemporaryDirectory() as table_dir:
+            path = os.path.join(table_dir, "shared.bin")
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                for _ in range(3):
+                    list(pool.map(save_table, [table] * 16, [path] * 16))
+            self.assertEqual(bytes(load_table(path, len(table))), table)
+            self.assertEqual(os.listdir(table_dir), ["shared.bin"])
+
+        board = test_cases["hard"]["board"]
+        _, _, manhattan_stats = AStarSolver(board, goal_board).solve("manhattan")
+        _, _, pdb_stats = AStarSolver(board, goal_board).solve("pdb")
+        self.assertEqual(pdb_stats["path_length"], manhattan_stats["path_length"])
+        self.assertLess(pdb_stats["nodes_expanded"], manhattan_stats["nodes_expanded"] // 10)
+
+    def test_rectangular_boards(self):
+        """测试任意 M x N 棋盘：目标状态、可解性（偶数宽度与任意目标）、邻居生成与求解"""
+        from puzzle_state import PuzzleState
+        from utils import create_random_board, validate_board, is_solvable
+
+        goal_4x4 = create_goal_board(4)
+        self.assertEqual(goal_4x4[3], [13, 14, 15, 0])
+        self.assertEqual(create_goal_board(2, 3), [[1, 2, 3], [4, 5, 0]])
+        self.assertTrue(validate_board(goal_4x4))
+        self.assertFalse(validate_board(goal_4x4, 3))
+        self.assertFalse(validate_board([[1, 2, 3], [4, 5, 5]]))
+
+        # 偶数宽度：交换最后两个数字不可解，空白格上移一行仍可解
+        swapped = [row[:] for row in goal_4x4]
+        swapped[3][1], swapped[3][2] = swapped[3][2], swapped[3][1]
+        self.assertFalse(is_solvable(swapped, goal_4x4))
+        self.assertTrue(is_solvable([[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 0], [13, 14, 15, 12]], goal_4x4))
+        # 相对任意目标：目标本身为“交换后”的棋盘时结论相反
+        self.assertTrue(is_solvable(swapped, swapped))
+        self.assertFalse(is_solvable(goal_4x4, swapped))
+
+        state = PuzzleState([[1, 2, 3], [4, 0, 5]])
+        self.assertEqual(sorted(n.move for n in state.get_neighbors()), ["上", "右", "左"])
+
+        for rows, cols in ((4, 4), (2, 4), (3, 4)):
+            goal_board = create_goal_board(rows, cols)
+            board = create_random_board(rows, moves=20, cols=cols)
+            self.assertTrue(is_solvable(board, goal_board))
+            path, moves, stats = AStarSolver(board, goal_board).solve("manhattan")
+            self.assertTrue(stats["solution_found"])
+            self.assertEqual(path[-1].board, goal_board)
+            self.assertEqual(len(path[-1].board[0]), cols)
+
+    def test_solve_many(self):
+        """测试进程池批量求解：结果覆盖全部实例，且与单独求解的步数一致"""
+        from batch_solve import solve_many
+
+        test_cases, goal_board = get_test_cases()
+        boards = [case["board"] for case in test_cases.values()]
+        expected = [AStarSolver(board, goal_board).solve("manhattan")[2] for board in boards]
+
+        for workers in (1, 2):
+            results = list(solve_many(boards, goal_board, "manhattan", workers=workers, chunk_size=1))
+            self.assertEqual(sorted(index for index, _, _ in results), list(range(len(boards))))
+            for index, moves, stats in results:
+                self.assertEqual(stats.get("solution_found"), expected[index].get("solution_found"))
+                if moves is not None:
+                    self.assertEqual(len(moves), expected[index]["path_length"])
+                    self.assertEqual(stats["path_length"], len(moves))
+
+    def test_cli_stream(self):
+        """测试流式命令行：多种输入格式、按输入顺序输出、并行结果一致，且不导入tkinter与asyncio"""
+        import io
+        import json
+        import os
+        import subprocess
+        import sys
+        from cli import main as cli_main
+
+        lines = ["123456708", "[[1, 2, 3], [4, 5, 6], [0, 7, 8]]", '{"id": "a", "board": "1,2,3,4,5,6,7,8,0"}',
+                 "", "12345678", "213456780", "867254301"]
+        outputs = []
+        for workers in ("1", "2"):
+            stdout = io.StringIO()
+            code = cli_main(["--workers", workers, "--chunk-size", "2", "--max-pending", "1"],
+                            io.StringIO("\n".join(lines) + "\n"), stdout)
+            self.assertEqual(code, 1)
+            outputs.append([json.loads(line) for line in stdout.getvalue().splitlines()])
+        results = outputs[0]
+        self.assertEqual([result["index"] for result in results], list(range(6)))
+        self.assertEqual([result["solved"] for result in results], [True, True, True, False, False, True])
+        self.assertEqual((results[0]["moves"], results[2]["id"], results[5]["length"]), (["右"], "a", 31))
+        self.assertIn("error", results[3])
+        for single, parallel in zip(*outputs):
+            self.assertEqual(single.get("length"), parallel.get("length"))
+
+        modules = subprocess.run([sys.executable, "-c", "import cli, main, sys; print('tkinter' in sys.modules, 'asyncio' in sys.modules)"],
+                                 capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(modules.stdout.strip(), "False False")
+
+    def test_solve_service(self):
+        """测试本地求解服务：HTTP求解、微批次、时间预算、错误请求与 /metrics"""
+        import asyncio
+        import json
+        import urllib.error
+        import urllib.request
+        import socket
+        from solve_service import SolveService, ServiceMetrics
+        from utils import percentile
+
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
+        with self.assertRaises(ValueError):
+            SolveService(host="0.0.0.0")
+
+        def request(port, path, payload=None):
+            data = None if payload is None else json.dumps(payload).encode("utf-8")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", data) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        async def scenario():
+            service = await SolveService(port=0, workers=1, batch_window=0.05).start()
+            loop = asyncio.get_running_loop()
+            try:
+                payloads = [{"board": "123456708"}, {"board": [[8, 7, 6], [5, 4, 3], [2, 1, 0]]},
+                            {"board": "213456780"}, {"board": "12345678"}]
+                results = await asyncio.gather(*[loop.run_in_executor(None, request, service.port, "/solve", payload)
+                                                 for payload in payloads])
+                timeout = await loop.run_in_executor(None, request, service.port, "/solve",
+                                                     {"board": "867254301", "heuristic": "misplaced",
+                                                      "timeout": 0.001})
+                bad = await asyncio.gather(*[loop.run_in_executor(None, request, service.port, "/solve", payload)
+                                             for payload in ({"board": "12345678!"}, {"board": "123456708",
+                                                             "heuristic": ["x"]}, {"board": [[1, 2], 3]},
+                                                             {"board": "123456708", "rows": [3]},
+                                                             {"board": "123456708", "goal": [[1]] * 9},
+                                                             {"board": "123456708", "timeout": float("nan")},
+                                                             {"board": "123456708", "timeout": -1},
+                                                             {"board": "123456708", "max_nodes": -5},
+                                                             {"board": "123456708", "max_nodes": True})])
+
+                def raw_request():
+                    with socket.create_connection(("127.0.0.1", service.port)) as conn:
+                        conn.sendall(b"POST /solve HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+                        return conn.makefile("rb").readline()
+                raw = await loop.run_in_executor(None, raw_request)
+                metrics = await loop.run_in_executor(None, request, service.port, "/metrics")
+                return results, timeout, bad, raw, metrics
+            finally:
+                await service.stop()
+                self.assertEqual(service._batch_tasks, set())
+
+        results, timeout, bad, raw, metrics = asyncio.run(scenario())
+        self.assertEqual([status for status, _ in bad], [400] * 9)  # 错误请求得到400响应而不是断开连接
+        self.assertTrue(raw.startswith(b"HTTP/1.1 400"))
+        self.assertEqual([status for status, _ in results], [200, 200, 200, 400])
+        self.assertEqual(results[0][1]["moves"], ["右"])
+        self.assertEqual(results[1][1]["length"], 30)
+        self.assertFalse(results[2][1]["solved"])
+        self.assertEqual(timeout[0], 504)
+        self.assertEqual(timeout[1]["stats"]["stopped"], "deadline")  # 工作进程按截止时间自行停止
+        status, metrics = metrics
+        self.assertEqual(status, 200)
+        self.assertEqual((metrics["requests"], metrics["completed"], metrics["timeouts"]), (14, 3, 1))
+        self.assertLess(metrics["batches"], 3)
+        self.assertGreater(metrics["latency_ms"]["p99"], 0)
+        self.assertGreaterEqual(metrics["latency_ms"]["p99"], timeout[1]["latency_ms"])
+
+        # 超时请求单独计数，但其延迟计入分位数
+        service_metrics = ServiceMetrics()
+        for _ in range(9):
+            service_metrics.record(0.01, True)
+        service_metrics.record(5.0, False, timed_out=True)
+        snapshot = service_metrics.snapshot(0, 0)
+        self.assertEqual((snapshot["completed"], snapshot["timeouts"]), (9, 1))
+        self.assertEqual(snapshot["latency_ms"]["p99"], 5000.0)
+
+    def test_deadline_and_cancellation(self):
+        """测试截止时间与协作式取消：各求解器及时停止并返回部分统计，异步包装响应任务取消"""
+        import asyncio
+        import threading
+        import time
+        from solvers import SOLVERS
+        from cancellation import CancellationToken, deadline_after, solve_async
+
+        goal_board = create_goal_board(4)
+        board = [[15, 14, 13, 12], [11, 10, 9, 8], [7, 6, 5, 4], [3, 1, 2, 0]]
+        for name in ("astar", "idastar", "bidirectional"):
+            start_time = time.perf_counter()
+            _, moves, stats = SOLVERS[name](board, goal_board).solve(
+                "manhattan", max_nodes=10 ** 9, deadline=deadline_after(0.05))
+            self.assertLess(time.perf_counter() - start_time, 1.0, name)
+            self.assertIsNone(moves)
+            self.assertEqual(stats["stopped"], "deadline")
+            self.assertGreater(stats["nodes_expanded"], 0)
+            self.assertGreaterEqual(stats["lower_bound"], 0)
+
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        stats = SOLVERS["astar"](board, goal_board).solve("manhattan", max_nodes=10 ** 9, cancel_token=token)[2]
+        self.assertEqual(stats["stopped"], "cancelled")
+
+        # 没有限制时与原来的行为相同
+        test_cases, goal = get_test_cases()
+        self.assertNotIn("stopped", AStarSolver(test_cases["hard"]["board"], goal).solve(
+            "manhattan", deadline=deadline_after(60))[2])
+
+        async def scenario():
+            task = asyncio.ensure_future(solve_async(AStarSolver(board, goal_board), max_nodes=10 ** 9))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await solve_async(AStarSolver(test_cases["hard"]["board"], goal), timeout=5)
+
+        _, moves, stats = asyncio.run(scenario())
+        self.assertEqual(len(moves), 30)
+
+    def test_anytime_search(self):
+        """测试ARA*：逐个产出不断改进的解，次优界成立，最后证明最优；回调可提前停止"""
+        import random
+        from anytime import AnytimeSolver
+        from distance_table import lookup_distance
+        from utils import create_random_board
+
+        test_cases, goal_board = get_test_cases()
+        random.seed(3)
+        boards = [test_cases["hard"]["board"]] + [create_random_board(moves=60) for _ in range(10)]
+        for board in boards:
+            optimal = lookup_distance(board)
+            results = list(AnytimeSolver(board, goal_board).solve_iter("manhattan", max_nodes=10 ** 6))
+            lengths = [len(moves) for _, moves, _ in results]
+            self.assertEqual(lengths, sorted(lengths, reverse=True))
+            for path, moves, stats in results:
+                self.assertLessEqual(len(moves), stats["bound"] * optimal + 1e-9)
+                self.assertEqual(path[-1].board, goal_board)
+            self.assertTrue(results[-1][2]["optimal"])
+            self.assertEqual(lengths[-1], optimal)
+
+        board = test_cases["hard"]["board"]
+        first = []
+        _, moves, stats = AnytimeSolver(board, goal_board).solve(
+            "manhattan", initial_weight=5, on_solution=lambda path, moves, stats: first.append(stats) or True)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(stats["weight"], 5)
+        self.assertFalse(AnytimeSolver(board, goal_board).solve("manhattan", max_nodes=10)[2]["solution_found"])
+
+    def test_benchmark(self):
+        """测试基准测试：实例集按深度分层且可复现，结果可写成JSON/CSV，与基线比较能发现退化"""
+        import contextlib
+        import copy
+        import io
+        import os
+        import csv
+        import tempfile
+        from benchmark import generate_corpus, run_benchmark, summarize, compare, write_results, load_json
+        from distance_table import lookup_distance
+
+        corpus = generate_corpus(per_depth=2, depths=[0, 5, 12, 31], seed=7)
+        self.assertEqual(corpus, generate_corpus(per_depth=2, depths=[0, 5, 12, 31], seed=7))
+        self.assertEqual([i["depth"] for i in corpus["instances"]], [0, 5, 5, 12, 12, 31, 31])
+        for instance in corpus["instances"]:
+            self.assertEqual(lookup_distance(instance["board"]), instance["depth"])
+        walks = generate_corpus(per_depth=2, depths=[4], seed=1, rows=4)
+        self.assertEqual(len(walks["instances"]), 2)
+        self.assertEqual(len(walks["instances"][0]["board"]), 4)
+
+        results = run_benchmark(corpus, ["astar", "table"], ["manhattan", "linear_conflict"], memory=False)
+        self.assertEqual(len(results), 3 * 7)
+        for result in results:
+            self.assertTrue(result["solved"])
+            self.assertEqual(result["path_length"], result["depth"])
+        summary = summarize(results)
+        self.assertEqual(set(summary), {"astar/manhattan", "astar/linear_conflict", "table/-"})
+        self.assertEqual(compare(summary, summary), [])
+
+        worse = copy.deepcopy(summary)
+        worse["astar/manhattan"]["nodes_mean"] *= 1.5
+        worse["table/-"]["solved"] -= 1
+        flagged = {(r["key"], r["metric"]) for r in compare(worse, summary, threshold=0.1)}
+        self.assertEqual(flagged, {("astar/manhattan", "nodes_mean"), ("table/-", "solved")})
+
+        # 5x5 的行走距离表过大：该组合被跳过，其他组合照常运行
+        large = generate_corpus(per_depth=1, depths=[2], seed=0, rows=5)
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            results_5x5 = run_benchmark(large, ["astar"], ["manhattan", "walking_distance"], memory=False)
+        self.assertEqual([(r["heuristic"], r["solved"]) for r in results_5x5], [("manhattan", True)])
+        self.assertIn("walking_distance", stderr.getvalue())
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "results.json")
+            csv_path = os.path.join(directory, "results.csv")
+            write_results(results, json_path, corpus)
+            write_results(results, csv_path)
+            self.assertEqual(load_json(json_path)["summary"]["table/-"]["solved"], 7)
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                self.assertEqual(len(list(csv.DictReader(f))), len(results))
+
+    def test_measure_performance(self):
+        """测试计时工具：分段计时、分位数置信区间、未解运行如实报告、GC状态恢复"""
+        import gc
+        from utils import measure_performance, percentile, quantile_interval
+        from distance_table import lookup_distance
+
+        ordered = list(range(1, 101))
+        self.assertEqual(percentile(ordered, 50), 50)
+        self.assertEqual(percentile(ordered, 99), 99)
+        # 中位数95%置信区间的教科书次序统计量秩：n=10 为第2与第9个，n=100 为第40与第61个
+        self.assertEqual(quantile_interval(list(range(1, 11)), 50), (2, 9))
+        self.assertEqual(quantile_interval(ordered, 50), (40, 61))
+        self.assertEqual(quantile_interval([7], 50), (7, 7))
+        self.assertLess(quantile_interval(list(range(5000)), 99, 0.99)[1], 4999)
+
+        test_cases, goal_board = get_test_cases()
+        board = [[4, 1, 3], [7, 2, 6], [0, 5, 8]]
+        for algorithm in ("astar", "idastar"):
+            report = measure_performance(board, goal_board, "manhattan", runs=5, warmup=1, algorithm=algorithm)
+            self.assertEqual((report["solved_runs"], report["unsolved_runs"]), (5, 0))
+            self.assertEqual(report["path_length"], lookup_distance(board))
+            for phase in ("setup", "search", "reconstruct", "total"):
+                summary = report[phase]
+                self.assertLessEqual(summary["median_ci"][0], summary["median"])
+                self.assertLessEqual(summary["median"], summary["p95"])
+                self.assertLessEqual(summary["p95"], summary["p99"])
+            self.assertGreater(report["reconstruct"]["median"], 0)
+            self.assertGreaterEqual(report["total"]["min"], report["search"]["min"])
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(report["gc"]["collections"], 0)
+
+        report = measure_performance(test_cases["hard"]["board"], goal_board, "manhattan", runs=3, warmup=0,
+                                     max_nodes=10)
+        self.assertEqual((report["solved_runs"], report["unsolved_runs"]), (0, 3))
+        self.assertEqual(len(report["errors"]), 1)
+        self.assertEqual(report["nodes"]["max"], 10)
+        self.assertIsNotNone(report["search"]["median"])
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "需要NumPy")
+    def test_batch_eval(self):
+        """测试向量化批量启发式与可解性与逐个计算一致"""
+        from itertools import islice, permutations
+        from puzzle_state import PuzzleState
+        from utils import is_solvable
+        from batch_eval import batch_evaluate, triage, INVALID
+
+        _, goal_board = get_test_cases()
+        boards = [[list(p[:3]), list(p[3:6]), list(p[6:])]
+                  for p in islice(permutations(range(9)), 0, 362880, 997)]
+        values = batch_evaluate(boards, goal_board)
+        for k, board in enumerate(boards):
+            state = PuzzleState(board)
+            self.assertEqual(values["manhattan"][k], state.h_manhattan(goal_board))
+            self.assertEqual(values["misplaced"][k], state.h_misplaced(goal_board))
+            self.assertEqual(bool(values["solvable"][k]), is_solvable(board, goal_board))
+            tiles = [num for row in board for num in row if num != 0]
+            inversions = sum(1 for i in range(8) for j in range(i + 1, 8) if tiles[i] > tiles[j])
+            self.assertEqual(values["parity"][k], inversions % 2)
+
+        order = triage(boards, goal_board)
+        self.assertEqual(len(order), int(values["solvable"].sum()))
+        self.assertTrue(all(values["solvable"][order]))
+        h = values["manhattan"][order]
+        self.assertTrue((h[:-1] <= h[1:]).all())
+
+        # 数字越界或为负的棋盘不会引发IndexError或回绕查表，得到 INVALID 且不可解
+        invalid = [[[1, 2, 3], [4, 5, 6], [7, 9, 0]], [[1, 2, 3], [4, 5, 6], [7, -1, 0]], goal_board]
+        values = batch_evaluate(invalid, goal_board)
+        self.assertEqual(values["manhattan"].tolist(), [INVALID, INVALID, 0])
+        self.assertEqual(values["misplaced"].tolist(), [INVALID, INVALID, 0])
+        self.assertEqual(values["solvable"].tolist(), [False, False, True])
+        self.assertEqual(triage(invalid, goal_board).tolist(), [2])
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "需要NumPy")
+    def test_bfs_engine(self):
+        """测试向量化BFS引擎与逐状态构建结果一致，并给出逐层统计"""
+        from bfs_engine import build_permutation_table, build_pattern_distances
+        from pattern_db import _build_pattern_table_python
+        from permutation_rank import rank_board, state_count
+
+        def reference_table(goal_board):
+            """独立的参照：按元组逐状态广度优先搜索，用标量 rank_board 编号（不经过 bfs_engine 与批量排名）"""
+            rows, cols = len(goal_board), len(goal_board[0])
+            goal = tuple(num for row in goal_board for num in row)
+            distances = {goal: 0}
+            frontier = [goal]
+            while frontier:
+                next_frontier = []
+                for state in frontier:
+                    blank = state.index(0)
+                    i, j = divmod(blank, cols)
+                    for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+                        if 0 <= ni < rows and 0 <= nj < cols:
+                            child = list(state)
+                            target = ni * cols + nj
+                            child[blank], child[target] = child[target], 0
+                            child = tuple(child)
+                            if child not in distances:
+                                distances[child] = distances[state] + 1
+                                next_frontier.append(child)
+                frontier = next_frontier
+            table = bytearray([255]) * state_count(rows, cols)
+            for state, distance in distances.items():
+                table[rank_board([state[i * cols:(i + 1) * cols] for i in range(rows)])] = distance
+            return table
+
+        # 3x3 完整表约需3秒逐状态搜索，这里用较小的棋盘（含非标准目标）与独立参照比较
+        for goal_board in ([[1, 2, 3], [4, 5, 0]], [[1, 2], [3, 4], [5, 0]],
+                           create_goal_board(2, 4), [[3, 1, 2, 7], [0, 5, 4, 6]]):
+            table, layers = build_permutation_table(goal_board)
+            self.assertEqual(bytes(table), bytes(reference_table(goal_board)))
+            self.assertEqual(len(layers), max(table) + 1)
+
+        table, layers = build_permutation_table(create_goal_board())
+        self.assertEqual(len(layers), 32)  # 八数码的最远状态距离为31步
+        self.assertEqual(sum(layer["states"] for layer in layers), state_count(3))
+
+        for goal_board, tiles in (([[1, 2, 3], [4, 5, 0]], (1, 2, 4)),
+                                  ([[3, 1, 2], [0, 5, 4]], (2, 5)),
+                                  (create_goal_board(), (5, 6, 7, 8))):
+            table, _ = build_pattern_distances(goal_board, tiles)
+            self.assertEqual(table, _build_pattern_table_python(goal_board, tiles))
+
+    def test_solution_cache(self):
+        """测试两级解缓存：内存命中、重启后磁盘命中与紧凑移动编码"""
+        import os
+        import tempfile
+        from solution_cache import SolutionCache, encode_moves, decode_moves
+
+        move_ids = [0, 3, 1, 2, 2, 1, 0]
+        self.assertEqual(len(encode_moves(move_ids)), 2)
+        self.assertEqual(decode_moves(encode_moves(move_ids), len(move_ids)), move_ids)
+
+        test_cases, goal_board = get_test_cases()
+        board = test_cases["hard"]["board"]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, "solutions.sqlite3")
+            cache = SolutionCache(path, max_size=2)
+            _, moves, stats = cache.solve(board, goal_board)
+            self.assertNotIn("cached", stats)
+            _, again, stats = cache.solve(board, goal_board)
+            self.assertEqual(stats["cached"], "memory")
+            self.assertEqual(again, moves)
+            self.assertIsNone(cache.get(board, goal_board, "idastar"))
+            cache.close()
+
+            restarted = SolutionCache(path)
+            solution_path, again, stats = restarted.solve(board, goal_board)
+            self.assertEqual(stats["cached"], "disk")
+            self.assertEqual(again, moves)
+            self.assertEqual(solution_path[-1].board, goal_board)
+            info = restarted.info()
+            self.assertEqual((info["disk_hits"], info["misses"]), (1, 0))
+            restarted.close()
+
+    def test_goal_relabeling(self):
+        """测试目标重标记：任意目标共用规范目标的距离表、模式数据库与解缓存"""
+        from relabel import Relabeling, canonical_goal, relabel_problem
+        from distance_table import lookup_distance, TableSolver
+        from solution_cache import SolutionCache
+        from packed_state import pack_board
+
+        goal_board = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+        board = [[6, 4, 7], [8, 5, 0], [3, 2, 1]]
+        relabeled, canonical, relabeling = relabel_problem(board, goal_board)
+        self.assertEqual(canonical, canonical_goal(3, 3, 7))
+        self.assertEqual(relabeling.board(goal_board), canonical)
+        self.assertEqual(relabeling.restore_board(relabeled), board)
+        self.assertEqual(relabeling.code(pack_board(board)), pack_board(relabeled))
+        self.assertTrue(Relabeling(create_goal_board()).is_identity)
+
+        # 查表距离与A*最优解长度一致，查表求解器给出原编号下的最优路径
+        _, moves, _ = AStarSolver(board, goal_board).solve("manhattan")
+        self.assertEqual(lookup_distance(board, goal_board), len(moves))
+        path, table_moves, _ = TableSolver(board, goal_board).solve()
+        self.assertEqual(len(table_moves), len(moves))
+        self.assertEqual(path[0].board, board)
+        self.assertEqual(path[-1].board, goal_board)
+        self.assertEqual(AStarSolver(board, goal_board).solve("exact")[2]["nodes_expanded"], len(moves))
+        _, pdb_moves, _ = AStarSolver(board, goal_board).solve("pdb")
+        self.assertEqual(len(pdb_moves), len(moves))
+
+        # 两个等价问题（同一规范问题）共用一条缓存，路径按各自的编号重建
+        cache = SolutionCache(None)
+        cache.solve(relabeled, canonical)
+        path, cached_moves, stats = cache.solve(board, goal_board)
+        self.assertEqual(stats["cached"], "memory")
+        self.assertEqual(len(cached_moves), len(moves))
+        self.assertEqual(path[-1].board, goal_board)
+
+    def test_symmetry(self):
+        """测试转置对称：距离不变、移动方向对应，互为转置的状态共用缓存与查找表"""
+        from symmetry import get_transposition, representative, stored_frame
+        from distance_table import lookup_distance
+        from solution_cache import SolutionCache
+        from search_nodes import build_path_from_moves
+        from move_tables import MOVE_NAMES
+        from packed_state import pack_board
+
+        test_cases, goal_board = get_test_cases()
+        board = test_cases["hard"]["board"]
+        transposition = get_transposition(3, 3, 8)
+        mirrored = transposition.board(board)
+        self.assertEqual(transposition.board(goal_board), goal_board)
+        self.assertEqual(transposition.board(mirrored), board)
+        self.assertEqual(lookup_distance(mirrored), lookup_distance(board))
+        self.assertEqual(representative(pack_board(board), 3, 3, 8)[0],
+                         representative(pack_board(mirrored), 3, 3, 8)[0])
+        self.assertEqual(stored_frame(3, 3, 7)[0], 5)
+        self.assertIsNone(get_transposition(3, 4, 11))
+
+        # 解的移动方向按转置对应后，同样把转置状态带到目标
+        _, moves, _ = AStarSolver(board, goal_board).solve("manhattan")
+        move_ids = transposition.moves([MOVE_NAMES.index(move) for move in moves])
+        path, _ = build_path_from_moves(mirrored, move_ids, goal_board)
+        self.assertEqual(path[-1].board, goal_board)
+
+        cache = SolutionCache(None)
+        cache.solve(board, goal_board)
+        path, cached_moves, stats = cache.solve(mirrored, goal_board)
+        self.assertEqual(stats["cached"], "memory")
+        self.assertEqual(len(cached_moves), len(moves))
+        self.assertEqual(path[0].board, mirrored)
+        self.assertEqual(path[-1].board, goal_board)
+
+    def test_goal_context_cache(self):
+        """测试目标上下文在多个求解器之间复用"""
+        from goal_context import get_goal_context, goal_cache_info, clear_goal_cache, GOAL_CACHE_SIZE
+
+        clear_goal_cache()
+        test_cases, goal_board = get_test_cases()
+        first = AStarSolver(test_cases["easy"]["board"], goal_board)
+        second = AStarSolver(test_cases["medium"]["board"], [row[:] for row in goal_board])
+        self.assertIs(first.goal_context, second.goal_context)
+        self.assertIs(first.goal_context.heuristic("manhattan"),
+                      second.goal_context.heuristic("manhattan"))
+        self.assertEqual(goal_cache_info()["hits"], 1)
+
+        # 超出容量时淘汰最久未使用的目标
+        from itertools import islice, permutations
+        for perm in islice(permutations(range(9)), GOAL_CACHE_SIZE):
+            get_goal_context([list(perm[0:3]), list(perm[3:6]), list(perm[6:9])])
+        self.assertEqual(goal_cache_info()["size"], GOAL_CACHE_SIZE)
+        self.assertIsNot(get_goal_context(goal_board), first.goal_context)
+
+    def test_bucket_open_list(self):
+        """测试按f值分桶的开放列表"""
+        from open_list import BucketOpenList
+
+        open_set = BucketOpenList()
+        for f, h, node in [(5, 2, 0), (3, 3, 1), (5, 1, 2), (3, 0, 3)]:
+            open_set.push(f, h, node)
+        self.assertEqual([open_set.pop()[2] for _ in range(4)], [3, 1, 2, 0])
+        self.assertEqual(len(open_set), 0)
+
+        test_cases, goal_board = get_test_cases()
+        solver = AStarSolver(test_cases["medium"]["board"], goal_board)
+        _, _, heap_stats = solver.solve("manhattan", open_list="heap")
+        _, _, bucket_stats = solver.solve("manhattan", open_list="bucket")
+        self.assertEqual(bucket_stats["open_list"], "bucket")
+        self.assertEqual(bucket_stats["path_length"], heap_stats["path_length"])
+
+    def test_ida_star(self):
+        """测试IDA*与A*得到相同的最优步数"""
+        from ida_star import IDAStarSolver
+
+        test_cases, goal_board = get_test_cases()
+        board = test_cases["hard"]["board"]
+        _, _, a_star_stats = AStarSolver(board, goal_board).solve("manhattan")
+        for tt_size in (0, 4096):
+            path, moves, stats = IDAStarSolver(board, goal_board).solve(
+                "manhattan", max_nodes=200000, tt_size=tt_size)
+            self.assertTrue(stats["solution_found"])
+            self.assertEqual(stats["path_length"], a_star_stats["path_length"])
+            self.assertEqual(path[-1].board, goal_board)
+            self.assertEqual(len(stats["nodes_per_threshold"]), stats["iterations"])
+
+    def test_bidirectional(self):
+        """测试双向搜索得到最优解并报告相遇点；节点限制提前用尽时解标记为未证明最优"""
+        from bidirectional import BidirectionalAStarSolver
+
+        test_cases, goal_board = get_test_cases()
+        for name in ("solved", "medium", "hard"):
+            board = test_cases[name]["board"]
+            _, _, a_star_stats = AStarSolver(board, goal_board).solve("manhattan")
+            path, moves, stats = BidirectionalAStarSolver(board, goal_board).solve("manhattan")
+            self.assertTrue(stats["solution_found"])
+            self.assertEqual(stats["path_length"], a_star_stats["path_length"])
+            self.assertEqual(path[-1].board, goal_board)
+            self.assertEqual(stats["nodes_expanded"],
+                             stats["nodes_expanded_forward"] + stats["nodes_expanded_backward"])
+            self.assertEqual(path[stats["meeting_depth"]].board, stats["meeting_point"])
+            self.assertNotIn("stopped", stats)
+
+        # 节点限制在相遇之后、证明最优之前用尽：返回有效解，但标记为未证明最优
+        board = test_cases["hard"]["board"]
+        full = BidirectionalAStarSolver(board, goal_board).solve("manhattan")[2]
+        path, moves, stats = BidirectionalAStarSolver(board, goal_board).solve(
+            "manhattan", max_nodes=full["nodes_expanded"] - 1)
+        self.assertTrue(stats["solution_found"])
+        self.assertEqual(path[-1].board, goal_board)
+        self.assertEqual((stats["stopped"], stats["optimal"]), ("max_nodes", False))
+        self.assertLessEqual(stats["lower_bound"], full["path_length"])
+
+    def test_distance_table(self):
+        """测试全状态距离表与查表求解"""
+        from distance_table import get_distance_table, lookup_distance, STATE_COUNT, UNKNOWN
+        from solvers import create_solver
+
+        table = get_distance_table()
+        self.assertEqual(len(table), STATE_COUNT)
+        self.assertEqual(max(table), 31)
+        self.assertNotIn(UNKNOWN, table)
+
+        test_cases, goal_board = get_test_cases()
+        board = test_cases["hard"]["board"]
+        _, _, a_star_stats = AStarSolver(board, goal_board).solve("manhattan")
+        self.assertEqual(lookup_distance(board), a_star_stats["path_length"])
+
+        path, moves, stats = create_solver("table", board, goal_board).solve()
+        self.assertEqual(stats["path_length"], a_star_stats["path_length"])
+        self.assertEqual(path[-1].board, goal_board)
+
+        _, _, exact_stats = AStarSolver(board, goal_board).solve("exact")
+        self.assertEqual(exact_stats["nodes_expanded"], a_star_stats["path_length"])
+
+    def test_permutation_rank(self):
+        """测试排列排名/反排名与棋盘稠密序号"""
+        from itertools import permutations
+        from permutation_rank import (lehmer_rank, lehmer_unrank, myrvold_ruskey_rank,
+                                      myrvold_ruskey_unrank, rank_board, unrank_board,
+                                      is_rank_solvable, state_count)
+
+        for rank in range(24):
+            self.assertEqual(lehmer_rank(lehmer_unrank(rank, 4)), rank)
+            self.assertEqual(myrvold_ruskey_rank(myrvold_ruskey_unrank(rank, 4)), rank)
+        self.assertEqual([lehmer_rank(p) for p in permutations(range(4))], list(range(24)))
+
+        # 2x3棋盘：序号在可解状态上是到 [0, 6!/2) 的双射
+        indices = set()
+        for perm in permutations(range(6)):
+            board = [list(perm[:3]), list(perm[3:])]
+            if is_rank_solvable(board):
+                index = rank_board(board)
+                self.assertEqual(unrank_board(index, 2, 3), board)
+                indices.add(index)
+        self.assertEqual(indices, set(range(state_count(2, 3))))
+
+        test_cases, goal_board = get_test_cases()
+        for case in test_cases.values():
+            solvable = AStarSolver(case["board"], goal_board).is_solvable(case["board"])
+            self.assertEqual(is_rank_solvable(case["board"]), solvable)
+
+        # 批量形式（有NumPy时为数组运算，打包状态超出int64的4x4也要一致）与逐个计算结果相同
+        import random
+        from packed_state import pack_board
+        from permutation_rank import rank_boards, rank_codes, unrank_boards, partial_rank, partial_rank_array
+        rng = random.Random(11)
+        for rows, cols in ((2, 3), (3, 3), (4, 4)):
+            indices = [rng.randrange(state_count(rows, cols)) for _ in range(200)]
+            boards = unrank_boards(indices, rows, cols)
+            self.assertEqual(boards, [unrank_board(index, rows, cols) for index in indices])
+            self.assertEqual(rank_boards(boards), indices)
+            self.assertEqual(rank_codes([pack_board(board) for board in boards], rows, cols), indices)
+        if importlib.util.find_spec("numpy"):
+            positions = [rng.sample(range(16), 5) for _ in range(200)]
+            self.assertEqual(partial_rank_array(positions, 16).tolist(),
+                             [partial_rank(p, 16) for p in positions])
+
 
 def run_all_tests():
     """运行所有测试"""
@@ -192,10 +1013,11 @@ def run_single_case(case_name, heuristic_type="manhattan"):
         print("\n 该状态无解！")
         return False
 
-    # 求解
+    # 求解（相同的棋盘、目标与启发式再次运行时命中解缓存）
     import time
+    from solution_cache import cached_solve
     start_time = time.time()
-    path, moves, stats = solver.solve(heuristic_type)
+    path, moves, stats = cached_solve(board, goal_board, "astar", heuristic_type)
     end_time = time.time()
 
     if stats["solution_found"]:
@@ -205,6 +1027,8 @@ def run_single_case(case_name, heuristic_type="manhattan"):
         print(f"  预期步数: {expected_steps} 步")
         print(f"  运行时间: {(end_time - start_time) * 1000:.2f} ms")
         print(f"  最大开放集大小: {stats['max_open_size']}")
+        if stats.get("cached"):
+            print(f"  结果来自解缓存 ({stats['cached']})")
 
         # 验证步数
         if expected_steps > 0:
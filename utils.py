@@ -1,17 +1,27 @@
 # utils.py
+import gc
+import math
 import random
+import statistics
 import time
 from typing import List, Tuple
 
 
-def create_goal_board(size=3):
-    """创建目标状态棋盘"""
+def create_goal_board(size=3, cols=None):
+    """
+    创建目标状态棋盘
+    Args:
+        size: 行数（cols为None时同时作为列数）
+        cols: 列数
+    """
+    rows = size
+    cols = size if cols is None else cols
     board = []
     num = 1
-    for i in range(size):
+    for i in range(rows):
         row = []
-        for j in range(size):
-            if i == size - 1 and j == size - 1:
+        for j in range(cols):
+            if i == rows - 1 and j == cols - 1:
                 row.append(0)  # 最后一个位置是空白格
             else:
                 row.append(num)
@@ -20,9 +30,11 @@ def create_goal_board(size=3):
     return board
 
 
-def create_random_board(size=3, moves=20):
-    """通过随机移动生成合法的随机初始状态"""
-    goal_board = create_goal_board(size)
+def create_random_board(size=3, moves=20, cols=None):
+    """通过随机移动生成合法的随机初始状态（size为行数，cols为None时为方形棋盘）"""
+    rows = size
+    cols = size if cols is None else cols
+    goal_board = create_goal_board(rows, cols)
     current_state = goal_board
 
     # 将二维列表转换为可修改的格式
@@ -31,8 +43,8 @@ def create_random_board(size=3, moves=20):
     for _ in range(moves):
         # 找到空白格位置
         blank_i, blank_j = None, None
-        for i in range(size):
-            for j in range(size):
+        for i in range(rows):
+            for j in range(cols):
                 if current_state[i][j] == 0:
                     blank_i, blank_j = i, j
                     break
@@ -41,11 +53,11 @@ def create_random_board(size=3, moves=20):
         possible_moves = []
         if blank_i > 0:
             possible_moves.append((-1, 0))  # 上
-        if blank_i < size - 1:
+        if blank_i < rows - 1:
             possible_moves.append((1, 0))  # 下
         if blank_j > 0:
             possible_moves.append((0, -1))  # 左
-        if blank_j < size - 1:
+        if blank_j < cols - 1:
             possible_moves.append((0, 1))  # 右
 
         # 随机选择一个方向移动
@@ -84,44 +96,206 @@ def board_to_string(board):
     return "\n".join(lines)
 
 
-def validate_board(board, size=3):
-    """验证棋盘是否有效"""
-    if len(board) != size:
+def validate_board(board, rows=None, cols=None):
+    """
+    验证棋盘是否有效：rows x cols 的矩形，且恰好包含数字 0..rows*cols-1
+    Args:
+        board: 棋盘
+        rows: 期望的行数，None表示按棋盘本身推断
+        cols: 期望的列数，None时与rows相同（rows也为None时按棋盘推断）
+    """
+    if not board or not board[0]:
+        return False
+    if cols is None:
+        cols = len(board[0]) if rows is None else rows
+    if rows is None:
+        rows = len(board)
+    if len(board) != rows:
         return False
     for row in board:
-        if len(row) != size:
+        if len(row) != cols:
             return False
 
-    # 检查是否包含所有数字0-8
+    # 检查是否包含所有数字0..n-1
     numbers = set()
     for row in board:
         for cell in row:
             numbers.add(cell)
 
-    expected_numbers = set(range(size * size))
+    expected_numbers = set(range(rows * cols))
     return numbers == expected_numbers
 
 
-def measure_performance(initial_board, goal_board, heuristic_type, runs=3):
-    """测量算法性能"""
-    from a_star import AStarSolver
+def is_solvable(board, goal_board=None):
+    """
+    判断棋盘能否通过滑动到达目标状态（适用于任意 M x N 棋盘与任意目标）
+    每次滑动都是一次对换（整体排列奇偶性翻转），同时空白格的曼哈顿位移改变1；
+    因此可解当且仅当 “棋盘相对目标的排列奇偶性” 等于 “空白格到目标位置的曼哈顿距离奇偶性”。
+    对奇数宽度的标准目标，这等价于经典的逆序数为偶数规则；偶数宽度时等价于逆序数加空白格行差的奇偶规则
+    Args:
+        board: 初始棋盘
+        goal_board: 目标棋盘，默认同尺寸的标准目标
+    """
+    from permutation_rank import permutation_parity
+
+    rows, cols = len(board), len(board[0])
+    if goal_board is None:
+        goal_board = create_goal_board(rows, cols)
+    flat = [num for row in board for num in row]
+    goal_flat = [num for row in goal_board for num in row]
+    if sorted(flat) != sorted(goal_flat):
+        return False
+
+    goal_pos = {num: pos for pos, num in enumerate(goal_flat)}
+    parity = permutation_parity([goal_pos[num] for num in flat])
+    blank_i, blank_j = divmod(flat.index(0), cols)
+    goal_i, goal_j = divmod(goal_pos[0], cols)
+    return parity == (abs(blank_i - goal_i) + abs(blank_j - goal_j)) & 1
+
+
+def percentile(ordered, q):
+    """最近秩法分位数（ordered 需已排序），空列表返回None"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def quantile_interval(ordered, q, confidence=0.95):
+    """
+    分位数的无分布置信区间（次序统计量法）
+    样本中小于真实 q 分位数的个数服从 Binomial(n, q/100)，取两侧尾概率各不超过 (1-confidence)/2 的一对次序统计量；
+    样本太少时区间被截断到样本最小/最大值，实际覆盖率低于 confidence（p99 通常需要数百次运行）
+    Args:
+        ordered: 已排序的样本
+        q: 分位数（0-100）
+        confidence: 置信水平
+    Returns:
+        (下界, 上界)，空列表返回 (None, None)
+    """
+    n = len(ordered)
+    if not n:
+        return None, None
+    p = min(max(q / 100, 1e-12), 1 - 1e-12)
+    tail = (1 - confidence) / 2
+    cdf = []  # cdf[k] = P(B <= k)，在对数空间计算二项概率，避免大n时溢出
+    total = 0.0
+    for k in range(n + 1):
+        total += math.exp(math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+                          + k * math.log(p) + (n - k) * math.log1p(-p))
+        cdf.append(total)
+    # 次序统计量的秩（从1开始）：秩 l 满足 P(B < l) = cdf[l-1] <= tail 时可作下界
+    lower = max((k + 1 for k in range(n) if cdf[k] <= tail), default=1)
+    upper = next((k + 1 for k in range(n) if cdf[k] >= 1 - tail), n)
+    return ordered[lower - 1], ordered[upper - 1]
+
+
+def summarize_timings(values, confidence=0.95):
+    """汇总一组耗时（秒）：中位数、p95、p99 及各自的置信区间，另附均值、标准差与最值"""
+    ordered = sorted(values)
+    summary = {
+        "mean": statistics.mean(ordered) if ordered else None,
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min": ordered[0] if ordered else None,
+        "max": ordered[-1] if ordered else None,
+    }
+    for name, q in (("median", 50), ("p95", 95), ("p99", 99)):
+        summary[name] = percentile(ordered, q)
+        summary[name + "_ci"] = quantile_interval(ordered, q, confidence)
+    return summary
+
+
+def _gc_collections():
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def measure_performance(initial_board, goal_board, heuristic_type, runs=30, warmup=3, algorithm="astar",
+                        max_nodes=50000, disable_gc=True, confidence=0.95):
+    """
+    测量求解器性能
+    使用 perf_counter_ns 计时，正式计时前先运行 warmup 次（查找表加载、目标上下文缓存等一次性开销不计入）；
+    每次运行分别计时：创建求解器（setup）、搜索（search）与解路径重建（reconstruct）。
+    通过 reconstruct_path 重建路径的求解器（A*、ARA*）直接计时；其他求解器（IDA*、双向、查表）在求解后
+    按返回的移动序列再重建一次路径计时，并从求解耗时中扣除。
+    未找到解的运行不会被丢弃：计入耗时，并在 unsolved_runs/errors 中报告
+    Args:
+        initial_board: 初始棋盘
+        goal_board: 目标棋盘
+        heuristic_type: 启发式函数类型
+        runs: 正式计时的运行次数
+        warmup: 预热次数
+        algorithm: 求解算法（见 solvers.SOLVERS）
+        max_nodes: 最大扩展节点数限制
+        disable_gc: 每次运行前回收一次垃圾并在计时期间关闭GC（结束后恢复原状态）；
+            为False时保留GC，并报告计时期间发生的回收次数
+        confidence: 分位数置信区间的置信水平
+    Returns:
+        dict: setup/search/reconstruct/total 各为 summarize_timings 的结果（秒）；
+        另有 runs、warmup、solved_runs、unsolved_runs、errors、nodes（min/max/mean，含未解运行）、path_length，
+        以及 gc（enabled: 调用时GC是否开启，disabled_during_runs，collections: 计时期间的回收次数）
+    """
+    from solvers import create_solver
+    from search_nodes import build_path_from_moves
+    from move_tables import MOVE_NAMES
 
-    times = []
-    nodes_list = []
+    def run_once():
+        reconstruct = [0, False]  # [耗时, 求解器是否调用了 reconstruct_path]
+        start = time.perf_counter_ns()
+        solver = create_solver(algorithm, initial_board, goal_board)
+        setup = time.perf_counter_ns()
+        original = solver.reconstruct_path
 
-    for _ in range(runs):
-        solver = AStarSolver(initial_board, goal_board)
+        def timed_reconstruct(*args):
+            begin = time.perf_counter_ns()
+            try:
+                return original(*args)
+            finally:
+                reconstruct[0] += time.perf_counter_ns() - begin
+                reconstruct[1] = True
+        solver.reconstruct_path = timed_reconstruct
+        _, moves, stats = solver.solve(heuristic_type, max_nodes=max_nodes)
+        end = time.perf_counter_ns()
+        if not reconstruct[1] and moves is not None:
+            move_ids = [MOVE_NAMES.index(move) for move in moves]
+            begin = time.perf_counter_ns()
+            build_path_from_moves(initial_board, move_ids, goal_board)
+            reconstruct[0] = time.perf_counter_ns() - begin
+        search = max(0, end - setup - reconstruct[0])
+        return (setup - start) / 1e9, search / 1e9, reconstruct[0] / 1e9, moves, stats
 
-        start_time = time.time()
-        _, _, stats = solver.solve(heuristic_type)
-        end_time = time.time()
+    for _ in range(warmup):
+        run_once()
 
-        times.append(end_time - start_time)
-        if stats.get("solution_found"):
-            nodes_list.append(stats["nodes_expanded"])
+    gc_enabled = gc.isenabled()
+    collections = 0
+    records = []
+    try:
+        for _ in range(runs):
+            if disable_gc:
+                gc.collect()
+                gc.disable()
+            before = _gc_collections()
+            records.append(run_once())
+            collections += _gc_collections() - before
+            if disable_gc and gc_enabled:
+                gc.enable()
+    finally:
+        if gc_enabled:
+            gc.enable()
 
-    if times:
-        avg_time = sum(times) / len(times)
-        avg_nodes = sum(nodes_list) / len(nodes_list) if nodes_list else 0
-        return avg_time, avg_nodes
-    return None, None
\ No newline at end of file
+    solved = [record for record in records if record[4].get("solution_found")]
+    nodes = [record[4].get("nodes_expanded", 0) for record in records]
+    errors = sorted({record[4]["error"] for record in records if record[4].get("error")})
+    return {
+        "runs": runs,
+        "warmup": warmup,
+        "solved_runs": len(solved),
+        "unsolved_runs": len(records) - len(solved),
+        "errors": errors,
+        "nodes": {"min": min(nodes), "max": max(nodes), "mean": statistics.mean(nodes)} if nodes else None,
+        "path_length": len(solved[0][3]) if solved else None,
+        "setup": summarize_timings([record[0] for record in records], confidence),
+        "search": summarize_timings([record[1] for record in records], confidence),
+        "reconstruct": summarize_timings([record[2] for record in records], confidence),
+        "total": summarize_timings([sum(record[:3]) for record in records], confidence),
+        "gc": {"enabled": gc_enabled, "disabled_during_runs": disable_gc, "collections": collections},
+    }